@@ -0,0 +1,75 @@
+"""
+Compiled vs interpreted validation of a large response schema.
+
+    python benchmarks/bench_compiled_validation.py [--items N] [--repeat N]
+"""
+import argparse
+from timeit import repeat
+
+from d42 import optional, schema
+from d42.validation import validate_or_fail
+
+from jj_spec_validator.utils import compile_schema, get_forced_strict_spec, validate_non_strict
+
+ITEM_SCHEMA = schema.dict({
+    'id': schema.int.min(1),
+    'name': schema.str.len(1, 64),
+    'price': schema.float,
+    'active': schema.bool,
+    'tags': schema.list(schema.str),
+    'owner': schema.dict({
+        'id': schema.int,
+        'email': schema.str,
+        optional('phone'): schema.str | schema.none,
+    }),
+    'variants': schema.list(schema.dict({
+        'sku': schema.str,
+        'stock': schema.int.min(0),
+        'attributes': schema.dict({'color': schema.str, 'size': schema.str}),
+    })),
+})
+RESPONSE_SCHEMA = schema.dict({'items': schema.list(ITEM_SCHEMA), 'total': schema.int})
+
+
+def make_body(items: int) -> dict:
+    return {
+        'items': [{
+            'id': i + 1,
+            'name': f'item {i}',
+            'price': i * 1.5,
+            'active': i % 2 == 0,
+            'tags': ['a', 'b', 'c'],
+            'owner': {'id': i, 'email': f'user{i}@example.com', 'phone': None},
+            'variants': [{'sku': f'{i}-{j}', 'stock': j, 'attributes': {'color': 'red', 'size': 'M'}}
+                         for j in range(3)],
+        } for i in range(items)],
+        'total': items,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    body = make_body(args.items)
+    forced_schema = get_forced_strict_spec(RESPONSE_SCHEMA)
+    cases = [
+        ('strict', lambda: validate_or_fail(RESPONSE_SCHEMA, body),
+         compile_schema(RESPONSE_SCHEMA, is_strict=True).validate),
+        ('non-strict', lambda: validate_non_strict(RESPONSE_SCHEMA, body),
+         compile_schema(RESPONSE_SCHEMA, is_strict=False).validate),
+        ('force_strict', lambda: validate_or_fail(forced_schema, body),
+         compile_schema(RESPONSE_SCHEMA, is_strict=True, force_strict=True).validate),
+    ]
+
+    print(f"{'mode':<14}{'interpreted, ms':>18}{'compiled, ms':>16}{'speedup':>10}")
+    for name, interpreted, compiled in cases:
+        interpreted_time = min(repeat(interpreted, number=1, repeat=args.repeat)) * 1000
+        compiled_time = min(repeat(lambda: compiled(body), number=1, repeat=args.repeat)) * 1000
+        print(f"{name:<14}{interpreted_time:>18.2f}{compiled_time:>16.2f}{interpreted_time / compiled_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
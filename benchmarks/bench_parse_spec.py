@@ -0,0 +1,110 @@
+"""
+Parse time and peak RSS of a large spec: str + json / CLoader vs parse_spec on the raw bytes.
+
+    python benchmarks/bench_parse_spec.py [--operations N]
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+from time import perf_counter
+from typing import Any, Callable, Dict, Tuple
+
+from yaml import CDumper, CLoader, dump, load
+
+from jj_spec_validator.utils._spec_parser import parse_spec
+
+
+def make_spec(operations: int) -> Dict[str, Any]:
+    paths = {}
+    for i in range(operations):
+        paths[f'/api/v1/items{i}/{{id}}'] = {
+            'get': {
+                'parameters': [{'in': 'path', 'name': 'id', 'required': True, 'schema': {'type': 'integer'}}],
+                'responses': {'200': {'description': 'ok', 'content': {'application/json': {'schema': {
+                    'type': 'array',
+                    'items': {'$ref': f'#/components/schemas/Item{i % 100}'},
+                }}}}},
+            },
+        }
+    schemas = {
+        f'Item{i}': {
+            'type': 'object',
+            'required': ['id', 'name'],
+            'properties': {
+                'id': {'type': 'integer'},
+                'name': {'type': 'string', 'description': 'x' * 200},
+                'tags': {'type': 'array', 'items': {'type': 'string'}},
+            },
+        } for i in range(100)
+    }
+    return {'openapi': '3.0.0', 'info': {'title': 'bench', 'version': '1'},
+            'paths': paths, 'components': {'schemas': schemas}}
+
+
+def _maxrss_mb() -> float:
+    # KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _run_case(parse: Callable[[bytes], Any], content: bytes, queue: 'multiprocessing.Queue[Tuple[float, float]]') -> None:
+    before = _maxrss_mb()
+    started = perf_counter()
+    parse(content)
+    queue.put((perf_counter() - started, _maxrss_mb() - before))
+
+
+def measure(parse: Callable[[bytes], Any], content: bytes) -> Tuple[float, float]:
+    # every case in a fresh process, so the peak RSS of one doesn't hide the others
+    queue: 'multiprocessing.Queue[Tuple[float, float]]' = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_case, args=(parse, content, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def str_json(content: bytes) -> Any:
+    return json.loads(content.decode())
+
+
+def str_yaml(content: bytes) -> Any:
+    return load(content.decode(), Loader=CLoader)
+
+
+def bytes_json(content: bytes) -> Any:
+    return parse_spec(content, 'application/json', 'spec.json')
+
+
+def bytes_yaml(content: bytes) -> Any:
+    return parse_spec(content, 'text/yaml', 'spec.yml')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--operations', type=int, default=20000)
+    args = parser.parse_args()
+
+    spec = make_spec(args.operations)
+    json_content = json.dumps(spec).encode()
+    yaml_content = dump(spec, Dumper=CDumper).encode()
+
+    cases = [
+        ('json, str + json', str_json, json_content),
+        ('json, parse_spec', bytes_json, json_content),
+        ('yaml, str + CLoader', str_yaml, yaml_content),
+        ('yaml, parse_spec', bytes_yaml, yaml_content),
+        ('json as yaml, str + CLoader', str_yaml, json_content),
+        ('json as yaml, parse_spec', bytes_yaml, json_content),
+    ]
+    print(f"json {len(json_content) / 2 ** 20:.1f} MiB, yaml {len(yaml_content) / 2 ** 20:.1f} MiB")
+    print(f"{'case':<30}{'time, s':>10}{'peak RSS, MiB':>16}")
+    for name, parse, content in cases:
+        elapsed, peak_rss = measure(parse, content)
+        print(f"{name:<30}{elapsed:>10.2f}{peak_rss:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Offline benchmark suite over synthetic specs, results are written as JSON and compared with a baseline.
+
+    python benchmarks/bench_suite.py [--sizes 10 100 1000 10000] [--output results.json]
+                                     [--baseline benchmarks/baseline.json] [--threshold 0.5]
+
+Exits with 1 if a measurement is slower than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+from synthetic import make_mocks, make_spec
+
+from jj_spec_validator import Config, clear_validation_cache, invalidate_spec
+from jj_spec_validator.utils import create_openapi_matcher, load_spec
+from jj_spec_validator.validator import Validator
+
+RESULTS_FORMAT_VERSION = 1
+MOCKS_PER_SIZE = 50
+# differences below it are noise, whatever the ratio
+MIN_REGRESSION = 50e-6  # in seconds
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> float:
+    """
+    :return: The fastest call, in seconds: the least noisy estimate on shared CI runners.
+    """
+    durations = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func()
+        durations.append(perf_counter() - started)
+    return min(durations)
+
+
+def _make_validator(spec_link: str, is_strict: bool = False, force_strict: bool = False) -> Validator:
+    return Validator(
+        skip_if_failed_to_get_spec=False,
+        is_raise_error=True,
+        is_strict=is_strict,
+        func_name='bench_suite',
+        spec_link=spec_link,
+        force_strict=force_strict,
+    )
+
+
+def _reset_disk_cache() -> None:
+    shutil.rmtree(Config.MAIN_DIRECTORY, ignore_errors=True)
+
+
+def bench_size(operations: int, repeat: int) -> Dict[str, float]:
+    spec = make_spec(operations)
+    spec_link = os.path.abspath(f'spec_{operations}.json')
+    with open(spec_link, 'w') as f:
+        json.dump(spec, f)
+    mocks = make_mocks(spec, MOCKS_PER_SIZE)
+    validator = _make_validator(spec_link)
+
+    def cold_load() -> None:
+        _reset_disk_cache()
+        invalidate_spec()
+        load_spec(validator)
+
+    def warm_disk_load() -> None:
+        invalidate_spec()
+        load_spec(validator)
+
+    results = {
+        'cold_load': _measure(cold_load, repeat),
+        'warm_disk_load': _measure(warm_disk_load, repeat),
+        'memory_hit': _measure(lambda: load_spec(validator), repeat * 100),
+    }
+
+    prepared_spec = load_spec(validator)
+    assert prepared_spec is not None
+
+    def match_all() -> None:
+        for _, mock in mocks:
+            spec_matcher = create_openapi_matcher(matcher=mock.handler.matcher)
+            assert spec_matcher is not None
+            matched = list(spec_matcher.resolve(prepared_spec.route_index))
+            assert len(matched) == 1, matched
+
+    results['route_matching'] = _measure(match_all, repeat) / len(mocks)
+
+    # every validation is measured, not its memoized result
+    result_cache_size, Config.RESULT_CACHE_SIZE = Config.RESULT_CACHE_SIZE, 0
+    try:
+        for name, mode_validator in (
+            ('validate_non_strict', _make_validator(spec_link)),
+            ('validate_strict', _make_validator(spec_link, is_strict=True)),
+            ('validate_force_strict', _make_validator(spec_link, is_strict=True, force_strict=True)),
+        ):
+            invalidate_spec()
+
+            def validate_all(mode_validator: Validator = mode_validator) -> None:
+                for _, mock in mocks:
+                    mode_validator.validate(mock)
+
+            # the first validation converts and compiles the schemas of the API methods
+            results[f'{name}_first'] = _measure(validate_all, 1) / len(mocks)
+            results[name] = _measure(validate_all, repeat) / len(mocks)
+    finally:
+        Config.RESULT_CACHE_SIZE = result_cache_size
+        clear_validation_cache()
+
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    :return: Descriptions of the measurements slower than in the baseline by more than `threshold`.
+    """
+    regressions = []
+    for size, measurements in results['results'].items():
+        baseline_measurements = baseline['results'].get(size, {})
+        for name, duration in measurements.items():
+            baseline_duration = baseline_measurements.get(name)
+            if baseline_duration is None:
+                continue
+            if duration > baseline_duration * (1 + threshold) and duration - baseline_duration > MIN_REGRESSION:
+                regressions.append(f"{size} operations, {name}: {duration * 1000:.3f} ms, "
+                                   f"baseline {baseline_duration * 1000:.3f} ms")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results with this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='allowed slowdown against the baseline, 0.5 is 50%%')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('format') != RESULTS_FORMAT_VERSION:
+            print(f"Unsupported baseline format: {baseline.get('format')}", file=sys.stderr)
+            return 1
+
+    results: Dict[str, Any] = {
+        'format': RESULTS_FORMAT_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {},
+    }
+    work_directory = tempfile.mkdtemp(prefix='jj_spec_validator_bench_')
+    cwd = os.getcwd()
+    # the disk cache lives in Config.MAIN_DIRECTORY, relative to the working directory
+    os.chdir(work_directory)
+    try:
+        for size in args.sizes:
+            results['results'][str(size)] = bench_size(size, args.repeat)
+            for name, duration in results['results'][str(size)].items():
+                print(f"{size:>6} {name:<28}{duration * 1000:>12.3f} ms")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
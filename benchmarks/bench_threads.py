@@ -0,0 +1,110 @@
+"""
+Throughput of CPU-bound schema validation from a thread pool, by number of threads.
+
+    python benchmarks/bench_threads.py [--threads 1 2 4 8] [--mocks 50] [--rounds 20] [--min-speedup 2.0]
+
+The validations only scale on free-threaded CPython builds (3.13t and later), with the GIL
+the threads take turns and the throughput stays about the same.
+Exits with 1 if --min-speedup is given and the most threads are slower than that against one thread.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import sysconfig
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from time import perf_counter
+from typing import List
+
+from jj.mock import Mocked
+from synthetic import make_mocks, make_spec
+
+from jj_spec_validator import Config, clear_validation_cache
+from jj_spec_validator.utils import load_spec
+from jj_spec_validator.validator import Validator
+
+
+def _is_gil_enabled() -> bool:
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_gil_enabled is None else bool(is_gil_enabled())
+
+
+def _measure(validator: Validator, mocks: List[Mocked], threads: int, rounds: int) -> float:
+    """
+    :return: Validations per second of `threads` threads validating all the mocks `rounds` times each.
+    """
+    # the threads are started before the clock, only the validations are measured
+    barrier = Barrier(threads + 1)
+
+    def validate_all() -> None:
+        barrier.wait()
+        for _ in range(rounds):
+            for mock in mocks:
+                validator.validate(mock)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(validate_all) for _ in range(threads)]
+        barrier.wait()
+        started = perf_counter()
+        for future in futures:
+            future.result()
+        duration = perf_counter() - started
+    return threads * rounds * len(mocks) / duration
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--operations', type=int, default=100)
+    parser.add_argument('--mocks', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--min-speedup', type=float, help='of the most threads against one thread')
+    args = parser.parse_args()
+
+    print(f"python {sysconfig.get_python_version()}, GIL {'enabled' if _is_gil_enabled() else 'disabled'}, "
+          f"{os.cpu_count()} CPUs")
+
+    work_directory = tempfile.mkdtemp(prefix='jj_spec_validator_bench_')
+    cwd = os.getcwd()
+    # the disk cache lives in Config.MAIN_DIRECTORY, relative to the working directory
+    os.chdir(work_directory)
+    # every validation is measured, not its memoized result
+    result_cache_size, Config.RESULT_CACHE_SIZE = Config.RESULT_CACHE_SIZE, 0
+    try:
+        spec = make_spec(args.operations)
+        spec_link = os.path.abspath('spec.json')
+        with open(spec_link, 'w') as f:
+            json.dump(spec, f)
+        mocks = [mock for _, mock in make_mocks(spec, args.mocks)]
+        validator = Validator(skip_if_failed_to_get_spec=False, is_raise_error=True, is_strict=True,
+                              func_name='bench_threads', spec_link=spec_link)
+        load_spec(validator)
+        # schemas are converted and compiled by the first validation, not by the measured ones
+        for mock in mocks:
+            validator.validate(mock)
+
+        single = None
+        print(f"{'threads':>8}{'validations/s':>16}{'speedup':>10}")
+        for threads in sorted(args.threads):
+            throughput = _measure(validator, mocks, threads, args.rounds)
+            single = single or throughput
+            print(f"{threads:>8}{throughput:>16.0f}{throughput / single:>9.2f}x")
+    finally:
+        Config.RESULT_CACHE_SIZE = result_cache_size
+        clear_validation_cache()
+        os.chdir(cwd)
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+    speedup = throughput / single
+    if args.min_speedup is not None and speedup < args.min_speedup:
+        print(f"FAILED {max(args.threads)} threads are {speedup:.2f}x of one thread, "
+              f"expected at least {args.min_speedup:.2f}x", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
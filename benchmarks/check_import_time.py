@@ -0,0 +1,71 @@
+"""
+Import-time budget: importing the package and decorating mock functions must not load the heavy dependencies.
+
+    python benchmarks/check_import_time.py [--budget 150] [--repeat 5]
+
+Exits with 1 if a heavy dependency is imported or the import takes longer than the budget.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Any, Dict
+
+# loaded on the first spec load or validation only
+HEAVY_MODULES = ('httpx', 'yaml', 'orjson', 'schemax_openapi', 'd42', 'jsonschema', 'aiohttp', 'jj')
+
+_PROBE = '''
+import json
+import sys
+from time import perf_counter
+
+started = perf_counter()
+from jj_spec_validator import Config, validate_spec
+
+@validate_spec(spec_link="http://localhost/spec.yml")
+def mock_sync():
+    pass
+
+@validate_spec(spec_link="http://localhost/spec.yml", is_strict=True, prefix="/api")
+async def mock_async():
+    pass
+
+@validate_spec(spec_link=None)
+def mock_disabled():
+    pass
+
+duration = perf_counter() - started
+print(json.dumps({"duration": duration, "modules": sorted(sys.modules)}))
+'''
+
+
+def _probe() -> Dict[str, Any]:
+    # a fresh interpreter every time, the modules imported by a previous run would be free
+    output = subprocess.run([sys.executable, '-c', _PROBE], check=True, capture_output=True, text=True).stdout
+    result: Dict[str, Any] = json.loads(output)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=float, default=150, help='in milliseconds')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = [_probe() for _ in range(args.repeat)]
+    duration = min(result['duration'] for result in results) * 1000
+    loaded = sorted({module.split('.')[0] for module in results[0]['modules']} & set(HEAVY_MODULES))
+
+    print(f"import and decorate: {duration:.1f} ms, budget {args.budget:.1f} ms")
+    failed = False
+    if loaded:
+        print(f"FAILED heavy modules imported: {', '.join(loaded)}", file=sys.stderr)
+        failed = True
+    if duration > args.budget:
+        print(f"FAILED over the budget by {duration - args.budget:.1f} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
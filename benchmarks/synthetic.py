@@ -0,0 +1,115 @@
+"""
+Synthetic OpenAPI specs and matching jj mocks for the benchmarks, deterministic for a given size.
+"""
+import random
+from typing import Any, Dict, List, Tuple
+
+import jj
+from jj.mock import Mocked, mocked
+
+ITEMS_PER_LIST = 20
+# components reference the next one, so $ref chains are up to this long
+REF_CHAIN_LENGTH = 4
+
+
+def _component_name(index: int) -> str:
+    return f'Component{index}'
+
+
+def _make_component(index: int, components_count: int) -> Dict[str, Any]:
+    properties: Dict[str, Any] = {
+        'id': {'type': 'integer', 'minimum': 1},
+        'name': {'type': 'string', 'maxLength': 64},
+        'status': {'type': 'string', 'enum': ['active', 'blocked', 'deleted']},
+        'score': {'type': 'number', 'nullable': True},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'meta': {
+            'type': 'object',
+            'properties': {
+                'created_at': {'type': 'string', 'format': 'date-time'},
+                'revision': {'type': 'integer'},
+            },
+            'required': ['revision'],
+        },
+    }
+    required = ['id', 'name', 'status']
+    if index % REF_CHAIN_LENGTH != REF_CHAIN_LENGTH - 1 and index + 1 < components_count:
+        properties['child'] = {'$ref': f'#/components/schemas/{_component_name(index + 1)}'}
+        properties['children'] = {'type': 'array',
+                                  'items': {'$ref': f'#/components/schemas/{_component_name(index + 1)}'}}
+        required.append('child')
+    return {'type': 'object', 'properties': properties, 'required': required}
+
+
+def _operation(response_schema: Dict[str, Any], parameters: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        'parameters': parameters,
+        'responses': {'200': {'description': 'OK', 'content': {'application/json': {'schema': response_schema}}}},
+    }
+
+
+def make_spec(operations: int) -> Dict[str, Any]:
+    """
+    Spec with `operations` API methods: collections /api/v1/resourceN and items /api/v1/resourceN/{id},
+    responding with components nested through $ref.
+    """
+    components_count = max(REF_CHAIN_LENGTH, operations // 4)
+    schemas = {_component_name(i): _make_component(i, components_count) for i in range(components_count)}
+    id_parameter = {'in': 'path', 'name': 'id', 'required': True, 'schema': {'type': 'integer'}}
+
+    paths: Dict[str, Any] = {}
+    for i in range(operations):
+        ref = {'$ref': f'#/components/schemas/{_component_name(i % components_count)}'}
+        if i % 2 == 0:
+            paths[f'/api/v1/resource{i // 2}'] = {
+                'get': _operation({'type': 'array', 'items': ref}, []),
+            }
+        else:
+            paths[f'/api/v1/resource{i // 2}/{{id}}'] = {
+                'get': _operation(ref, [id_parameter]),
+            }
+    return {
+        'openapi': '3.0.0',
+        'info': {'title': f'synthetic {operations}', 'version': '1.0.0'},
+        'paths': paths,
+        'components': {'schemas': schemas},
+    }
+
+
+def _sample(schema: Dict[str, Any], spec: Dict[str, Any], rnd: random.Random) -> Any:
+    if '$ref' in schema:
+        return _sample(spec['components']['schemas'][schema['$ref'].rsplit('/', 1)[1]], spec, rnd)
+    schema_type = schema.get('type')
+    if schema_type == 'object':
+        return {name: _sample(property_schema, spec, rnd)
+                for name, property_schema in schema.get('properties', {}).items()}
+    elif schema_type == 'array':
+        # nested lists are short, so bodies grow linearly with the chain length
+        return [_sample(schema['items'], spec, rnd) for _ in range(2)]
+    elif schema_type == 'integer':
+        return rnd.randint(1, 1000)
+    elif schema_type == 'number':
+        return rnd.random() * 100
+    elif 'enum' in schema:
+        return rnd.choice(schema['enum'])
+    elif schema.get('format') == 'date-time':
+        return '2024-01-01T00:00:00Z'
+    return f'value{rnd.randint(0, 1000)}'
+
+
+def make_mocks(spec: Dict[str, Any], count: int, seed: int = 0) -> List[Tuple[str, Mocked]]:
+    """
+    :return: (path in the spec, jj mock with a valid response) for `count` API methods of the spec.
+    """
+    rnd = random.Random(seed)
+    paths = sorted(spec['paths'])
+    mocks = []
+    for path in rnd.sample(paths, min(count, len(paths))):
+        response_schema = spec['paths'][path]['get']['responses']['200']['content']['application/json']['schema']
+        if response_schema.get('type') == 'array':
+            body = [_sample(response_schema['items'], spec, rnd) for _ in range(ITEMS_PER_LIST)]
+        else:
+            body = _sample(response_schema, spec, rnd)
+        mock_path = path.replace('{id}', str(rnd.randint(1, 1000)))
+        mocks.append((path, mocked(jj.match('GET', mock_path), jj.Response(json=body))))
+    return mocks
@@ -1,4 +1,41 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
+
 from ._config import Config
+from .deferred import DeferredValidationError, flush, flush_async
+from .errors import AmbiguousRouteError, RouteNotFoundError, SpecMatchError
+from .policy import ValidateFirst, ValidateFraction, ValidationBudget, ValidationPolicy
 from .validate_spec import validate_spec
 
-__all__ = ['validate_spec', 'Config']
+if TYPE_CHECKING:
+    from .bulk import MockValidationResult, validate_many
+    from .utils import (Metric, MetricsSummary, build_bundle, clear_validation_cache, invalidate_spec,
+                        metrics_summary, validation_cache_info)
+    from .warm import warm_specs, warm_specs_async
+
+__all__ = ['validate_spec', 'invalidate_spec', 'warm_specs', 'warm_specs_async', 'flush', 'flush_async',
+           'DeferredValidationError', 'validation_cache_info', 'clear_validation_cache', 'build_bundle',
+           'Metric', 'MetricsSummary', 'metrics_summary', 'validate_many', 'MockValidationResult',
+           'SpecMatchError', 'RouteNotFoundError', 'AmbiguousRouteError',
+           'ValidationPolicy', 'ValidateFirst', 'ValidateFraction', 'ValidationBudget', 'Config']
+
+# name -> module, imported on first access to keep `import jj_spec_validator` cheap
+_LAZY_MODULES: Dict[str, str] = {
+    'invalidate_spec': '.utils', 'validation_cache_info': '.utils', 'clear_validation_cache': '.utils',
+    'build_bundle': '.utils', 'Metric': '.utils', 'MetricsSummary': '.utils', 'metrics_summary': '.utils',
+    'warm_specs': '.warm', 'warm_specs_async': '.warm',
+    'validate_many': '.bulk', 'MockValidationResult': '.bulk',
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
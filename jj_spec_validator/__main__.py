@@ -0,0 +1,113 @@
+import sys
+from argparse import ArgumentParser
+from datetime import datetime
+from importlib import import_module
+from os import path
+from typing import List
+
+from .utils import build_bundle, disk_cache_stats, gc_disk_cache
+from .utils._cache_index import ARTIFACT_SUFFIX
+from .validate_spec import get_declared_spec_links
+from .warm import warm_specs
+
+
+def _warm(spec_links: List[str], modules: List[str], max_workers: int | None, is_converted: bool) -> int:
+    # importing modules runs their validate_spec decorators, which declare the spec links
+    for module in modules:
+        import_module(module)
+
+    results = warm_specs(spec_links + get_declared_spec_links(), max_workers=max_workers, is_converted=is_converted)
+    if not results:
+        print("No spec links given or declared in the imported modules", file=sys.stderr)
+        return 1
+
+    for spec_link, is_ready in results.items():
+        print(f"{'ok' if is_ready else 'failed'}\t{spec_link}")
+    return 0 if all(results.values()) else 1
+
+
+def _bundle(filename: str, spec_files: List[str]) -> int:
+    named_spec_files = {}
+    for spec_file in spec_files:
+        name, separator, file_path = spec_file.partition('=')
+        if not separator:
+            # named after the file, e.g. users for specs/users.yml
+            name, file_path = path.splitext(path.basename(spec_file))[0], spec_file
+        if name in named_spec_files:
+            print(f"Duplicate spec name '{name}', use NAME=PATH to rename it", file=sys.stderr)
+            return 1
+        named_spec_files[name] = file_path
+
+    build_bundle(filename, named_spec_files)
+    for name in named_spec_files:
+        print(f"bundle:{filename}#{name}")
+    return 0
+
+
+def _format_size(size: int | None) -> str:
+    if size is None:
+        return 'unlimited'
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+def _stats(verbose: bool) -> int:
+    stats = disk_cache_stats()
+    max_entries = 'unlimited' if stats.max_entries is None else stats.max_entries
+    specs = [entry for entry in stats.entries if entry.name.endswith(ARTIFACT_SUFFIX)]
+    print(f"entries\t{len(specs)} of {max_entries}")
+    print(f"operations\t{len(stats.entries) - len(specs)}")
+    print(f"size\t{_format_size(stats.size)} of {_format_size(stats.max_size)}")
+    if verbose:
+        for entry in stats.entries:
+            last_access = datetime.fromtimestamp(entry.last_access).isoformat(sep=' ', timespec='seconds')
+            print(f"{last_access}\t{_format_size(entry.size)}\t{entry.spec_link or entry.name}")
+    return 0
+
+
+def _gc(max_size: int | None, max_entries: int | None, max_age: float | None) -> int:
+    removed = gc_disk_cache(max_size=max_size, max_entries=max_entries, max_age=max_age)
+    stats = disk_cache_stats()
+    print(f"removed {len(removed)}, left {len(stats.entries)} ({_format_size(stats.size)})")
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = ArgumentParser(prog='python -m jj_spec_validator')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    warm = commands.add_parser('warm', help='download and parse specs into the disk cache in parallel')
+    warm.add_argument('spec_links', nargs='*', metavar='SPEC_LINK')
+    warm.add_argument('-m', '--module', dest='modules', action='append', default=[],
+                      help='import the module and warm up the specs of its validate_spec decorators')
+    warm.add_argument('-w', '--workers', dest='max_workers', type=int, default=None,
+                      help='number of threads parsing specs')
+    warm.add_argument('--parse-only', dest='is_converted', action='store_false',
+                      help='only parse the specs, operations are converted by the first mock of each one')
+
+    bundle = commands.add_parser('bundle', help='pack spec files into one memory-mapped bundle')
+    bundle.add_argument('filename', metavar='BUNDLE')
+    bundle.add_argument('spec_files', nargs='+', metavar='[NAME=]PATH')
+
+    stats = commands.add_parser('stats', help='show the size and the entries of the disk cache')
+    stats.add_argument('-v', '--verbose', action='store_true', help='list the cached specs, most recently used first')
+
+    gc = commands.add_parser('gc', help='evict the least recently used specs from the disk cache')
+    gc.add_argument('--max-size', type=int, default=None, help='in bytes, Config.CACHE_MAX_SIZE by default')
+    gc.add_argument('--max-entries', type=int, default=None, help='Config.CACHE_MAX_ENTRIES by default')
+    gc.add_argument('--max-age', type=float, default=None,
+                    help='in seconds, remove specs not used for longer')
+
+    args = parser.parse_args(argv)
+    if args.command == 'warm':
+        return _warm(args.spec_links, args.modules, args.max_workers, args.is_converted)
+    elif args.command == 'bundle':
+        return _bundle(args.filename, args.spec_files)
+    elif args.command == 'stats':
+        return _stats(args.verbose)
+    elif args.command == 'gc':
+        return _gc(args.max_size, args.max_entries, args.max_age)
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
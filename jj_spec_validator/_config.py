@@ -2,11 +2,27 @@ class Config:
     # service
     MAIN_DIRECTORY = "spec_validator"
     GET_SPEC_TIMEOUT = 30.0
+    CACHE_LOCK_TIMEOUT = 120.0  # in seconds, how long a process waits for another one downloading the same spec
+    SPEC_REGISTRY_TTL = 3600.0  # in seconds, None keeps parsed specs for the whole process
+    CACHE_TTL = 3600.0  # in seconds, then the cached spec is revalidated with ETag / Last-Modified
+    STALE_WHILE_REVALIDATE = False  # if True - keep validating against an expired spec while it is refreshed in background
+    CACHE_MAX_SIZE = 512 * 1024 * 1024  # in bytes, least recently used specs are evicted from the disk cache over it, None for no limit
+    CACHE_MAX_ENTRIES = 256  # specs in the disk cache, None for no limit
+    SHARED_CACHE_DIRECTORY = None  # read-only _cache_parsed_specs of another cache, e.g. a shared mount or a CI artifact
+    RESULT_CACHE_SIZE = 4096  # memoized validation results of identical mocks, 0 disables memoization
+    STREAMING_THRESHOLD = 1024 * 1024  # in bytes, JSON array bodies over it are validated while parsed, None disables streaming
+    STREAMING_MAX_ERRORS = 10  # mismatched elements a streamed body is reported with, None reports all of them
+    ROUTE_SUGGESTIONS = 5  # closest API methods listed when a mock matches none of the spec
 
     # interface
-    OUTPUT_FUNCTION = None  # can be used for custom output func
+    OUTPUT_FUNCTION = None  # can be used for custom output func, a SpecMatchError is passed to it and raised as well
+    METRICS_FUNCTION = None  # called with a Metric for every timed phase and cache hit / miss, e.g. metrics_summary
 
     # params
     IS_RAISES = False
     IS_STRICT = False
     SKIP_IF_FAILED_TO_GET_SPEC = False
+    IS_DEFERRED = False
+    VALIDATION_POLICY = None  # e.g. ValidateFirst(10), ValidateFraction(0.1) or ValidationBudget(0.05), None validates every mock
+    DEFERRED_WORKERS = None  # threads validating deferred mocks, None for the ThreadPoolExecutor default
+    BULK_WORKERS = None  # processes of validate_many, None for the number of CPUs, 0 validates in the calling process
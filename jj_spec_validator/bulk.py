@@ -0,0 +1,211 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple, Union
+
+from d42.validation import ValidationException
+from jj import RelayResponse
+from jj.mock import Mocked
+
+from ._config import Config
+from .utils import MISSING, PreparedSpec, body_digest, load_spec, result_cache
+from .validator import Validator
+
+__all__ = ('MockValidationResult', 'validate_many', )
+
+# mocks of an API method validated by one task, so a worker compiles its schema once per chunk
+CHUNK_SIZE = 64
+
+_FUNC_NAME = 'validate_many'
+
+# (spec_link, spec unit, position of the mock, raw body)
+_Job = Tuple[str, Tuple[str, str], int, bytes]
+
+# specs of the worker process, passed once by the pool initializer
+_worker_specs: Dict[str, PreparedSpec] = {}
+
+
+class MockValidationResult(NamedTuple):
+    # position of the mock in the `mocks` given to validate_many
+    position: int
+    spec_link: str
+    # (method, path) of the matched API method, None if the mock wasn't matched
+    api_method: Tuple[str, str] | None
+    # None if the mock is valid
+    error: BaseException | None
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None
+
+
+def _make_validator(spec_link: str, is_strict: bool, force_strict: bool, prefix: str | None) -> Validator:
+    return Validator(
+        skip_if_failed_to_get_spec=False,
+        is_raise_error=False,
+        is_strict=is_strict,
+        func_name=_FUNC_NAME,
+        spec_link=spec_link,
+        force_strict=force_strict,
+        prefix=prefix,
+    )
+
+
+def _init_worker(specs: Dict[str, PreparedSpec]) -> None:
+    _worker_specs.update(specs)
+
+
+def _validate_chunk(jobs: List[_Job], is_strict: bool, force_strict: bool,
+                    specs: Dict[str, PreparedSpec] | None = None,
+                    ) -> List[Tuple[int, BaseException | None]]:
+    """
+    Decode and validate the bodies of the mocks of one API method.
+
+    :return: (position of the mock, error or None) for every job.
+    """
+    specs = _worker_specs if specs is None else specs
+    results: List[Tuple[int, BaseException | None]] = []
+    for spec_link, spec_unit_key, index, body in jobs:
+        validator = _make_validator(spec_link, is_strict, force_strict, None)
+        error: BaseException | None
+        try:
+            error = validator.validate_raw_body(spec_unit_key, specs[spec_link], body)
+        except Exception as e:
+            error = e
+        results.append((index, error))
+    return results
+
+
+def _split(mocks: Iterable[Union[Mocked, Tuple[str, Mocked]]],
+           spec_link: str | None,
+           ) -> Dict[str, List[Tuple[int, Mocked]]]:
+    grouped: Dict[str, List[Tuple[int, Mocked]]] = {}
+    for index, item in enumerate(mocks):
+        if isinstance(item, tuple):
+            mock_spec_link, mocked = item
+        elif spec_link is None:
+            raise ValueError(f"No spec link for the mock #{index}: pass `spec_link` or (spec_link, mock) pairs")
+        else:
+            mock_spec_link, mocked = spec_link, item
+        grouped.setdefault(mock_spec_link, []).append((index, mocked))
+    return grouped
+
+
+def validate_many(mocks: Iterable[Union[Mocked, Tuple[str, Mocked]]],
+                  *,
+                  spec_link: str | None = None,
+                  is_strict: bool | None = None,
+                  force_strict: bool = False,
+                  prefix: str | None = None,
+                  workers: int | None = None,
+                  ) -> Iterator[MockValidationResult]:
+    """
+    Validate many mocks at once, e.g. a whole mock library in a nightly job.
+
+    Mocks are grouped by spec and every spec is loaded once. Matchers are resolved against
+    the route index in one batch, identical ones once, then the schema checks run in a process pool.
+    Nothing is printed or raised for invalid mocks, see `MockValidationResult.error`.
+
+    Args:
+        mocks: jj mocks validated against `spec_link`, or (spec_link, mock) pairs.
+        spec_link: The spec of the mocks given without one.
+        is_strict: If True - validate exact structure in given mocked, `Config.IS_STRICT` if None.
+        force_strict: If True - forced remove all Ellipsis from the spec.
+        prefix: Prefix is used to cut paths prefix in mock function.
+        workers: Processes validating the bodies, `Config.BULK_WORKERS` if None, 0 validates in this process.
+    :return: Results of every mock, in the order they are completed.
+    """
+    is_strict = is_strict if is_strict is not None else Config.IS_STRICT
+    workers = workers if workers is not None else Config.BULK_WORKERS
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    specs: Dict[str, PreparedSpec] = {}
+    # (spec unit, spec_link) -> jobs of the mocks matched to it
+    jobs: Dict[Tuple[str, Tuple[str, str]], List[_Job]] = {}
+    # result cache key of every job, to memoize its result once it's known
+    result_keys: Dict[int, Tuple[Any, ...]] = {}
+    # identical mocks are validated once, index of the job -> indexes of the same mocks
+    queued: Dict[Tuple[Any, ...], int] = {}
+    duplicates: Dict[int, List[int]] = {}
+
+    for group_spec_link, group in _split(mocks, spec_link).items():
+        validator = _make_validator(group_spec_link, is_strict, force_strict, prefix)
+        try:
+            prepared_spec = load_spec(validator)
+            if prepared_spec is None:
+                raise ValueError(f"Failed to get the spec from the {group_spec_link}")
+        except Exception as e:
+            for index, _ in group:
+                yield MockValidationResult(index, group_spec_link, None, e)
+            continue
+        specs[group_spec_link] = prepared_spec
+
+        resolved: Dict[str, Tuple[str, str] | BaseException] = {}
+        for index, mocked in group:
+            if isinstance(mocked.handler.response, RelayResponse):
+                yield MockValidationResult(index, group_spec_link, None,
+                                           TypeError("RelayResponse type is not supported"))
+                continue
+            try:
+                spec_matcher = validator.create_spec_matcher(mocked.handler.matcher)
+            except AssertionError as e:
+                yield MockValidationResult(index, group_spec_link, None, e)
+                continue
+
+            matcher_key = repr(spec_matcher)
+            if matcher_key not in resolved:
+                try:
+                    resolved[matcher_key] = validator.match_spec_unit(spec_matcher, prepared_spec)
+                except AssertionError as e:
+                    resolved[matcher_key] = e
+            spec_unit_key = resolved[matcher_key]
+            if isinstance(spec_unit_key, BaseException):
+                yield MockValidationResult(index, group_spec_link, None, spec_unit_key)
+                continue
+
+            body = mocked.handler.response.get_body()
+            result_key = (prepared_spec.version, matcher_key, is_strict, force_strict, body_digest(body))
+            result = result_cache.get(result_key)
+            if result is not MISSING:
+                yield MockValidationResult(index, group_spec_link, spec_unit_key, result)
+                continue
+            if result_key in queued:
+                duplicates[queued[result_key]].append(index)
+                continue
+            queued[result_key] = index
+            duplicates[index] = []
+            result_keys[index] = result_key
+            jobs.setdefault((group_spec_link, spec_unit_key), []).append(
+                (group_spec_link, spec_unit_key, index, body))
+
+    chunks = [unit_jobs[i:i + CHUNK_SIZE] for unit_jobs in jobs.values()
+              for i in range(0, len(unit_jobs), CHUNK_SIZE)]
+    unit_of = {job[2]: (job[0], job[1]) for chunk in chunks for job in chunk}
+
+    def to_results(chunk_results: List[Tuple[int, BaseException | None]]) -> Iterator[MockValidationResult]:
+        for index, error in chunk_results:
+            if error is None or isinstance(error, ValidationException):
+                result_cache.put(result_keys[index], error)
+            chunk_spec_link, spec_unit_key = unit_of[index]
+            for mock_index in (index, *duplicates[index]):
+                yield MockValidationResult(mock_index, chunk_spec_link, spec_unit_key, error)
+
+    if workers == 0 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from to_results(_validate_chunk(chunk, is_strict, force_strict, specs))
+        return
+
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                   initializer=_init_worker, initargs=(specs,))
+    try:
+        pending: Set['Future[List[Tuple[int, BaseException | None]]]'] = {
+            executor.submit(_validate_chunk, chunk, is_strict, force_strict) for chunk in chunks
+        }
+        while pending:
+            done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from to_results(future.result())
+    finally:
+        # the results may be abandoned by the caller, the rest of the chunks are not validated then
+        executor.shutdown(wait=True, cancel_futures=True)
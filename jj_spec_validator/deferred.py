@@ -0,0 +1,125 @@
+import asyncio
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import TYPE_CHECKING, List, Set
+
+from ._config import Config
+
+if TYPE_CHECKING:
+    from jj.matchers import ResolvableMatcher
+
+    from .validator import Validator
+
+__all__ = ('DeferredValidationError', 'DeferredQueue', 'deferred_queue', 'flush', 'flush_async', )
+
+
+class DeferredValidationError(AssertionError):
+    """
+    All errors raised by deferred validations since the previous flush.
+    """
+
+    def __init__(self, errors: List[BaseException]) -> None:
+        self.errors = errors
+        message = "\n".join(f"{type(e).__name__}: {e}" for e in errors)
+        super().__init__(f"{len(errors)} deferred validation(s) failed:\n{message}")
+
+
+class DeferredQueue:
+    """
+    Validations submitted by the `validate_spec` wrappers in deferred mode,
+    run by a pool of `Config.DEFERRED_WORKERS` threads.
+
+    Errors that haven't been flushed by the end of the process are output at exit.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: Set['Future[None]'] = set()
+        self._failed: List['Future[None]'] = []
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=Config.DEFERRED_WORKERS,
+                                                    thread_name_prefix='spec-validator')
+                # called after the pool has finished the submitted validations
+                atexit.register(self._flush_at_exit)
+            return self._executor
+
+    def _on_done(self, future: 'Future[None]') -> None:
+        with self._lock:
+            self._pending.discard(future)
+            # successful validations are forgotten right away, failures wait for the flush
+            if future.exception() is not None:
+                self._failed.append(future)
+
+    def _flush_at_exit(self) -> None:
+        try:
+            self.flush()
+        except DeferredValidationError as e:
+            text = "Deferred validations failed and were not flushed before exit"
+            if Config.OUTPUT_FUNCTION is None:
+                print(f"⚠️ ⚠️ ⚠️ {text} :\n{str(e)}\n")
+            else:
+                Config.OUTPUT_FUNCTION('flush', e, text)
+
+    def submit(self, validator: 'Validator', mock_matcher: 'ResolvableMatcher', mocked_body: bytes) -> 'Future[None]':
+        future = self._get_executor().submit(validator.validate_response, mock_matcher, mocked_body)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _take_errors(self) -> List[BaseException]:
+        with self._lock:
+            failed, self._failed = self._failed, []
+        errors = []
+        for future in failed:
+            error = future.exception()
+            if error is not None:
+                errors.append(error)
+        return errors
+
+    def flush(self) -> None:
+        """
+        Wait for all submitted validations.
+
+        Raises:
+            DeferredValidationError: If any of them has failed: a mismatch with `is_raise_error`,
+                an unknown API method, a non-JSON body, etc.
+        """
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                break
+            for future in pending:
+                future.exception()
+        if errors := self._take_errors():
+            raise DeferredValidationError(errors)
+
+    async def flush_async(self) -> None:
+        """
+        Same as `flush`, without blocking the event loop.
+        """
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                break
+            await asyncio.gather(*(asyncio.wrap_future(future) for future in pending), return_exceptions=True)
+        if errors := self._take_errors():
+            raise DeferredValidationError(errors)
+
+
+deferred_queue = DeferredQueue()
+
+
+def flush() -> None:
+    deferred_queue.flush()
+
+
+async def flush_async() -> None:
+    await deferred_queue.flush_async()
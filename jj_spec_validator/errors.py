@@ -0,0 +1,50 @@
+from typing import List, Tuple
+
+__all__ = ('SpecMatchError', 'RouteNotFoundError', 'AmbiguousRouteError', )
+
+
+class SpecMatchError(AssertionError):
+    """
+    The mock doesn't match exactly one API method of the spec.
+
+    The message is formatted on demand, from the fields.
+    """
+
+    def __init__(self,
+                 mocked_api_method: str,
+                 spec_link: str | None,
+                 func_name: str,
+                 candidates: List[Tuple[str, str]],
+                 ) -> None:
+        super().__init__(mocked_api_method, spec_link, func_name, candidates)
+        # repr of the spec matcher built from the mock
+        self.mocked_api_method = mocked_api_method
+        self.spec_link = spec_link
+        self.func_name = func_name
+        # (method, path) of the API methods of the spec, see the subclasses
+        self.candidates = candidates
+
+    def _format_candidates(self, title: str) -> str:
+        if not self.candidates:
+            return ""
+        return f"\n{title}:\n" + "\n".join(f"  {method} {path}" for method, path in self.candidates)
+
+
+class RouteNotFoundError(SpecMatchError):
+    """
+    No API method of the spec matches the mock, `candidates` are the closest ones.
+    """
+
+    def __str__(self) -> str:
+        return (f"Mocked API method: '{self.mocked_api_method}'\nwas not found in the {self.spec_link} "
+                f"for the validation of {self.func_name}." + self._format_candidates("Closest API methods"))
+
+
+class AmbiguousRouteError(SpecMatchError):
+    """
+    Several API methods of the spec match the mock, `candidates` are all of them.
+    """
+
+    def __str__(self) -> str:
+        return (f"There is more than 1 matches for mocked API method '{self.mocked_api_method}\n"
+                f"in the {self.spec_link}." + self._format_candidates("Matched API methods"))
@@ -0,0 +1,135 @@
+import random
+from threading import Lock
+from time import monotonic
+from typing import Dict, List, NamedTuple
+
+__all__ = ('PolicyStats', 'ValidationPolicy', 'ValidateFirst', 'ValidateFraction', 'ValidationBudget', )
+
+
+class PolicyStats(NamedTuple):
+    validated: int
+    skipped: int
+
+
+class ValidationPolicy:
+    """
+    Decides which mocks of the `validate_spec` functions are validated, e.g. in long-lived mock servers
+    re-registering mocks all the time. Decisions are counted per function, see `stats` and `report`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._stats: Dict[str, List[int]] = {}
+
+    def _decide(self, func_name: str, validated: int) -> bool:
+        """
+        Called under the lock.
+
+        Args:
+            validated: Mocks of the function validated so far.
+        """
+        raise NotImplementedError()
+
+    def should_validate(self, func_name: str) -> bool:
+        with self._lock:
+            stat = self._stats.get(func_name)
+            if stat is None:
+                stat = self._stats[func_name] = [0, 0]
+            is_validated = self._decide(func_name, stat[0])
+            stat[0 if is_validated else 1] += 1
+        return is_validated
+
+    def record(self, func_name: str, duration: float) -> None:
+        """
+        Account the time a validation of the function has taken, in seconds.
+        """
+
+    def stats(self) -> Dict[str, PolicyStats]:
+        with self._lock:
+            return {func_name: PolicyStats(*stat) for func_name, stat in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def report(self) -> str:
+        """
+        :return: Validated and skipped mocks of every function, e.g. to print at the end of the run.
+        """
+        lines = [f"{'function':<40}{'validated':>12}{'skipped':>12}"]
+        for func_name, stat in sorted(self.stats().items()):
+            lines.append(f"{func_name:<40}{stat.validated:>12}{stat.skipped:>12}")
+        return '\n'.join(lines)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}()"
+
+
+class ValidateFirst(ValidationPolicy):
+    """
+    Validate the first `count` mocks of every function.
+    """
+
+    def __init__(self, count: int) -> None:
+        super().__init__()
+        self._count = count
+
+    def _decide(self, func_name: str, validated: int) -> bool:
+        return validated < self._count
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self._count!r})"
+
+
+class ValidateFraction(ValidationPolicy):
+    """
+    Validate a random `fraction` of the mocks, `seed` makes the choice reproducible.
+    """
+
+    def __init__(self, fraction: float, seed: int | None = None) -> None:
+        super().__init__()
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError(f"fraction must be between 0 and 1, got {fraction}")
+        self._fraction = fraction
+        self._random = random.Random(seed)
+
+    def _decide(self, func_name: str, validated: int) -> bool:
+        return self._random.random() < self._fraction
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self._fraction!r})"
+
+
+class ValidationBudget(ValidationPolicy):
+    """
+    Spend at most `seconds_per_second` on validation per second of wall time, shared by all functions.
+
+    The budget refills continuously and may be overdrawn by the last validation, the mocks are skipped
+    until it's paid off. The first mock of every function is validated regardless, so each one is covered.
+    """
+
+    def __init__(self, seconds_per_second: float) -> None:
+        super().__init__()
+        if seconds_per_second <= 0:
+            raise ValueError(f"seconds_per_second must be positive, got {seconds_per_second}")
+        self._rate = seconds_per_second
+        self._balance = seconds_per_second
+        self._refilled_at = monotonic()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        # at most a second worth of budget is saved up
+        self._balance = min(self._rate, self._balance + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def _decide(self, func_name: str, validated: int) -> bool:
+        self._refill()
+        return validated == 0 or self._balance > 0
+
+    def record(self, func_name: str, duration: float) -> None:
+        with self._lock:
+            self._refill()
+            self._balance -= duration
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self._rate!r})"
@@ -1,6 +1,61 @@
-from ._cacheir import load_cache
-from ._common import destroy_prefix, normalize_path, validate_non_strict
-from ._refiner import get_forced_strict_spec
-from ._spec_matcher import create_openapi_matcher
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
 
-__all__ = ('load_cache', 'destroy_prefix', 'normalize_path', 'validate_non_strict', 'get_forced_strict_spec', 'create_openapi_matcher')
\ No newline at end of file
+if TYPE_CHECKING:
+    from ._cache_index import CacheEntryInfo, DiskCacheStats
+    from ._cacheir import close_async_client, disk_cache_stats, gc_disk_cache, load_cache, load_cache_async
+    from ._common import destroy_prefix, normalize_path, validate_non_strict
+    from ._compiler import CompiledValidator, compile_schema
+    from ._interner import intern_schema
+    from ._metrics import Metric, MetricsSummary, metrics_summary
+    from ._prepared_spec import PreparedSpec
+    from ._refiner import get_forced_strict_spec
+    from ._registry import invalidate_spec, load_spec, load_spec_async, spec_registry
+    from ._result_cache import (MISSING, ResultCacheInfo, body_digest, clear_validation_cache, result_cache,
+                                validation_cache_info)
+    from ._spec_matcher import create_openapi_matcher
+    from ._spec_source import build_bundle, is_local_spec
+    from ._streaming import is_json_array, is_streamable, iter_json_array, validate_stream
+
+__all__ = ('load_cache', 'load_cache_async', 'close_async_client', 'load_spec', 'load_spec_async', 'invalidate_spec', 'spec_registry', 'PreparedSpec', 'destroy_prefix', 'normalize_path', 'validate_non_strict', 'get_forced_strict_spec', 'create_openapi_matcher',
+           'MISSING', 'ResultCacheInfo', 'body_digest', 'result_cache',
+           'validation_cache_info', 'clear_validation_cache', 'CompiledValidator', 'compile_schema',
+           'intern_schema', 'build_bundle', 'is_local_spec', 'Metric', 'MetricsSummary', 'metrics_summary',
+           'CacheEntryInfo', 'DiskCacheStats', 'disk_cache_stats', 'gc_disk_cache',
+           'iter_json_array', 'is_json_array', 'is_streamable', 'validate_stream')
+
+# name -> submodule, submodules are imported on first access:
+# httpx, PyYAML, schemax_openapi, d42 and aiohttp are only needed once a spec is loaded
+_SUBMODULES: Dict[str, str] = {
+    'load_cache': '_cacheir', 'load_cache_async': '_cacheir', 'close_async_client': '_cacheir',
+    'disk_cache_stats': '_cacheir', 'gc_disk_cache': '_cacheir',
+    'CacheEntryInfo': '_cache_index', 'DiskCacheStats': '_cache_index',
+    'destroy_prefix': '_common', 'normalize_path': '_common', 'validate_non_strict': '_common',
+    'CompiledValidator': '_compiler', 'compile_schema': '_compiler',
+    'intern_schema': '_interner',
+    'Metric': '_metrics', 'MetricsSummary': '_metrics', 'metrics_summary': '_metrics',
+    'PreparedSpec': '_prepared_spec',
+    'get_forced_strict_spec': '_refiner',
+    'invalidate_spec': '_registry', 'load_spec': '_registry', 'load_spec_async': '_registry',
+    'spec_registry': '_registry',
+    'MISSING': '_result_cache', 'ResultCacheInfo': '_result_cache', 'body_digest': '_result_cache',
+    'clear_validation_cache': '_result_cache', 'result_cache': '_result_cache',
+    'validation_cache_info': '_result_cache',
+    'create_openapi_matcher': '_spec_matcher',
+    'build_bundle': '_spec_source', 'is_local_spec': '_spec_source',
+    'iter_json_array': '_streaming', 'is_json_array': '_streaming', 'is_streamable': '_streaming',
+    'validate_stream': '_streaming',
+}
+
+
+def __getattr__(name: str) -> Any:
+    submodule = _SUBMODULES.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f'.{submodule}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,202 @@
+import json
+from os import listdir, makedirs, path, replace, stat, unlink
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import monotonic, time
+from typing import Any, Dict, List, NamedTuple
+
+from .._config import Config
+from ._file_lock import FileLock
+
+__all__ = ('CacheIndex', 'CacheEntryInfo', 'DiskCacheStats', )
+
+INDEX_FORMAT_VERSION = 1
+
+ARTIFACT_SUFFIX = '.cache.yml'
+# converted operations, see _cacheir._DiskUnitStore
+UNIT_SUFFIX = '.unit.pkl'
+LOCK_SUFFIX = '.lock'
+TMP_SUFFIX = '.tmp'
+# temporary files of interrupted writes are removed by the gc after it
+_TMP_MAX_AGE = 3600.0  # in seconds
+# an artifact's last access is written to the index at most once per interval by each process
+_TOUCH_INTERVAL = 60.0  # in seconds
+
+
+class CacheEntryInfo(NamedTuple):
+    # artifact file name in the cache directory
+    name: str
+    spec_link: str
+    size: int
+    last_access: float
+    # PreparedSpec.version of the cached spec
+    version: str
+
+
+class DiskCacheStats(NamedTuple):
+    entries: List[CacheEntryInfo]
+    size: int
+    max_size: int | None
+    max_entries: int | None
+
+
+class CacheIndex:
+    """
+    Size, last access and spec version of every artifact in the disk cache, kept in a small JSON file.
+
+    Entries are addressed by the artifact name, so lookups and updates don't scan the directory.
+    The index is shared by processes: it's changed under a file lock and replaced atomically.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+        self._filename = path.join(directory, 'index.json')
+        # artifact name -> monotonic time of its last touch written by this process
+        self._touched: Dict[str, float] = {}
+        self._touched_lock = Lock()
+
+    def _lock(self) -> FileLock:
+        makedirs(self._directory, exist_ok=True)
+        return FileLock(self._filename + LOCK_SUFFIX, timeout=Config.CACHE_LOCK_TIMEOUT)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._filename, 'rb') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            # missing or broken, the gc rebuilds it from the directory
+            return {}
+        if not isinstance(index, dict) or index.get('format') != INDEX_FORMAT_VERSION:
+            return {}
+        entries: Dict[str, Dict[str, Any]] = index.get('entries', {})
+        return entries
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        with NamedTemporaryFile('w', dir=self._directory, suffix=TMP_SUFFIX, delete=False) as f:
+            try:
+                json.dump({'format': INDEX_FORMAT_VERSION, 'entries': entries}, f, separators=(',', ':'))
+            except BaseException:
+                f.close()
+                unlink(f.name)
+                raise
+        replace(f.name, self._filename)
+
+    def _remove_artifact(self, name: str) -> bool:
+        # processes that have already opened it keep reading, the others rebuild the spec
+        try:
+            unlink(path.join(self._directory, name))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # still open by a reader on Windows
+            return False
+        return True
+
+    def _evict(self, entries: Dict[str, Dict[str, Any]], keep: str | None,
+               max_size: int | None, max_entries: int | None) -> List[str]:
+        size = sum(entry['size'] for entry in entries.values())
+        # converted operations count in the size only, the entries limit is of specs
+        specs = sum(1 for name in entries if name.endswith(ARTIFACT_SUFFIX))
+        evicted = []
+        for name in sorted(entries, key=lambda name: entries[name]['last_access']):
+            is_over_size = max_size is not None and size > max_size
+            is_over_entries = max_entries is not None and specs > max_entries
+            if not is_over_size and not is_over_entries:
+                break
+            is_spec = name.endswith(ARTIFACT_SUFFIX)
+            if name == keep or not (is_over_size or is_spec) or not self._remove_artifact(name):
+                continue
+            size -= entries.pop(name)['size']
+            if is_spec:
+                specs -= 1
+            evicted.append(name)
+        return evicted
+
+    def add(self, name: str, spec_link: str, version: str) -> None:
+        """
+        Record the artifact just written and evict the least recently used ones over the limits.
+        """
+        with self._lock():
+            try:
+                size = stat(path.join(self._directory, name)).st_size
+            except FileNotFoundError:
+                # evicted by a gc of another thread or process since it was written,
+                # the spec is loaded anyway and written again by the next load
+                return
+            entries = self._read()
+            entries[name] = {'spec_link': spec_link, 'size': size, 'last_access': time(), 'version': version}
+            self._evict(entries, name, Config.CACHE_MAX_SIZE, Config.CACHE_MAX_ENTRIES)
+            self._write(entries)
+
+    def touch(self, name: str) -> None:
+        """
+        Mark the artifact as accessed, it's evicted the last.
+
+        Throttled by `_TOUCH_INTERVAL`: the eviction order only needs the access time roughly,
+        and a cache hit shouldn't lock and rewrite the index every time.
+        """
+        now = monotonic()
+        with self._touched_lock:
+            if now - self._touched.get(name, -_TOUCH_INTERVAL) < _TOUCH_INTERVAL:
+                return
+            self._touched[name] = now
+        with self._lock():
+            entries = self._read()
+            if name not in entries:
+                # written by a version without the index, the gc picks it up
+                return
+            entries[name]['last_access'] = time()
+            self._write(entries)
+
+    def stats(self) -> DiskCacheStats:
+        entries = [CacheEntryInfo(name, entry['spec_link'], entry['size'], entry['last_access'], entry['version'])
+                   for name, entry in self._read().items()]
+        entries.sort(key=lambda entry: entry.last_access, reverse=True)
+        return DiskCacheStats(entries, sum(entry.size for entry in entries),
+                              Config.CACHE_MAX_SIZE, Config.CACHE_MAX_ENTRIES)
+
+    def gc(self,
+           max_size: int | None = None,
+           max_entries: int | None = None,
+           max_age: float | None = None,
+           ) -> List[str]:
+        """
+        Reconcile the index with the directory, then evict artifacts over the limits.
+
+        Args:
+            max_size: In bytes, `Config.CACHE_MAX_SIZE` if None.
+            max_entries: `Config.CACHE_MAX_ENTRIES` if None.
+            max_age: In seconds, entries not accessed for longer are removed.
+        :return: Names of the removed artifacts.
+        """
+        if not path.isdir(self._directory):
+            return []
+        max_size = max_size if max_size is not None else Config.CACHE_MAX_SIZE
+        max_entries = max_entries if max_entries is not None else Config.CACHE_MAX_ENTRIES
+        now = time()
+        with self._lock():
+            entries = self._read()
+            names = set(listdir(self._directory))
+            for name in names:
+                try:
+                    file_stat = stat(path.join(self._directory, name))
+                except FileNotFoundError:
+                    continue
+                # converted operations are only indexed here, indexing every conversion would cost more than it
+                if name.endswith((ARTIFACT_SUFFIX, UNIT_SUFFIX)) and name not in entries:
+                    entries[name] = {'spec_link': '', 'size': file_stat.st_size,
+                                     'last_access': file_stat.st_mtime, 'version': ''}
+                elif name.endswith(TMP_SUFFIX) and now - file_stat.st_mtime > _TMP_MAX_AGE:
+                    unlink(path.join(self._directory, name))
+            for name in [name for name in entries if name not in names]:
+                del entries[name]
+
+            removed = []
+            if max_age is not None:
+                for name in [name for name, entry in entries.items() if now - entry['last_access'] > max_age]:
+                    if self._remove_artifact(name):
+                        del entries[name]
+                        removed.append(name)
+            removed += self._evict(entries, None, max_size, max_entries)
+            self._write(entries)
+        return removed
@@ -1,30 +1,85 @@
+import asyncio
 import json
-from hashlib import md5
-from os import makedirs, path, remove
-from pickle import dump
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from functools import lru_cache
+from hashlib import md5, sha256
+from importlib.metadata import PackageNotFoundError, version
+from os import listdir, makedirs, path, replace, unlink
+from pickle import HIGHEST_PROTOCOL, UnpicklingError, dump
 from pickle import load as pickle_load
+from tempfile import NamedTemporaryFile
+from threading import Lock
 from time import time
-from typing import Any, Dict, List, Tuple
+from typing import IO, Any, Callable, ContextManager, Dict, List, NamedTuple
+from weakref import WeakKeyDictionary
 
 import httpx
-from schemax_openapi import SchemaData, collect_schema_data
-from yaml import CLoader, load
+from schemax_openapi import SchemaData
 
 from .._config import Config
 from ..validator_base import BaseValidator
+from ._cache_index import ARTIFACT_SUFFIX, LOCK_SUFFIX, TMP_SUFFIX, UNIT_SUFFIX, CacheIndex, DiskCacheStats
+from ._file_lock import FileLock
+from ._metrics import count, timer
+from ._prepared_spec import PreparedSpec, SpecUnitKey
+from ._spec_parser import parse_spec
+from ._spec_source import get_local_fingerprint, is_local_spec, read_local_spec
 
-__all__ = ('load_cache', )
+__all__ = ('load_cache', 'load_cache_async', 'read_stale_cache', 'close_async_client', 'disk_cache_stats',
+           'gc_disk_cache', )
 
 CACHE_DIR = Config.MAIN_DIRECTORY + '/_cache_parsed_specs'
-CACHE_TTL = 3600  # in second
 
+# size, last access and version of the artifacts, for the LRU eviction
+_cache_index = CacheIndex(CACHE_DIR)
 
-def _build_entity_dict(entities: List[SchemaData]) -> Dict[Tuple[str, str], SchemaData]:
-    entity_dict = {}
-    for entity in entities:
-        entity_key = (entity.http_method.upper(), entity.path)
-        entity_dict[entity_key] = entity
-    return entity_dict
+_async_clients: 'WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]' = WeakKeyDictionary()
+# loops of different threads create their clients concurrently
+_async_clients_lock = Lock()
+
+# bump on any change of the pickled artifact layout or of the links
+ARTIFACT_FORMAT_VERSION = 8
+
+# spec link -> content hash of its artifact, named after md5 of the link
+LINK_SUFFIX = '.link'
+
+
+def _package_version(name: str) -> str:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def _artifact_stamp() -> Dict[str, Any]:
+    # artifacts hold pickled d42 / schemax_openapi objects, so they are only valid
+    # for the exact versions of the libraries that produced them
+    return {
+        'format': ARTIFACT_FORMAT_VERSION,
+        'jj-spec-validator': _package_version('jj-spec-validator'),
+        'schemax-openapi': _package_version('schemax-openapi'),
+        'd42': _package_version('d42'),
+    }
+
+
+@lru_cache(maxsize=None)
+def _stamp_digest() -> str:
+    # the versions don't change while the process runs
+    return sha256(json.dumps(_artifact_stamp(), sort_keys=True).encode()).hexdigest()
+
+
+class _CachedLink(NamedTuple):
+    # ETag / Last-Modified of the response the spec was built from, or the fingerprint of a local spec
+    validators: Dict[str, str]
+    # sha256 of the raw spec, its artifact is shared by all links with the same content
+    content_hash: str
+
+
+class _CacheEntry(NamedTuple):
+    validators: Dict[str, str]
+    content_hash: str
+    spec: PreparedSpec
 
 
 def _validate_cache_file(filename: str) -> bool:
@@ -33,103 +88,511 @@ def _validate_cache_file(filename: str) -> bool:
 
     file_age = time() - path.getmtime(filename)
 
-    if file_age > CACHE_TTL:
-        remove(filename)
+    if file_age > Config.CACHE_TTL:
+        # not removed: it is revalidated and other processes may still read it
         return False
 
     return True
 
 
-def _get_cache_filename(url: str) -> str:
+def _cache_directories() -> List[str]:
+    # the own cache goes first, the shared one is only read
+    if Config.SHARED_CACHE_DIRECTORY is None:
+        return [CACHE_DIR]
+    return [CACHE_DIR, Config.SHARED_CACHE_DIRECTORY]
+
+
+def _get_link_filename(url: str, directory: str | None = None) -> str:
     hash_obj = md5(url.encode())
-    return path.join(CACHE_DIR, hash_obj.hexdigest() + '.cache' + '.yml')
+    return path.join(directory or CACHE_DIR, hash_obj.hexdigest() + LINK_SUFFIX)
 
 
-def _download_spec(validator: BaseValidator) -> httpx.Response | None:
-    response = None
+def _get_artifact_filename(content_hash: str, directory: str | None = None) -> str:
+    return path.join(directory or CACHE_DIR, content_hash + ARTIFACT_SUFFIX)
+
+
+def _get_spec_link(validator: BaseValidator) -> str:
+    if validator.spec_link is None:
+        raise ValueError("Spec link cannot be None")
+    return validator.spec_link
+
+
+def _handle_download_error(validator: BaseValidator, e: Exception) -> bool:
+    """
+    Report the download error, or raise it with a readable message.
+
+    :return: True if the spec should be treated as unavailable.
+    """
     if validator.skip_if_failed_to_get_spec:
-        try:
-            response = httpx.get(validator.spec_link, timeout=Config.GET_SPEC_TIMEOUT)
-            response.raise_for_status()
-        except httpx.ConnectTimeout as e:
+        if isinstance(e, httpx.ConnectTimeout):
             validator.output(e, f"Timeout occurred while trying to connect to the {validator.spec_link}.")
-            return None
-        except httpx.ReadTimeout as e:
+        elif isinstance(e, httpx.ReadTimeout):
             validator.output(e, f"Timeout occurred while trying to read the spec from the {validator.spec_link}.")
-            return None
-        except httpx.HTTPStatusError as e:
+        elif isinstance(e, httpx.HTTPStatusError):
             status_code = e.response.status_code
             if 400 <= status_code < 500:
                 validator.output(e, f"Client error occurred: {status_code} {e.response.reason_phrase}")
-                return None
             elif 500 <= status_code < 600:
                 validator.output(e, f"Server error occurred: {status_code} {e.response.reason_phrase}")
-                return None
-        except httpx.HTTPError as e:
-            validator.output(e, f"An error occurred while trying to download the spec: {e}")
-            return None
-        except Exception as e:
+            else:
+                return False
+        else:
             validator.output(e, f"An error occurred while trying to download the spec: {e}")
-            return None
-        return response
+        return True
     else:
-        try:
-            response = httpx.get(validator.spec_link, timeout=Config.GET_SPEC_TIMEOUT)
-            response.raise_for_status()
-        except httpx.ConnectTimeout:
+        if isinstance(e, httpx.ConnectTimeout):
             raise httpx.ConnectTimeout(f"Timeout occurred while trying to connect to the {validator.spec_link}.")
-        except httpx.ReadTimeout:
+        elif isinstance(e, httpx.ReadTimeout):
             raise httpx.ReadTimeout(f"Timeout occurred while trying to read the spec from the {validator.spec_link}.")
-        except httpx.HTTPStatusError as e:
+        elif isinstance(e, httpx.HTTPStatusError):
             status_code = e.response.status_code
             if 400 <= status_code < 500:
                 raise ValueError(f"Client error occurred: {status_code} {e.response.reason_phrase}")
             elif 500 <= status_code < 600:
                 raise RuntimeError(f"Server error occurred: {status_code} {e.response.reason_phrase}")
-        except httpx.HTTPError as e:
+            return False
+        elif isinstance(e, httpx.HTTPError):
             raise httpx.HTTPError(f"An error occurred while trying to download the spec: {e}")
-        except Exception as e:
+        else:
             raise ValueError(f"An error occurred while trying to download the spec: {e}")
 
-        return response
 
+def _download_spec(validator: BaseValidator, headers: Dict[str, str] | None = None) -> httpx.Response | None:
+    response = None
+    try:
+        with timer('download', validator.spec_link, validator.func_name):
+            response = httpx.get(_get_spec_link(validator), headers=headers, timeout=Config.GET_SPEC_TIMEOUT)
+        if response.status_code != httpx.codes.NOT_MODIFIED:
+            response.raise_for_status()
+    except Exception as e:
+        if _handle_download_error(validator, e):
+            return None
+    return response
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    # connections of an AsyncClient belong to the loop they were opened in
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = _async_clients[loop] = httpx.AsyncClient(timeout=Config.GET_SPEC_TIMEOUT)
+    return client
+
+
+async def close_async_client() -> None:
+    """
+    Close the pooled httpx.AsyncClient of the running event loop, if any.
+    """
+    with _async_clients_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def _download_spec_async(validator: BaseValidator,
+                               headers: Dict[str, str] | None = None,
+                               ) -> httpx.Response | None:
+    response = None
+    try:
+        with timer('download', validator.spec_link, validator.func_name):
+            response = await _get_async_client().get(_get_spec_link(validator), headers=headers,
+                                                     timeout=Config.GET_SPEC_TIMEOUT)
+        if response.status_code != httpx.codes.NOT_MODIFIED:
+            response.raise_for_status()
+    except Exception as e:
+        if _handle_download_error(validator, e):
+            return None
+    return response
+
+
+def _get_cache_validators(raw_spec: httpx.Response) -> Dict[str, str]:
+    validators = {}
+    if etag := raw_spec.headers.get('ETag'):
+        validators['If-None-Match'] = etag
+    if last_modified := raw_spec.headers.get('Last-Modified'):
+        validators['If-Modified-Since'] = last_modified
+    return validators
 
-def _save_cache(spec_link: str, raw_schema: dict[str, Any]) -> None:
-    filename = _get_cache_filename(spec_link)
+
+def _write_atomically(filename: str, write: Callable[[IO[bytes]], None]) -> None:
     makedirs(CACHE_DIR, exist_ok=True)
-    with open(filename, 'wb') as f:
-        dump(raw_schema, f)
+    # written aside and renamed, so concurrent readers never see a half-written file
+    with NamedTemporaryFile('wb', dir=CACHE_DIR, suffix=TMP_SUFFIX, delete=False) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            unlink(f.name)
+            raise
+    replace(f.name, filename)
+
+
+def _save_artifact(spec_link: str, content_hash: str, prepared_spec: PreparedSpec) -> None:
+    def write(f: IO[bytes]) -> None:
+        # the stamp goes first, so stale artifacts are rejected without unpickling the payload
+        dump(_artifact_stamp(), f, protocol=HIGHEST_PROTOCOL)
+        dump(prepared_spec, f, protocol=HIGHEST_PROTOCOL)
+
+    filename = _get_artifact_filename(content_hash)
+    _write_atomically(filename, write)
+    _cache_index.add(path.basename(filename), spec_link, prepared_spec.version)
+
+
+class _DiskUnitStore:
+    """
+    Converted operations of every spec in the cache directories, one file per operation.
+
+    Files are named after the content hash of the operation, so they are shared by all the specs
+    and versions of a spec with the same operation, and by the library versions in the stamp.
+    """
+
+    def _get_filename(self, unit_hash: str, key: SpecUnitKey, directory: str | None = None) -> str:
+        http_method, spec_path = key
+        # enum parameters make several units of one operation
+        name = sha256('\0'.join((_stamp_digest(), unit_hash, http_method, spec_path)).encode()).hexdigest()
+        return path.join(directory or CACHE_DIR, name + UNIT_SUFFIX)
+
+    def get(self, unit_hash: str, key: SpecUnitKey) -> SchemaData | None:
+        for directory in _cache_directories():
+            try:
+                with open(self._get_filename(unit_hash, key, directory), 'rb') as f:
+                    unit: SchemaData = pickle_load(f)
+            except (OSError, EOFError, UnpicklingError, AttributeError, ImportError, TypeError):
+                continue
+            return unit
+        return None
+
+    def put(self, unit_hash: str, key: SpecUnitKey, unit: SchemaData) -> None:
+        filename = self._get_filename(unit_hash, key)
+        if path.exists(filename):
+            # saved by another process meanwhile, it's the same conversion
+            return
+
+        def write(f: IO[bytes]) -> None:
+            dump(unit, f, protocol=HIGHEST_PROTOCOL)
+
+        try:
+            _write_atomically(filename, write)
+        except OSError:
+            # the conversion is in memory anyway, it's only not shared
+            pass
+
 
+_unit_store = _DiskUnitStore()
 
-def load_cache(validator: BaseValidator) -> Dict[Tuple[str, str], SchemaData] | None:
-    filename = _get_cache_filename(validator.spec_link)
 
-    if _validate_cache_file(filename):
+def _save_link(spec_link: str, validators: Dict[str, str], content_hash: str) -> None:
+    # its mtime is the freshness of the spec behind the link
+    link = {'format': ARTIFACT_FORMAT_VERSION, 'spec_link': spec_link, 'validators': validators,
+            'content_hash': content_hash}
+
+    def write(f: IO[bytes]) -> None:
+        f.write(json.dumps(link).encode())
+
+    _write_atomically(_get_link_filename(spec_link), write)
+
+
+def _read_link(filename: str) -> Dict[str, Any] | None:
+    try:
         with open(filename, 'rb') as f:
-            raw_schema = pickle_load(f)
+            link = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(link, dict) or link.get('format') != ARTIFACT_FORMAT_VERSION:
+        return None
+    return link
+
+
+def _read_artifact(content_hash: str) -> PreparedSpec | None:
+    for directory in _cache_directories():
+        filename = _get_artifact_filename(content_hash, directory)
+        try:
+            with open(filename, 'rb') as f:
+                if pickle_load(f) != _artifact_stamp():
+                    continue
+                prepared_spec: PreparedSpec = pickle_load(f)
+        except (OSError, EOFError, UnpicklingError, AttributeError, ImportError, TypeError):
+            # missing, unreadable or produced by an incompatible version, will be rebuilt
+            continue
+        prepared_spec.unit_store = _unit_store
+        if directory == CACHE_DIR:
+            _cache_index.touch(path.basename(filename))
+        return prepared_spec
+    return None
+
+
+def _find_link(spec_link: str) -> _CachedLink | None:
+    """
+    Read the link of the own cache directory, then of the shared one, regardless of its age and without the artifact.
+    """
+    for directory in _cache_directories():
+        link = _read_link(_get_link_filename(spec_link, directory))
+        if link is not None:
+            return _CachedLink(link['validators'], link['content_hash'])
+    return None
+
+
+def _read_cache(spec_link: str,
+                is_fresh: bool = False,
+                validators: Dict[str, str] | None = None,
+                ) -> _CacheEntry | None:
+    """
+    Read the cached spec of the link from the own cache directory, then from the shared one.
+
+    Args:
+        is_fresh: If True - links older than Config.CACHE_TTL are ignored.
+        validators: If given - links with other validators are ignored, their artifacts are not read.
+    """
+    for directory in _cache_directories():
+        filename = _get_link_filename(spec_link, directory)
+        if is_fresh and not _validate_cache_file(filename):
+            continue
+        link = _read_link(filename)
+        if link is None or (validators is not None and link['validators'] != validators):
+            continue
+        prepared_spec = _read_artifact(link['content_hash'])
+        if prepared_spec is not None:
+            return _CacheEntry(link['validators'], link['content_hash'], prepared_spec)
+    return None
+
+
+def _read_valid_cache(spec_link: str) -> PreparedSpec | None:
+    if entry := _read_cache(spec_link, is_fresh=True):
+        return entry.spec
+    return None
+
+
+def read_stale_cache(spec_link: str) -> PreparedSpec | None:
+    """
+    Read the cached spec regardless of its age, without any network access.
+    """
+    if entry := _read_cache(spec_link):
+        return entry.spec
+    return None
+
+
+def _build_cache(validator: BaseValidator,
+                 content: bytes | memoryview,
+                 content_type: str,
+                 validators: Dict[str, str],
+                 ) -> PreparedSpec:
+    spec_link = _get_spec_link(validator)
+    content_hash = sha256(content).hexdigest()
+    # the same spec may be cached under another link, e.g. a mirror, another tag or a query string variant
+    prepared_spec = _read_artifact(content_hash)
+    if prepared_spec is not None:
+        count('artifact_hit', spec_link, validator.func_name)
     else:
-        raw_spec = _download_spec(validator)
+        with timer('parse', spec_link, validator.func_name):
+            raw_schema = parse_spec(content, content_type, spec_link)
+        # operations are converted lazily, on the first lookup
+        with timer('index', spec_link, validator.func_name):
+            prepared_spec = PreparedSpec(raw_schema)
+        prepared_spec.unit_store = _unit_store
+        _save_artifact(spec_link, content_hash, prepared_spec)
+
+    _save_link(spec_link, validators, content_hash)
+    return prepared_spec
+
+
+def _refresh_cache(validator: BaseValidator,
+                   cached: _CachedLink | None,
+                   raw_spec: httpx.Response,
+                   ) -> PreparedSpec | None:
+    if cached is not None and raw_spec.status_code == httpx.codes.NOT_MODIFIED:
+        prepared_spec = _read_artifact(cached.content_hash)
+        if prepared_spec is not None:
+            # the spec hasn't changed, only the freshness of the link is renewed,
+            # in the own cache directory if it was read from the shared one
+            count('not_modified', validator.spec_link, validator.func_name)
+            _save_link(_get_spec_link(validator), cached.validators, cached.content_hash)
+            return prepared_spec
+        # the artifact has been evicted or is of another version since the link was read
+        refetched_spec = _download_spec(validator)
+        if refetched_spec is None:
+            return None
+        raw_spec = refetched_spec
+    return _build_cache(validator, raw_spec.content, raw_spec.headers.get('Content-Type', ''),
+                        _get_cache_validators(raw_spec))
+
+
+def _get_cache_lock(spec_link: str) -> FileLock:
+    makedirs(CACHE_DIR, exist_ok=True)
+    return FileLock(_get_link_filename(spec_link) + LOCK_SUFFIX, timeout=Config.CACHE_LOCK_TIMEOUT)
+
+
+def _cache_lock(spec_link: str, is_locked: bool) -> ContextManager[bool]:
+    if not is_locked:
+        return nullcontext(True)
+    return _get_cache_lock(spec_link)
+
+
+def _handle_read_error(validator: BaseValidator, e: Exception) -> None:
+    if validator.skip_if_failed_to_get_spec:
+        validator.output(e, f"An error occurred while trying to read the spec from the {validator.spec_link}")
+        return None
+    raise ValueError(f"An error occurred while trying to read the spec from the {validator.spec_link}: {e}")
+
+
+def _load_local_cache(validator: BaseValidator, is_locked: bool = True) -> PreparedSpec | None:
+    spec_link = _get_spec_link(validator)
+    # local specs are fresh as long as their fingerprint is the same, there is no TTL
+    try:
+        validators = {'Fingerprint': get_local_fingerprint(spec_link)}
+    except (OSError, ValueError) as e:
+        _handle_read_error(validator, e)
+        return None
+
+    # the fingerprint is kept in the link, the artifact is only read if it matches
+    cached = _read_cache(spec_link, validators=validators)
+    if cached is not None:
+        count('disk_cache_hit', spec_link, validator.func_name)
+        return cached.spec
+
+    with _cache_lock(spec_link, is_locked):
+        cached = _read_cache(spec_link, validators=validators)
+        if cached is not None:
+            count('disk_cache_hit', spec_link, validator.func_name)
+            return cached.spec
+
+        count('disk_cache_miss', spec_link, validator.func_name)
+        try:
+            with timer('read', spec_link, validator.func_name):
+                content, content_type = read_local_spec(spec_link)
+        except (OSError, ValueError) as e:
+            _handle_read_error(validator, e)
+            return None
+        return _build_cache(validator, content, content_type, validators)
+
+
+def load_cache(validator: BaseValidator, is_locked: bool = True) -> PreparedSpec | None:
+    """
+    Args:
+        is_locked: If False - the spec is downloaded without the cross-process lock,
+            e.g. when this process holds it already, atomic writes keep the cache consistent.
+    """
+    spec_link = _get_spec_link(validator)
+    if is_local_spec(spec_link):
+        return _load_local_cache(validator, is_locked)
+
+    prepared_spec = _read_valid_cache(spec_link)
+    if prepared_spec is not None:
+        count('disk_cache_hit', spec_link, validator.func_name)
+        return prepared_spec
+
+    # one process downloads, the others wait and read what it has saved;
+    # on lock timeout the spec is downloaded anyway, atomic writes keep the cache consistent
+    with _cache_lock(spec_link, is_locked):
+        prepared_spec = _read_valid_cache(spec_link)
+        if prepared_spec is not None:
+            count('disk_cache_hit', spec_link, validator.func_name)
+            return prepared_spec
+
+        count('disk_cache_miss', spec_link, validator.func_name)
+        # an expired spec is revalidated with a conditional request, its artifact is only read on a 304
+        cached = _find_link(spec_link)
+        raw_spec = _download_spec(validator, cached.validators if cached else None)
         if raw_spec is None:
             return None
 
-        content_type = raw_spec.headers.get('Content-Type', '')
+        return _refresh_cache(validator, cached, raw_spec)
 
-        if 'application/json' in content_type:
-            raw_schema = json.loads(raw_spec.text)
-        elif 'text/yaml' in content_type or 'application/x-yaml' in content_type:
-            raw_schema = load(raw_spec.text, Loader=CLoader)
-        else:
-            # trying to match via file extension
-            if validator.spec_link.endswith('.json'):
-                raw_schema = json.loads(raw_spec.text)
-            elif validator.spec_link.endswith('.yaml') or validator.spec_link.endswith('.yml'):
-                raw_schema = load(raw_spec.text, Loader=CLoader)
-            else:
-                raise ValueError(f"Unsupported content type: {content_type}")
 
-        _save_cache(validator.spec_link, raw_schema)
+async def load_cache_async(validator: BaseValidator, executor: Executor | None = None) -> PreparedSpec | None:
+    """
+    Same as load_cache, but the download doesn't block the event loop
+    and the disk reads run in the default executor.
+
+    Args:
+        executor: Executor for the parsing and the indexing of the spec, the loop's default one if None.
+    """
+    spec_link = _get_spec_link(validator)
+    loop = asyncio.get_running_loop()
+
+    if is_local_spec(spec_link):
+        # no network, the whole load is disk and CPU work
+        return await loop.run_in_executor(executor, _load_local_cache, validator)
+
+    prepared_spec = await loop.run_in_executor(None, _read_valid_cache, spec_link)
+    if prepared_spec is not None:
+        count('disk_cache_hit', spec_link, validator.func_name)
+        return prepared_spec
+
+    lock = _get_cache_lock(spec_link)
+    acquiring = loop.run_in_executor(None, lock.acquire)
+    try:
+        # shielded: the executor thread can't be stopped, so a cancelled load must release what it acquires
+        await asyncio.shield(acquiring)
+    except asyncio.CancelledError:
+        acquiring.add_done_callback(lambda _: lock.release())
+        raise
+    try:
+        prepared_spec = await loop.run_in_executor(None, _read_valid_cache, spec_link)
+        if prepared_spec is not None:
+            count('disk_cache_hit', spec_link, validator.func_name)
+            return prepared_spec
+
+        count('disk_cache_miss', spec_link, validator.func_name)
+
+        cached = await loop.run_in_executor(None, _find_link, spec_link)
+        raw_spec = await _download_spec_async(validator, cached.validators if cached else None)
+        if raw_spec is None:
+            return None
+
+        return await loop.run_in_executor(executor, _refresh_cache, validator, cached, raw_spec)
+    finally:
+        lock.release()
+
+
+def _is_dangling_link(filename: str) -> bool:
+    link = _read_link(filename)
+    return link is None or not any(path.isfile(_get_artifact_filename(link['content_hash'], directory))
+                                   for directory in _cache_directories())
+
+
+def _remove_unlocked(filename: str) -> None:
+    """
+    Remove the file and its lock, unless a process holds the lock, e.g. it's loading the spec right now.
+    """
+    lock = FileLock(filename + LOCK_SUFFIX, timeout=0)
+    if not lock.acquire():
+        return
+    try:
+        for file in (filename, filename + LOCK_SUFFIX):
+            try:
+                unlink(file)
+            except FileNotFoundError:
+                pass
+    finally:
+        # a process waiting on the unlinked lock may load the spec once more, that's harmless
+        lock.release()
+
+
+def disk_cache_stats() -> DiskCacheStats:
+    """
+    :return: Entries of the disk cache, the most recently used first, their total size and the limits.
+    """
+    return _cache_index.stats()
+
 
-    parsed_data = collect_schema_data(raw_schema)
-    prepared_dict = _build_entity_dict(parsed_data)
+def gc_disk_cache(max_size: int | None = None,
+                  max_entries: int | None = None,
+                  max_age: float | None = None,
+                  ) -> List[str]:
+    """
+    Evict the least recently used specs from the disk cache, see CacheIndex.gc,
+    then remove the links to missing artifacts and the locks of removed links.
 
-    return prepared_dict
+    :return: Names of the removed artifacts.
+    """
+    removed = _cache_index.gc(max_size, max_entries, max_age)
+    if not path.isdir(CACHE_DIR):
+        return removed
+    for name in listdir(CACHE_DIR):
+        filename = path.join(CACHE_DIR, name)
+        if name.endswith(LINK_SUFFIX) and _is_dangling_link(filename):
+            _remove_unlocked(filename)
+        elif name.endswith(LOCK_SUFFIX) and not path.isfile(filename[:-len(LOCK_SUFFIX)]):
+            _remove_unlocked(filename[:-len(LOCK_SUFFIX)])
+    return removed
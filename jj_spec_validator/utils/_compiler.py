@@ -0,0 +1,243 @@
+import re
+from math import isclose
+from typing import Any, Callable, Dict, List, Tuple
+
+from d42.declaration import GenericSchema
+from d42.declaration.types import (AnySchema, BoolSchema, DictSchema, FloatSchema, IntSchema, ListSchema,
+                                   NoneSchema, StrSchema)
+from d42.substitution import SubstitutorValidator
+from d42.utils import is_ellipsis
+from d42.validation import Validator, validate_or_fail
+from niltype import Nil
+
+from ._common import validate_non_strict
+from ._refiner import get_forced_strict_spec
+
+__all__ = ('CompiledValidator', 'compile_schema', )
+
+Checker = Callable[[Any], bool]
+
+_strict_visitor = Validator()
+_non_strict_visitor = SubstitutorValidator()
+
+# props the compiled checkers know, schemas with anything else are checked by d42 itself
+_KNOWN_PROPS = {
+    NoneSchema: set(),
+    BoolSchema: {'value'},
+    IntSchema: {'value', 'min', 'max'},
+    FloatSchema: {'value', 'min', 'max'},
+    StrSchema: {'value', 'len', 'min_len', 'max_len', 'alphabet', 'substr', 'pattern'},
+    ListSchema: {'elements', 'type', 'len', 'min_len', 'max_len'},
+    DictSchema: {'keys'},
+    AnySchema: {'types'},
+}
+
+
+def _interpreted(schema: GenericSchema, is_strict: bool) -> Checker:
+    visitor = _strict_visitor if is_strict else _non_strict_visitor
+
+    def check(value: Any) -> bool:
+        return not schema.__accept__(visitor, value=value).has_errors()
+    return check
+
+
+def _len_checker(props: Any) -> Callable[[Any], bool] | None:
+    length, min_len, max_len = props.len, props.min_len, props.max_len
+    if length is Nil and min_len is Nil and max_len is Nil:
+        return None
+
+    def check(value: Any) -> bool:
+        size = len(value)
+        return ((length is Nil or size == length)
+                and (min_len is Nil or size >= min_len)
+                and (max_len is Nil or size <= max_len))
+    return check
+
+
+def _compile_none(schema: NoneSchema, is_strict: bool) -> Checker:
+    return lambda value: value is None
+
+
+def _compile_bool(schema: BoolSchema, is_strict: bool) -> Checker:
+    expected = schema.props.value
+    if expected is Nil:
+        return lambda value: isinstance(value, bool)
+    return lambda value: isinstance(value, bool) and value == expected
+
+
+def _compile_int(schema: IntSchema, is_strict: bool) -> Checker:
+    expected, min_value, max_value = schema.props.value, schema.props.min, schema.props.max
+    if expected is Nil and min_value is Nil and max_value is Nil:
+        return lambda value: isinstance(value, int)
+
+    def check(value: Any) -> bool:
+        return (isinstance(value, int)
+                and (expected is Nil or value == expected)
+                and (min_value is Nil or value >= min_value)
+                and (max_value is Nil or value <= max_value))
+    return check
+
+
+def _compile_float(schema: FloatSchema, is_strict: bool) -> Checker:
+    expected, min_value, max_value = schema.props.value, schema.props.min, schema.props.max
+    if expected is Nil and min_value is Nil and max_value is Nil:
+        return lambda value: isinstance(value, float)
+
+    def check(value: Any) -> bool:
+        return (isinstance(value, float)
+                and (expected is Nil or isclose(value, expected))
+                and (min_value is Nil or value >= min_value)
+                and (max_value is Nil or value <= max_value))
+    return check
+
+
+def _compile_str(schema: StrSchema, is_strict: bool) -> Checker:
+    props = schema.props
+    expected, substr = props.value, props.substr
+    pattern = re.compile(props.pattern) if props.pattern is not Nil else None
+    alphabet = set(props.alphabet) if props.alphabet is not Nil else None
+    check_len = _len_checker(props)
+    if expected is Nil and substr is Nil and pattern is None and alphabet is None and check_len is None:
+        return lambda value: isinstance(value, str)
+
+    def check(value: Any) -> bool:
+        return (isinstance(value, str)
+                and (expected is Nil or value == expected)
+                and (pattern is None or pattern.search(value) is not None)
+                and (check_len is None or check_len(value))
+                and (substr is Nil or substr in value)
+                and (alphabet is None or alphabet.issuperset(value)))
+    return check
+
+
+def _compile_list(schema: ListSchema, is_strict: bool) -> Checker:
+    props = schema.props
+    check_len = _len_checker(props)
+
+    if props.type is not Nil:
+        check_type = _compile(props.type, is_strict)
+
+        if is_strict:
+            def check_items(value: List[Any]) -> bool:
+                return all(check_type(item) for item in value)
+        else:
+            def check_items(value: List[Any]) -> bool:
+                last = len(value) - 1
+                # substitution skips ellipsis at the edges of the list
+                return all(check_type(item) or (item is ... and (index == 0 or index == last))
+                           for index, item in enumerate(value))
+
+    elif props.elements is not Nil:
+        if any(is_ellipsis(element) for element in props.elements):
+            # head / tail / body matching, left to d42
+            return _interpreted(schema, is_strict)
+        element_checks = [_compile(element, is_strict) for element in props.elements]
+
+        def check_items(value: List[Any]) -> bool:
+            return (len(value) == len(element_checks)
+                    and all(check_element(item) for check_element, item in zip(element_checks, value)))
+
+    else:
+        def check_items(value: List[Any]) -> bool:
+            return True
+
+    def check(value: Any) -> bool:
+        return (isinstance(value, list)
+                and (check_len is None or check_len(value))
+                and check_items(value))
+    return check
+
+
+def _compile_dict(schema: DictSchema, is_strict: bool) -> Checker:
+    keys = schema.props.keys
+    if keys is Nil:
+        return lambda value: isinstance(value, dict)
+
+    required: List[Tuple[Any, Checker]] = []
+    optional: List[Tuple[Any, Checker]] = []
+    for key, (key_schema, is_optional) in keys.items():
+        if is_ellipsis(key):
+            continue
+        if not isinstance(is_optional, bool):
+            # optional.absent / optional.present markers, left to d42
+            return _interpreted(schema, is_strict)
+        checker = _compile(key_schema, is_strict)
+        # missing keys are not errors for the substitution
+        (optional if is_optional or not is_strict else required).append((key, checker))
+
+    declared_keys = frozenset(key for key in keys if not is_ellipsis(key))
+    is_relaxed = ... in keys
+
+    def check(value: Any) -> bool:
+        if not isinstance(value, dict):
+            return False
+        for key, checker in required:
+            if key not in value or not checker(value[key]):
+                return False
+        for key, checker in optional:
+            if key in value and not checker(value[key]):
+                return False
+        return is_relaxed or declared_keys.issuperset(value)
+    return check
+
+
+def _compile_any(schema: AnySchema, is_strict: bool) -> Checker:
+    if schema.props.types is Nil:
+        return lambda value: True
+    type_checks = [_compile(sch_type, is_strict) for sch_type in schema.props.types]
+    return lambda value: any(check_type(value) for check_type in type_checks)
+
+
+_COMPILERS: Dict[type, Callable[[Any, bool], Checker]] = {
+    NoneSchema: _compile_none,
+    BoolSchema: _compile_bool,
+    IntSchema: _compile_int,
+    FloatSchema: _compile_float,
+    StrSchema: _compile_str,
+    ListSchema: _compile_list,
+    DictSchema: _compile_dict,
+    AnySchema: _compile_any,
+}
+
+
+def _compile(schema: GenericSchema, is_strict: bool) -> Checker:
+    # exact types only: subclasses (e.g. UnorderedSchema) have their own validation rules
+    compiler = _COMPILERS.get(type(schema))
+    if compiler is None or not _KNOWN_PROPS[type(schema)].issuperset(schema.props):
+        return _interpreted(schema, is_strict)
+    return compiler(schema, is_strict)
+
+
+class CompiledValidator:
+    """
+    Validator specialized for one schema and mode.
+
+    The compiled checker only answers whether a JSON value is valid. Invalid values are
+    validated again by d42 itself, so error messages are exactly the interpreted ones.
+    """
+
+    def __init__(self, schema: GenericSchema, is_strict: bool) -> None:
+        self.schema = schema
+        self.is_strict = is_strict
+        self._check = _compile(schema, is_strict)
+
+    def validate(self, value: Any) -> bool:
+        if self._check(value):
+            return True
+        if self.is_strict:
+            return validate_or_fail(self.schema, value)
+        return validate_non_strict(self.schema, value)
+
+
+def compile_schema(schema: GenericSchema, is_strict: bool, force_strict: bool = False) -> CompiledValidator:
+    """
+    Compile the response schema of a spec unit.
+
+    Args:
+        schema: The response schema.
+        is_strict: If True - validate as validate_or_fail, else as validate_non_strict.
+        force_strict: If True - validate against get_forced_strict_spec(schema).
+    """
+    if force_strict:
+        schema = get_forced_strict_spec(schema)
+    return CompiledValidator(schema, is_strict)
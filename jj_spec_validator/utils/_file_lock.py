@@ -0,0 +1,76 @@
+import os
+from time import monotonic, sleep
+from types import TracebackType
+from typing import Type
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+__all__ = ('FileLock', )
+
+_POLL_INTERVAL = 0.05  # in seconds
+
+
+class FileLock:
+    """
+    Advisory exclusive lock on `filename`, shared between processes (e.g. pytest-xdist workers).
+
+    The lock is released by the OS if the owning process dies. Every acquire opens its own descriptor,
+    so threads of one process exclude each other as well.
+    """
+
+    def __init__(self, filename: str, timeout: float | None = None) -> None:
+        self._filename = filename
+        self._timeout = timeout
+        self._fd: int | None = None
+
+    def _try_lock(self, fd: int) -> bool:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:  # pragma: no cover
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def acquire(self) -> bool:
+        """
+        Wait for the lock.
+
+        :return: False if the timeout has expired before the lock was acquired.
+        """
+        fd = os.open(self._filename, os.O_RDWR | os.O_CREAT, 0o666)
+        deadline = None if self._timeout is None else monotonic() + self._timeout
+        while not self._try_lock(fd):
+            if deadline is not None and monotonic() > deadline:
+                os.close(fd)
+                return False
+            sleep(_POLL_INTERVAL)
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:  # pragma: no cover
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self,
+                 exc_type: Type[BaseException] | None,
+                 exc_val: BaseException | None,
+                 exc_tb: TracebackType | None,
+                 ) -> None:
+        self.release()
@@ -0,0 +1,81 @@
+from threading import Lock
+from typing import Any, Dict, Hashable, Tuple
+from weakref import WeakValueDictionary
+
+from d42.declaration import GenericSchema, Schema
+
+__all__ = ('intern_schema', 'interned_schemas_count', )
+
+# structural key -> the shared schema, shared between all the loaded specs
+_interned: 'WeakValueDictionary[Hashable, GenericSchema]' = WeakValueDictionary()
+# id -> schema, for the schemas that are already shared
+_shared_ids: 'WeakValueDictionary[int, GenericSchema]' = WeakValueDictionary()
+_lock = Lock()
+
+
+class _Unhashable(Exception):
+    pass
+
+
+def _intern_value(value: Any) -> Tuple[Any, Hashable]:
+    """
+    :return: The value with interned schemas inside and its structural key.
+    """
+    if isinstance(value, Schema):
+        schema = _intern(value)
+        # shared schemas are alive as long as the schemas holding them, so ids are stable keys
+        return schema, ('schema', id(schema))
+    elif isinstance(value, (list, tuple)):
+        items = [_intern_value(item) for item in value]
+        return type(value)(item for item, _ in items), (type(value), tuple(key for _, key in items))
+    elif isinstance(value, dict):
+        # d42 dict keys, the order is kept as it's the order of the validation errors
+        entries = [(key, _intern_value(item)) for key, item in value.items()]
+        dict_key = tuple((key, item_key) for key, (_, item_key) in entries)
+        return {key: item for key, (item, _) in entries}, (dict, dict_key)
+    try:
+        hash(value)
+    except TypeError:
+        raise _Unhashable()
+    # 1, 1.0 and True are equal, but not the same prop value
+    return value, (type(value), value)
+
+
+def _intern(schema: GenericSchema) -> GenericSchema:
+    if _shared_ids.get(id(schema)) is schema:
+        return schema
+
+    props: Dict[str, Any] = {}
+    prop_keys = []
+    is_changed = False
+    try:
+        for name in schema.props:
+            value = schema.props.get(name)
+            interned_value, prop_key = _intern_value(value)
+            props[name] = interned_value
+            prop_keys.append((name, prop_key))
+            is_changed = is_changed or interned_value is not value
+    except _Unhashable:
+        # props of custom types that can't be compared cheaply, the schema is kept as is
+        return schema
+
+    key = (type(schema), tuple(prop_keys))
+    with _lock:
+        shared = _interned.get(key)
+        if shared is None:
+            shared = schema.__class__(schema.props.update(**props)) if is_changed else schema
+            _interned[key] = shared
+            _shared_ids[id(shared)] = shared
+    return shared
+
+
+def intern_schema(schema: GenericSchema) -> GenericSchema:
+    """
+    Return the shared instance of a structurally identical schema, so equal subschemas,
+    e.g. converted from one component, are kept in memory once for all operations and specs.
+    """
+    return _intern(schema)
+
+
+def interned_schemas_count() -> int:
+    return len(_interned)
@@ -0,0 +1,128 @@
+from contextlib import nullcontext
+from threading import Lock
+from time import perf_counter
+from types import TracebackType
+from typing import ContextManager, Dict, List, NamedTuple, Tuple, Type
+
+from .._config import Config
+
+__all__ = ('Metric', 'MetricsSummary', 'metrics_summary', 'count', 'timer', )
+
+_disabled_timer: ContextManager[None] = nullcontext()
+
+
+class Metric(NamedTuple):
+    # phase (download, parse, match, validate, ...) or counter (registry_hit, result_cache_miss, ...)
+    name: str
+    spec_link: str | None
+    func_name: str | None
+    # in seconds, None for counters
+    duration: float | None
+
+
+class _Timer:
+    __slots__ = ('_name', '_spec_link', '_func_name', '_started')
+
+    def __init__(self, name: str, spec_link: str | None, func_name: str | None) -> None:
+        self._name = name
+        self._spec_link = spec_link
+        self._func_name = func_name
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = perf_counter()
+
+    def __exit__(self,
+                 exc_type: Type[BaseException] | None,
+                 exc_val: BaseException | None,
+                 exc_tb: TracebackType | None,
+                 ) -> None:
+        duration = perf_counter() - self._started
+        metrics_function = Config.METRICS_FUNCTION
+        if metrics_function is not None:
+            metrics_function(Metric(self._name, self._spec_link, self._func_name, duration))
+
+
+def timer(name: str, spec_link: str | None = None, func_name: str | None = None) -> ContextManager[None]:
+    """
+    Time the block as the phase `name` and report it to Config.METRICS_FUNCTION, if any.
+    """
+    if Config.METRICS_FUNCTION is None:
+        return _disabled_timer
+    return _Timer(name, spec_link, func_name)
+
+
+def count(name: str, spec_link: str | None = None, func_name: str | None = None) -> None:
+    metrics_function = Config.METRICS_FUNCTION
+    if metrics_function is not None:
+        metrics_function(Metric(name, spec_link, func_name, None))
+
+
+class _Stat:
+    __slots__ = ('count', 'total', 'max', 'is_timing')
+
+    def __init__(self) -> None:
+        self.is_timing = False
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float | None) -> None:
+        self.count += 1
+        if duration is not None:
+            self.is_timing = True
+            self.total += duration
+            self.max = max(self.max, duration)
+
+
+class MetricsSummary:
+    """
+    Aggregates metrics per spec link and per decorated function, to be set as Config.METRICS_FUNCTION.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._by_spec: Dict[Tuple[str | None, str], _Stat] = {}
+        self._by_func: Dict[Tuple[str | None, str], _Stat] = {}
+
+    def __call__(self, metric: Metric) -> None:
+        with self._lock:
+            for stats, owner in ((self._by_spec, metric.spec_link), (self._by_func, metric.func_name)):
+                stat = stats.get((owner, metric.name))
+                if stat is None:
+                    stat = stats[(owner, metric.name)] = _Stat()
+                stat.add(metric.duration)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_spec.clear()
+            self._by_func.clear()
+
+    def _format(self, title: str, stats: Dict[Tuple[str | None, str], _Stat]) -> List[str]:
+        grouped: Dict[str, List[Tuple[str, _Stat]]] = {}
+        for (owner, name), stat in stats.items():
+            if owner is not None:
+                grouped.setdefault(owner, []).append((name, stat))
+
+        lines = []
+        for owner in sorted(grouped):
+            lines.append(f"{title} {owner}:")
+            lines.append(f"  {'phase':<24}{'count':>8}{'total, ms':>12}{'mean, ms':>12}{'max, ms':>12}")
+            for name, stat in sorted(grouped[owner], key=lambda item: item[0]):
+                if stat.is_timing:
+                    lines.append(f"  {name:<24}{stat.count:>8}{stat.total * 1000:>12.2f}"
+                                 f"{stat.total * 1000 / stat.count:>12.3f}{stat.max * 1000:>12.3f}")
+                else:
+                    lines.append(f"  {name:<24}{stat.count:>8}")
+        return lines
+
+    def report(self) -> str:
+        """
+        :return: Phases and counters of every spec link and decorated function, e.g. to print at the end of the run.
+        """
+        with self._lock:
+            lines = self._format('spec', self._by_spec) + self._format('function', self._by_func)
+        return '\n'.join(lines)
+
+
+metrics_summary = MetricsSummary()
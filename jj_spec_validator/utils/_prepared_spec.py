@@ -0,0 +1,290 @@
+import json
+import re
+from hashlib import sha256
+from threading import RLock
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Protocol, Set, Tuple
+from urllib.parse import unquote
+from uuid import uuid4
+
+from d42.declaration import GenericSchema
+from schemax_openapi import SchemaData, collect_schema_data
+
+from ._compiler import CompiledValidator
+from ._interner import intern_schema
+from ._refiner import get_forced_strict_spec
+from ._route_index import RouteIndex
+
+__all__ = ('PreparedSpec', )
+
+# the methods collect_schema_data converts
+_HTTP_METHODS = ('get', 'post', 'put', 'patch', 'delete')
+
+SpecUnitKey = Tuple[str, str]
+
+_REF_PATTERN = re.compile(r'"\$ref": "((?:[^"\\]|\\.)*)"')
+
+
+class _Operation(NamedTuple):
+    # the path as written in the spec, before enum parameters are substituted
+    path: str
+    http_method: str
+
+
+class UnitStore(Protocol):
+    """
+    Converted operations kept outside of the spec, by the content hash of the operation,
+    so other processes and other versions of the spec don't convert them again.
+    """
+
+    def get(self, unit_hash: str, key: SpecUnitKey) -> SchemaData | None:
+        ...
+
+    def put(self, unit_hash: str, key: SpecUnitKey, unit: SchemaData) -> None:
+        ...
+
+
+class _ExternalRef(Exception):
+    pass
+
+
+def _resolve_pointer(document: Dict[str, Any], ref: str) -> Any:
+    if not ref.startswith('#'):
+        raise _ExternalRef(ref)
+    node: Any = document
+    for token in unquote(ref[1:]).split('/')[1:]:
+        token = token.replace('~1', '/').replace('~0', '~')
+        node = node[int(token)] if isinstance(node, list) else node[token]
+    return node
+
+
+def _resolve_refs(node: Any, document: Dict[str, Any]) -> Any:
+    # the same as the normalizer of schemax_openapi, but for one subtree of the document
+    if isinstance(node, dict):
+        if '$ref' in node:
+            return _resolve_refs(_resolve_pointer(document, node['$ref']), document)
+        return {key: _resolve_refs(value, document) for key, value in node.items()}
+    elif isinstance(node, list):
+        return [_resolve_refs(item, document) for item in node]
+    return node
+
+
+def _deref(node: Any, document: Dict[str, Any]) -> Any:
+    # follows the ref of the node itself, nested refs are left as is
+    while isinstance(node, dict) and '$ref' in node:
+        node = _resolve_pointer(document, node['$ref'])
+    return node
+
+
+def _get_enum_paths(path: str, parameters: List[Dict[str, Any]]) -> List[str]:
+    paths = []
+    for parameter in parameters:
+        if parameter.get('in') == 'path' and 'enum' in parameter.get('schema', {}):
+            for enum_item in parameter['schema']['enum']:
+                paths.append(path.replace(f"{{{parameter['name']}}}", enum_item))
+    return paths
+
+
+def _index_operations(raw_schema: Dict[str, Any]) -> Dict[SpecUnitKey, _Operation]:
+    operations: Dict[SpecUnitKey, _Operation] = {}
+    for path, path_data in (raw_schema.get('paths') or {}).items():
+        path_data = _deref(path_data, raw_schema)
+        parameters = _resolve_refs(path_data.get('parameters', []), raw_schema)
+        for enum_path in _get_enum_paths(path, parameters) or [path]:
+            for http_method in path_data:
+                if http_method.lower() in _HTTP_METHODS:
+                    operations[(http_method.upper(), enum_path)] = _Operation(path, http_method)
+    return operations
+
+
+class PreparedSpec(Mapping[SpecUnitKey, SchemaData]):
+    """
+    Parsed spec: (method, path) -> SchemaData, plus the route index built once on load.
+
+    Only the index is built on load, every operation is converted to d42 the first time it's looked up.
+    """
+
+    def __init__(self, raw_schema: Dict[str, Any]) -> None:
+        self._raw_schema = raw_schema
+        self._operations = _index_operations(raw_schema)
+        self.route_index = RouteIndex(self._operations.keys())
+        # identifies this parse of the spec, e.g. in keys of memoized validation results
+        self.version = uuid4().hex
+        self._units: Dict[SpecUnitKey, SchemaData] = {}
+        self._forced_strict_schemas: Dict[SpecUnitKey, GenericSchema] = {}
+        self._validators: Dict[Tuple[SpecUnitKey, bool, bool], CompiledValidator] = {}
+        # content hashes of the converted operations, None if it can't be reused by a refresh
+        self._unit_hashes: Dict[SpecUnitKey, str | None] = {}
+        # content hashes of the ref targets, nested refs included
+        self._ref_hashes: Dict[str, str | None] = {}
+        self._lock = RLock()
+        # operations are read from it before they are converted, and saved to it after
+        self.unit_store: UnitStore | None = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # compiled validators are closures, they are compiled again on demand
+        state = self.__dict__.copy()
+        del state['_validators'], state['_ref_hashes'], state['_lock'], state['unit_store']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._validators = {}
+        self._ref_hashes = {}
+        self._lock = RLock()
+        self.unit_store = None
+
+    def _content_hash(self, node: Any, resolving: Set[str]) -> str | None:
+        dumped = json.dumps(node, sort_keys=True, default=str)
+        digest = sha256(dumped.encode())
+        # a ref is hashed by the content it points to, so a changed component changes every operation using it
+        for ref in _REF_PATTERN.findall(dumped):
+            ref_hash = self._ref_hash(json.loads(f'"{ref}"'), resolving)
+            if ref_hash is None:
+                return None
+            digest.update(ref_hash.encode())
+        return digest.hexdigest()
+
+    def _ref_hash(self, ref: str, resolving: Set[str]) -> str | None:
+        if ref in self._ref_hashes:
+            return self._ref_hashes[ref]
+        ref_hash = None
+        # recursive and external refs are not hashed, operations using them are always converted again
+        if ref not in resolving and ref.startswith('#'):
+            resolving.add(ref)
+            try:
+                ref_hash = self._content_hash(_resolve_pointer(self._raw_schema, ref), resolving)
+            except (KeyError, IndexError, ValueError, TypeError):
+                pass
+            resolving.discard(ref)
+        self._ref_hashes[ref] = ref_hash
+        return ref_hash
+
+    def _operation_hash(self, key: SpecUnitKey) -> str | None:
+        operation = self._operations[key]
+        try:
+            path_data = _deref(self._raw_schema['paths'][operation.path], self._raw_schema)
+        except _ExternalRef:
+            return None
+        return self._content_hash([operation.path, operation.http_method, path_data[operation.http_method],
+                                   path_data.get('parameters')], set())
+
+    def _convert(self, key: SpecUnitKey) -> SchemaData:
+        operation = self._operations[key]
+        path_data = self._raw_schema['paths'][operation.path]
+        try:
+            path_data = _deref(path_data, self._raw_schema)
+            operation_path_data = {operation.http_method: _resolve_refs(path_data[operation.http_method],
+                                                                        self._raw_schema)}
+            if 'parameters' in path_data:
+                operation_path_data['parameters'] = _resolve_refs(path_data['parameters'], self._raw_schema)
+            document = {'paths': {operation.path: operation_path_data}}
+        except _ExternalRef:
+            # refs to other documents are left to the normalizer of schemax_openapi
+            document = {**self._raw_schema, 'paths': {operation.path: path_data}}
+
+        for unit in collect_schema_data(document):
+            if (unit.http_method.upper(), unit.path) == key:
+                # components referenced by many operations and specs are kept once
+                unit.response_schema_d42 = intern_schema(unit.response_schema_d42)
+                unit.request_schema_d42 = intern_schema(unit.request_schema_d42)
+                return unit
+        raise KeyError(key)
+
+    def __getitem__(self, key: SpecUnitKey) -> SchemaData:
+        unit = self._units.get(key)
+        if unit is None:
+            if key not in self._operations:
+                raise KeyError(key)
+            with self._lock:
+                unit = self._units.get(key)
+                if unit is None:
+                    unit_hash = self._operation_hash(key)
+                    unit = self._load_unit(key, unit_hash)
+                    self._unit_hashes[key] = unit_hash
+                    # published last, the lock-free readers above never see a unit without its hash
+                    self._units[key] = unit
+        return unit
+
+    def _load_unit(self, key: SpecUnitKey, unit_hash: str | None) -> SchemaData:
+        if unit_hash is None or self.unit_store is None:
+            return self._convert(key)
+        unit = self.unit_store.get(unit_hash, key)
+        if unit is not None:
+            # shared with the schemas converted in this process
+            unit.response_schema_d42 = intern_schema(unit.response_schema_d42)
+            unit.request_schema_d42 = intern_schema(unit.request_schema_d42)
+            return unit
+        unit = self._convert(key)
+        self.unit_store.put(unit_hash, key, unit)
+        return unit
+
+    def get_response_schema(self, key: SpecUnitKey, force_strict: bool = False) -> GenericSchema:
+        """
+        Return the d42 response schema of the unit, or its get_forced_strict_spec variant, converting it on first use.
+        """
+        if not force_strict:
+            return self[key].response_schema_d42
+        schema = self._forced_strict_schemas.get(key)
+        if schema is None:
+            with self._lock:
+                schema = self._forced_strict_schemas.get(key)
+                if schema is None:
+                    schema = intern_schema(get_forced_strict_spec(self[key].response_schema_d42))
+                    self._forced_strict_schemas[key] = schema
+        return schema
+
+    def get_validator(self, key: SpecUnitKey, is_strict: bool, force_strict: bool) -> CompiledValidator:
+        """
+        Return the compiled validator of the response schema of the unit, compiling it on first use.
+        """
+        validator_key = (key, is_strict, force_strict)
+        validator = self._validators.get(validator_key)
+        if validator is None:
+            with self._lock:
+                validator = self._validators.get(validator_key)
+                if validator is None:
+                    validator = CompiledValidator(self.get_response_schema(key, force_strict), is_strict)
+                    self._validators[validator_key] = validator
+        return validator
+
+    def inherit(self, previous: 'PreparedSpec') -> int:
+        """
+        Take over the converted schemas and the compiled validators of the operations
+        that haven't changed since the `previous` version of the spec, e.g. on a refresh.
+        Compiled validators are only kept in memory, in other processes the converted schemas
+        of unchanged operations are read from the `unit_store` by the same content hashes.
+
+        :return: The number of inherited operations.
+        """
+        with previous._lock:
+            units = dict(previous._units)
+            unit_hashes = dict(previous._unit_hashes)
+            forced_strict_schemas = dict(previous._forced_strict_schemas)
+            validators = dict(previous._validators)
+
+        inherited = set()
+        with self._lock:
+            for key, unit in units.items():
+                unit_hash = unit_hashes.get(key)
+                if unit_hash is None or key not in self._operations or key in self._units:
+                    continue
+                if self._operation_hash(key) != unit_hash:
+                    continue
+                self._units[key] = unit
+                self._unit_hashes[key] = unit_hash
+                if key in forced_strict_schemas:
+                    self._forced_strict_schemas[key] = forced_strict_schemas[key]
+                inherited.add(key)
+            for validator_key, validator in validators.items():
+                if validator_key[0] in inherited:
+                    self._validators.setdefault(validator_key, validator)
+        return len(inherited)
+
+    def __iter__(self) -> Iterator[SpecUnitKey]:
+        return iter(self._operations)
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._operations
@@ -0,0 +1,351 @@
+import asyncio
+from threading import Event, Lock, RLock, Thread
+from time import monotonic
+from typing import Dict, List, Tuple
+
+from .._config import Config
+from ..validator_base import BaseValidator
+from ._cacheir import load_cache, load_cache_async, read_stale_cache
+from ._metrics import count
+from ._prepared_spec import PreparedSpec
+from ._spec_source import get_local_fingerprint, is_local_spec
+
+__all__ = ('SpecRegistry', 'spec_registry', 'load_spec', 'load_spec_async', 'invalidate_spec', )
+
+
+def _get_fingerprint(spec_link: str) -> str | None:
+    """
+    :return: The fingerprint of a local spec, '' if it can't be read, None for specs downloaded by URL.
+    """
+    if not is_local_spec(spec_link):
+        return None
+    try:
+        return get_local_fingerprint(spec_link)
+    except (OSError, ValueError):
+        return ''
+
+
+class _RegistryEntry:
+    __slots__ = ('spec', 'loaded_at', 'fingerprint')
+
+    def __init__(self, spec: PreparedSpec, loaded_at: float | None = None, fingerprint: str | None = None) -> None:
+        self.spec = spec
+        self.loaded_at = monotonic() if loaded_at is None else loaded_at
+        # of a local spec as it was before the load, a changed file is loaded again before the TTL expires
+        self.fingerprint = fingerprint
+
+
+def _get_running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _resolve(future: 'asyncio.Future[None]') -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _Flight:
+    """
+    A load of one spec in progress, awaited by threads and coroutines alike.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        # the loop the leading coroutine runs in, None for a leading thread
+        self.loop = loop
+        self._lock = Lock()
+        self._done = Event()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, 'asyncio.Future[None]']] = []
+        # taken before the load, so a file changed meanwhile is loaded again by the next hit
+        self.fingerprint: str | None = None
+        self._result: PreparedSpec | None = None
+        self._error: BaseException | None = None
+        # the leader was cancelled, the waiters load the spec again
+        self.is_abandoned = False
+
+    def finish(self, result: PreparedSpec | None, error: BaseException | None) -> None:
+        with self._lock:
+            self._result, self._error = result, error
+            self._done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # the loop of the waiter is already closed
+                pass
+
+    def abandon(self) -> None:
+        self.is_abandoned = True
+        self.finish(None, None)
+
+    def _outcome(self) -> PreparedSpec | None:
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def wait(self) -> PreparedSpec | None:
+        self._done.wait()
+        return self._outcome()
+
+    async def wait_async(self) -> PreparedSpec | None:
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            if self._done.is_set():
+                future.set_result(None)
+            else:
+                self._waiters.append((asyncio.get_running_loop(), future))
+        await future
+        return self._outcome()
+
+
+class SpecRegistry:
+    """
+    Process-wide storage of parsed specs keyed by `spec_link`.
+
+    Every Validator pointing at the same spec_link shares one PreparedSpec, so a spec
+    is converted at most once per process (per `Config.SPEC_REGISTRY_TTL`).
+    Local specs are also checked by their fingerprint (a stat of the file) on every hit,
+    a changed file is loaded again without waiting for the TTL.
+    Concurrent loads of the same spec_link are single-flight: one thread or coroutine
+    loads it, the others wait for its result.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, _RegistryEntry] = {}
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = RLock()
+
+    def _is_expired(self, entry: _RegistryEntry) -> bool:
+        ttl = Config.SPEC_REGISTRY_TTL
+        if ttl is None:
+            return False
+        return monotonic() - entry.loaded_at > ttl
+
+    def _is_changed(self, spec_link: str, entry: _RegistryEntry) -> bool:
+        if entry.fingerprint is None:
+            return False
+        fingerprint = _get_fingerprint(spec_link)
+        # an unreadable file is a miss too, its load reports the error
+        return not fingerprint or fingerprint != entry.fingerprint
+
+    def get(self, spec_link: str) -> PreparedSpec | None:
+        with self._lock:
+            entry = self._entries.get(spec_link)
+            if entry is None:
+                return None
+            if self._is_expired(entry) or self._is_changed(spec_link, entry):
+                # kept for Config.STALE_WHILE_REVALIDATE until replaced or invalidated
+                return None
+            return entry.spec
+
+    def get_stale(self, spec_link: str) -> PreparedSpec | None:
+        with self._lock:
+            entry = self._entries.get(spec_link)
+            return None if entry is None else entry.spec
+
+    def put(self, spec_link: str, spec: PreparedSpec) -> None:
+        with self._lock:
+            self._entries[spec_link] = _RegistryEntry(spec, fingerprint=_get_fingerprint(spec_link))
+
+    def put_stale(self, spec_link: str, spec: PreparedSpec) -> None:
+        with self._lock:
+            if spec_link not in self._entries:
+                self._entries[spec_link] = _RegistryEntry(spec, loaded_at=float('-inf'))
+
+    def begin_load(self,
+                   spec_link: str,
+                   loop: asyncio.AbstractEventLoop | None = None,
+                   ) -> Tuple[PreparedSpec | None, _Flight | None, bool]:
+        """
+        Return the registered spec, or the flight loading it.
+
+        :return: (spec, None, False) on a hit, (None, flight, is_leader) otherwise.
+            The leader must load the spec and pass the outcome to `end_load`.
+        """
+        with self._lock:
+            spec = self.get(spec_link)
+            if spec is not None:
+                return spec, None, False
+            flight = self._flights.get(spec_link)
+            if flight is not None:
+                return None, flight, False
+            flight = self._flights[spec_link] = _Flight(loop)
+            flight.fingerprint = _get_fingerprint(spec_link)
+            return None, flight, True
+
+    def end_load(self,
+                 spec_link: str,
+                 flight: _Flight,
+                 result: PreparedSpec | None,
+                 error: BaseException | None = None,
+                 ) -> None:
+        with self._lock:
+            if result is not None:
+                self._entries[spec_link] = _RegistryEntry(result, fingerprint=flight.fingerprint)
+            if self._flights.get(spec_link) is flight:
+                del self._flights[spec_link]
+        flight.finish(result, error)
+
+    def abandon_load(self, spec_link: str, flight: _Flight) -> None:
+        """
+        End the flight without an outcome, e.g. the leader was cancelled. One of the waiters leads a new one.
+        """
+        with self._lock:
+            if self._flights.get(spec_link) is flight:
+                del self._flights[spec_link]
+        flight.abandon()
+
+    def invalidate(self, spec_link: str | None = None) -> None:
+        with self._lock:
+            if spec_link is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(spec_link, None)
+
+    def __contains__(self, spec_link: object) -> bool:
+        return isinstance(spec_link, str) and self.get(spec_link) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+spec_registry = SpecRegistry()
+
+
+def _get_stale_spec(spec_link: str) -> PreparedSpec | None:
+    spec = spec_registry.get_stale(spec_link)
+    if spec is None:
+        spec = read_stale_cache(spec_link)
+        if spec is not None:
+            spec_registry.put_stale(spec_link, spec)
+    return spec
+
+
+def _carry_over(spec: PreparedSpec | None, previous: PreparedSpec | None) -> PreparedSpec | None:
+    # a reloaded spec keeps what has been converted and compiled for the operations that haven't changed
+    if spec is None or previous is None or spec is previous:
+        return spec
+    if spec.version == previous.version:
+        return previous
+    spec.inherit(previous)
+    return spec
+
+
+def _refresh(validator: BaseValidator, flight: _Flight) -> None:
+    assert validator.spec_link is not None
+    result, error = None, None
+    try:
+        result = _carry_over(load_cache(validator), spec_registry.get_stale(validator.spec_link))
+    except Exception as e:
+        error = e
+        validator.output(e, f"An error occurred while refreshing the spec {validator.spec_link} in background")
+    finally:
+        spec_registry.end_load(validator.spec_link, flight, result, error)
+
+
+def _refresh_in_background(validator: BaseValidator, flight: _Flight) -> None:
+    # a thread leads the flight now, so sync waiters on the loop thread are safe to block
+    flight.loop = None
+    Thread(target=_refresh, args=(validator, flight), name='spec-refresh', daemon=True).start()
+
+
+def load_spec(validator: BaseValidator) -> PreparedSpec | None:
+    spec_link = validator.spec_link
+    if spec_link is None:
+        raise ValueError("Spec link cannot be None")
+
+    while True:
+        spec, flight, is_leader = spec_registry.begin_load(spec_link)
+        if flight is None:
+            count('registry_hit', spec_link, validator.func_name)
+            return spec
+        count('registry_miss', spec_link, validator.func_name)
+
+        if Config.STALE_WHILE_REVALIDATE:
+            stale_spec = _get_stale_spec(spec_link)
+            if stale_spec is not None:
+                if is_leader:
+                    _refresh_in_background(validator, flight)
+                return stale_spec
+
+        if is_leader:
+            return _lead(validator, spec_link, flight)
+
+        if flight.loop is not None and flight.loop is _get_running_loop():
+            # the leader is a coroutine of the loop this thread runs, waiting for it would deadlock,
+            # and so would the cross-process lock it holds across its awaits
+            return load_cache(validator, is_locked=False)
+        spec = flight.wait()
+        if not flight.is_abandoned:
+            return spec
+
+
+def _lead(validator: BaseValidator, spec_link: str, flight: _Flight) -> PreparedSpec | None:
+    try:
+        # failed downloads (None) are not remembered, so the next mock retries
+        result = _carry_over(load_cache(validator), spec_registry.get_stale(spec_link))
+    except Exception as e:
+        spec_registry.end_load(spec_link, flight, None, e)
+        raise
+    except BaseException:
+        # interrupted, not failed: the waiters don't share it
+        spec_registry.abandon_load(spec_link, flight)
+        raise
+    spec_registry.end_load(spec_link, flight, result)
+    return result
+
+
+async def load_spec_async(validator: BaseValidator) -> PreparedSpec | None:
+    spec_link = validator.spec_link
+    if spec_link is None:
+        raise ValueError("Spec link cannot be None")
+
+    loop = asyncio.get_running_loop()
+    while True:
+        spec, flight, is_leader = spec_registry.begin_load(spec_link, loop)
+        if flight is None:
+            count('registry_hit', spec_link, validator.func_name)
+            return spec
+        count('registry_miss', spec_link, validator.func_name)
+
+        if Config.STALE_WHILE_REVALIDATE:
+            stale_spec = await loop.run_in_executor(None, _get_stale_spec, spec_link)
+            if stale_spec is not None:
+                if is_leader:
+                    _refresh_in_background(validator, flight)
+                return stale_spec
+
+        if is_leader:
+            return await _lead_async(validator, spec_link, flight)
+
+        spec = await flight.wait_async()
+        if not flight.is_abandoned:
+            return spec
+
+
+async def _lead_async(validator: BaseValidator, spec_link: str, flight: _Flight) -> PreparedSpec | None:
+    try:
+        result = _carry_over(await load_cache_async(validator), spec_registry.get_stale(spec_link))
+    except Exception as e:
+        spec_registry.end_load(spec_link, flight, None, e)
+        raise
+    except BaseException:
+        # cancelled, the waiters are not: one of them loads the spec instead
+        spec_registry.abandon_load(spec_link, flight)
+        raise
+    spec_registry.end_load(spec_link, flight, result)
+    return result
+
+
+def invalidate_spec(spec_link: str | None = None) -> None:
+    """
+    Drop the parsed spec from the process registry.
+
+    Args:
+        spec_link: The link of the spec to forget. `None` forgets all specs.
+    """
+    spec_registry.invalidate(spec_link)
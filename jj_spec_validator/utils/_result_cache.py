@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+from typing import Any, Hashable, NamedTuple
+
+from .._config import Config
+
+__all__ = ('ResultCacheInfo', 'ValidationResultCache', 'result_cache', 'body_digest', 'MISSING',
+           'validation_cache_info', 'clear_validation_cache', )
+
+MISSING = object()
+
+
+class ResultCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def body_digest(body: bytes) -> bytes:
+    return blake2b(body, digest_size=16).digest()
+
+
+class ValidationResultCache:
+    """
+    Bounded LRU of validation outcomes: None for a valid body, the ValidationException otherwise.
+
+    Holds at most `Config.RESULT_CACHE_SIZE` outcomes, 0 disables the cache.
+    """
+
+    def __init__(self) -> None:
+        self._results: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            result = self._results.get(key, MISSING)
+            if result is MISSING:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._results.move_to_end(key)
+            return result
+
+    def put(self, key: Hashable, result: Any) -> None:
+        maxsize = Config.RESULT_CACHE_SIZE
+        if maxsize <= 0:
+            return
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > maxsize:
+                self._results.popitem(last=False)
+
+    def info(self) -> ResultCacheInfo:
+        with self._lock:
+            return ResultCacheInfo(self._hits, self._misses, Config.RESULT_CACHE_SIZE, len(self._results))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._hits = self._misses = 0
+
+
+result_cache = ValidationResultCache()
+
+
+def validation_cache_info() -> ResultCacheInfo:
+    """
+    Return hits, misses, max size and current size of the memoized validation results.
+    """
+    return result_cache.info()
+
+
+def clear_validation_cache() -> None:
+    result_cache.clear()
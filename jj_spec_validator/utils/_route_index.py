@@ -0,0 +1,141 @@
+import re
+from difflib import SequenceMatcher
+from heapq import nsmallest
+from typing import Dict, FrozenSet, Iterable, List, Pattern, Set, Tuple, Union
+
+from aiohttp.web_urldispatcher import DynamicResource
+
+__all__ = ('RouteIndex', )
+
+# the same variables normalize_path replaces, so templated mocks match exactly as before
+_VAR_RE = re.compile(r'{[a-zA-Z0-9_]+}')
+_VAR_PLACEHOLDER = '{}'
+
+SpecUnit = Tuple[str, str]
+
+
+class _Resource(DynamicResource):
+    def match(self, path: str) -> Union[Dict[str, str], None]:
+        return self._match(path)
+
+
+def _segment_key(segment: str) -> str:
+    return _VAR_RE.sub(_VAR_PLACEHOLDER, segment)
+
+
+def _compile_segment(segment: str) -> Pattern[str] | None:
+    # aiohttp does the same translation for the whole path, variables never cross "/"
+    try:
+        pattern: Pattern[str] = _Resource('/' + segment).get_info()['pattern']
+    except ValueError:
+        # not a valid aiohttp route, so literal mocks never matched it
+        return None
+    return pattern
+
+
+def _path_similarity(mock_segments: List[str], spec_segments: List[str]) -> float:
+    score = 0.0
+    for mock_segment, spec_segment in zip(mock_segments, spec_segments):
+        if mock_segment == spec_segment:
+            score += 2.0
+        elif '{' in spec_segment or '{' in mock_segment:
+            score += 1.0
+        else:
+            score += SequenceMatcher(None, mock_segment, spec_segment).ratio()
+    return score - abs(len(mock_segments) - len(spec_segments))
+
+
+class _Node:
+    __slots__ = ('children', 'dynamic', 'units')
+
+    def __init__(self) -> None:
+        # keyed by the segment with variables replaced, literal and templated alike
+        self.children: Dict[str, _Node] = {}
+        # templated segments only, tried against literal mock segments
+        self.dynamic: List[Tuple[Pattern[str], _Node]] = []
+        # http method -> spec units ending at this node, several if their paths differ in variable names only
+        self.units: Dict[str, List[SpecUnit]] = {}
+
+
+class RouteIndex:
+    """
+    Segment trie over the (method, path) units of a spec, partitioned by method at the leaves.
+
+    Lookups cost O(path depth) instead of a scan over every unit of the spec.
+    """
+
+    def __init__(self, units: Iterable[SpecUnit]) -> None:
+        self._root = _Node()
+        self._units: Set[SpecUnit] = set()
+        self._by_method: Dict[str, Set[SpecUnit]] = {}
+        for unit in units:
+            self._add(unit)
+
+    def _add(self, unit: SpecUnit) -> None:
+        http_method, path = unit
+        node = self._root
+        for segment in path.split('/'):
+            key = _segment_key(segment)
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _Node()
+                if '{' in segment:
+                    pattern = _compile_segment(segment)
+                    if pattern is not None:
+                        node.dynamic.append((pattern, child))
+            node = child
+        if unit not in self._units:
+            node.units.setdefault(http_method, []).append(unit)
+        self._units.add(unit)
+        self._by_method.setdefault(http_method, set()).add(unit)
+
+    @property
+    def units(self) -> FrozenSet[SpecUnit]:
+        return frozenset(self._units)
+
+    def find_by_method(self, http_method: str) -> Set[SpecUnit]:
+        return set(self._by_method.get(http_method, ()))
+
+    def find_by_path(self, path: str) -> Set[SpecUnit]:
+        segments = path.split('/')
+        if '{' in path:
+            # templated mock: variable names are ignored, everything else must be equal
+            node = self._root
+            for segment in segments:
+                child = node.children.get(_segment_key(segment))
+                if child is None:
+                    return set()
+                node = child
+            return {unit for units in node.units.values() for unit in units}
+
+        found: Set[SpecUnit] = set()
+        self._walk(self._root, segments, 0, found)
+        return found
+
+    def _walk(self, node: _Node, segments: List[str], depth: int, found: Set[SpecUnit]) -> None:
+        if depth == len(segments):
+            for units in node.units.values():
+                found.update(units)
+            return
+        segment = segments[depth]
+        child = node.children.get(segment)
+        if child is not None:
+            self._walk(child, segments, depth + 1, found)
+        for pattern, dynamic_child in node.dynamic:
+            if pattern.fullmatch('/' + segment) is not None:
+                self._walk(dynamic_child, segments, depth + 1, found)
+
+    def nearest(self, http_method: str | None, path: str | None, limit: int = 5) -> List[SpecUnit]:
+        """
+        Rank the units by similarity of the path segments and the method, for the hint of a failed match.
+
+        Every unit is scored, so it's meant for the failures only.
+        """
+        mock_segments = None if path is None else path.split('/')
+        scored = []
+        for unit in self._units:
+            score = 1.0 if unit[0] == http_method else 0.0
+            if mock_segments is not None:
+                score += _path_similarity(mock_segments, unit[1].split('/'))
+            scored.append((-score, unit))
+        return [unit for _, unit in nsmallest(limit, scored)]
@@ -1,6 +1,5 @@
-from typing import Any, Dict, Union
+from typing import Any, List, Set, Tuple
 
-from aiohttp.web_urldispatcher import DynamicResource
 from jj.matchers import AllMatcher as JJAllMatcher
 from jj.matchers import AnyMatcher as JJAnyMatcher
 from jj.matchers import EqualMatcher as JJEqualMatcher
@@ -10,6 +9,7 @@ from jj.matchers import ResolvableMatcher
 from jj.matchers.attribute_matchers import RouteMatcher as JJRouteMatcher
 
 from ._common import destroy_prefix, normalize_path
+from ._route_index import RouteIndex, _Resource
 
 __all__ = ('create_openapi_matcher', )
 
@@ -18,6 +18,30 @@ class BaseMatcher:
     def match(self, spec_unit: tuple[str, str]) -> bool:
         raise NotImplementedError()
 
+    def resolve(self, route_index: RouteIndex) -> Set[tuple[str, str]]:
+        """
+        Return all spec units of the index matched by this matcher.
+
+        :param route_index: The route index of the spec.
+        :return: A set of matched (method, path) units.
+        """
+        return {spec_unit for spec_unit in route_index.units if self.match(spec_unit)}
+
+    def route_hint(self) -> Tuple[str | None, str | None]:
+        """
+        :return: (method, path) the matcher looks for, None where unknown, to suggest the closest API methods.
+        """
+        return None, None
+
+
+def _merge_route_hints(matchers: List[BaseMatcher]) -> Tuple[str | None, str | None]:
+    http_method, path = None, None
+    for matcher in matchers:
+        matcher_method, matcher_path = matcher.route_hint()
+        http_method = http_method or matcher_method
+        path = path or matcher_path
+    return http_method, path
+
 
 class MethodMatcher(BaseMatcher):
     def __init__(self, mocked_method: Any) -> None:
@@ -26,6 +50,12 @@ class MethodMatcher(BaseMatcher):
     def match(self, spec_unit: tuple[str, str]) -> bool:
         return bool(self._mocked_method == spec_unit[0])
 
+    def resolve(self, route_index: RouteIndex) -> Set[tuple[str, str]]:
+        return route_index.find_by_method(self._mocked_method)
+
+    def route_hint(self) -> Tuple[str | None, str | None]:
+        return str(self._mocked_method), None
+
     def __repr__(self) -> str:
         """
         Return a string representation of the MethodMatcher instance.
@@ -35,11 +65,6 @@ class MethodMatcher(BaseMatcher):
         return f"{self.__class__.__qualname__}({self._mocked_method!r})"
 
 
-class _Resource(DynamicResource):
-    def match(self, path: str) -> Union[Dict[str, str], None]:
-        return self._match(path)
-
-
 class RouteMatcher(BaseMatcher):
     def __init__(self, mocked_path: str) -> None:
         self._mocked_path = mocked_path
@@ -51,8 +76,14 @@ class RouteMatcher(BaseMatcher):
         if "{" in mock:
             return normalize_path(mock) == normalize_path(spec)
         else:
-            self._resource_spec = _Resource(spec)
-            return self._resource_spec.match(mock) is not None
+            # a local, matchers are shared by the threads validating the same mock
+            return _Resource(spec).match(mock) is not None
+
+    def resolve(self, route_index: RouteIndex) -> Set[tuple[str, str]]:
+        return route_index.find_by_path(self._mocked_path)
+
+    def route_hint(self) -> Tuple[str | None, str | None]:
+        return None, self._mocked_path
 
     def __repr__(self) -> str:
         """
@@ -74,6 +105,15 @@ class AnyMatcher(BaseMatcher):
                 return True
         return False
 
+    def resolve(self, route_index: RouteIndex) -> Set[tuple[str, str]]:
+        resolved: Set[tuple[str, str]] = set()
+        for matcher in self._matchers:
+            resolved |= matcher.resolve(route_index)
+        return resolved
+
+    def route_hint(self) -> Tuple[str | None, str | None]:
+        return _merge_route_hints(self._matchers)
+
     def __repr__(self) -> str:
         """
         Return a string representation of the AnyMatcher instance.
@@ -95,6 +135,20 @@ class AllMatcher(BaseMatcher):
                 return False
         return True
 
+    def resolve(self, route_index: RouteIndex) -> Set[tuple[str, str]]:
+        # a method matches a big part of the spec, so the others go first
+        # and the few units they resolve are filtered instead of intersected
+        matchers = sorted(self._matchers, key=lambda matcher: isinstance(matcher, MethodMatcher))
+        resolved = matchers[0].resolve(route_index)
+        for matcher in matchers[1:]:
+            if not resolved:
+                break
+            resolved = {spec_unit for spec_unit in resolved if matcher.match(spec_unit)}
+        return resolved
+
+    def route_hint(self) -> Tuple[str | None, str | None]:
+        return _merge_route_hints(self._matchers)
+
     def __repr__(self) -> str:
         """
         Return a string representation of the AllMatcher instance.
@@ -0,0 +1,81 @@
+import json
+import re
+from types import ModuleType
+from typing import Any, Dict, cast
+
+from yaml import CLoader, load
+
+orjson: ModuleType | None
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+__all__ = ('parse_spec', )
+
+_JSON_START_RE = re.compile(rb'\s*[{\[]')
+# 20 digits in a row may be an integer over 64 bits, orjson parses those as floats or rejects them
+_DIGITS_TO_ZEROS = bytes.maketrans(b'123456789', b'0' * 9)
+_LONG_NUMBER = b'0' * 20
+
+
+def _has_long_number(content: bytes | memoryview) -> bool:
+    # a translation and a substring search, a few percent of the parsing, unlike a regex
+    return _LONG_NUMBER in bytes(content).translate(_DIGITS_TO_ZEROS)
+
+
+def _loads_json(content: bytes | memoryview) -> Any:
+    if orjson is not None and not _has_long_number(content):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # NaN and Infinity are rejected by orjson, the json module parses them
+            pass
+    return json.loads(bytes(content))
+
+
+def _reject_constant(constant: str) -> Any:
+    raise ValueError(f"{constant} is not JSON")
+
+
+def _loads_strict_json(content: bytes | memoryview) -> Any:
+    """
+    Parse JSON without the extensions of the json module, ValueError for anything else.
+    """
+    if orjson is not None:
+        if _has_long_number(content):
+            raise ValueError("Integers over 64 bits are not parsed by orjson")
+        return orjson.loads(content)
+    return json.loads(bytes(content), parse_constant=_reject_constant)
+
+
+def _loads_yaml(content: bytes | memoryview) -> Any:
+    # generated specs are often JSON served as YAML, JSON parsers are much faster than a YAML one
+    if _JSON_START_RE.match(content):
+        try:
+            return _loads_strict_json(content)
+        except ValueError:
+            # a YAML flow mapping, or JSON the fast parser doesn't take, e.g. integers over 64 bits for orjson
+            pass
+    return load(bytes(content), Loader=CLoader)
+
+
+def parse_spec(content: bytes | memoryview, content_type: str, spec_link: str) -> Dict[str, Any]:
+    """
+    Parse the raw bytes of a JSON or YAML spec, without decoding them into a str first.
+
+    Args:
+        content: The raw spec, memoryviews are parsed without a copy by orjson.
+        content_type: Content-Type of the spec, the format is guessed from `spec_link` if it's not a JSON or YAML one.
+        spec_link: The link the spec was loaded from.
+    """
+    if 'application/json' in content_type:
+        return cast(Dict[str, Any], _loads_json(content))
+    elif 'text/yaml' in content_type or 'application/x-yaml' in content_type:
+        return cast(Dict[str, Any], _loads_yaml(content))
+    # trying to match via file extension
+    elif spec_link.endswith('.json'):
+        return cast(Dict[str, Any], _loads_json(content))
+    elif spec_link.endswith('.yaml') or spec_link.endswith('.yml'):
+        return cast(Dict[str, Any], _loads_yaml(content))
+    raise ValueError(f"Unsupported content type: {content_type}")
@@ -0,0 +1,162 @@
+import json
+import mmap
+import struct
+from hashlib import sha256
+from os import path, replace, stat
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import Dict, Mapping, NamedTuple, Tuple
+from urllib.parse import unquote, urlsplit
+
+__all__ = ('is_local_spec', 'get_local_fingerprint', 'read_local_spec', 'build_bundle', )
+
+BUNDLE_SCHEME = 'bundle'
+_BUNDLE_MAGIC = b'JJSPECBUNDLE1\n'
+_INDEX_LENGTH = struct.Struct('>Q')
+
+_CONTENT_TYPES = {
+    '.json': 'application/json',
+    '.yaml': 'text/yaml',
+    '.yml': 'text/yaml',
+}
+
+
+class _BundleItem(NamedTuple):
+    offset: int
+    length: int
+    sha256: str
+    content_type: str
+
+
+class _Bundle:
+    """
+    Memory-mapped bundle of specs: only the index is read, specs are sliced out of the mapping on demand.
+    """
+
+    def __init__(self, filename: str) -> None:
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.stat = _file_stat(filename)
+        if self._mmap[:len(_BUNDLE_MAGIC)] != _BUNDLE_MAGIC:
+            raise ValueError(f"{filename} is not a spec bundle")
+        index_start = len(_BUNDLE_MAGIC) + _INDEX_LENGTH.size
+        index_length, = _INDEX_LENGTH.unpack_from(self._mmap, len(_BUNDLE_MAGIC))
+        index = json.loads(self._mmap[index_start:index_start + index_length])
+        self.items = {name: _BundleItem(**item) for name, item in index.items()}
+
+    def get_item(self, name: str) -> _BundleItem:
+        try:
+            return self.items[name]
+        except KeyError:
+            raise FileNotFoundError(f"There is no spec '{name}' in the bundle") from None
+
+    def read(self, name: str) -> memoryview:
+        item = self.get_item(name)
+        return memoryview(self._mmap)[item.offset:item.offset + item.length]
+
+
+_bundles: Dict[str, _Bundle] = {}
+_bundles_lock = Lock()
+
+
+def _file_stat(filename: str) -> Tuple[int, int]:
+    file_stat = stat(filename)
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def _get_bundle(filename: str) -> _Bundle:
+    filename = path.abspath(filename)
+    with _bundles_lock:
+        bundle = _bundles.get(filename)
+        # a rebuilt bundle is mapped again, the old mapping stays valid for the specs read from it
+        if bundle is None or bundle.stat != _file_stat(filename):
+            bundle = _bundles[filename] = _Bundle(filename)
+    return bundle
+
+
+def _split_spec_link(spec_link: str) -> Tuple[str, str, str]:
+    """
+    :return: Scheme ('' for plain paths), the file name and the name of the spec in the bundle.
+    """
+    parts = urlsplit(spec_link)
+    if parts.scheme == BUNDLE_SCHEME:
+        return BUNDLE_SCHEME, unquote(parts.netloc + parts.path), parts.fragment
+    elif parts.scheme == 'file':
+        if parts.netloc not in ('', 'localhost'):
+            raise ValueError(f"Remote file URLs are not supported: {spec_link}")
+        return 'file', unquote(parts.path), ''
+    return '', spec_link, ''
+
+
+def is_local_spec(spec_link: str) -> bool:
+    """
+    Whether the spec is read from the file system: a path, a file:// URL or a bundle:PATH#NAME link.
+    """
+    scheme = urlsplit(spec_link).scheme
+    # one letter schemes are Windows drives
+    return scheme in ('', 'file', BUNDLE_SCHEME) or len(scheme) == 1
+
+
+def get_local_fingerprint(spec_link: str) -> str:
+    """
+    Identify the current content of a local spec without reading it:
+    mtime and size of a file, the content hash from the index of a bundle.
+    """
+    scheme, filename, name = _split_spec_link(spec_link)
+    if scheme == BUNDLE_SCHEME:
+        return 'sha256:' + _get_bundle(filename).get_item(name).sha256
+    mtime_ns, size = _file_stat(filename)
+    return f'stat:{mtime_ns}:{size}'
+
+
+def read_local_spec(spec_link: str) -> Tuple[bytes | memoryview, str]:
+    """
+    :return: The raw spec and its content type, specs of bundles aren't copied out of the mapping.
+    """
+    scheme, filename, name = _split_spec_link(spec_link)
+    if scheme == BUNDLE_SCHEME:
+        bundle = _get_bundle(filename)
+        return bundle.read(name), bundle.get_item(name).content_type
+    with open(filename, 'rb') as f:
+        return f.read(), _CONTENT_TYPES.get(path.splitext(filename)[1].lower(), '')
+
+
+def build_bundle(filename: str, spec_files: Mapping[str, str]) -> None:
+    """
+    Pack spec files into one bundle, specs are referenced as bundle:FILENAME#NAME.
+
+    Args:
+        filename: The bundle to write.
+        spec_files: Name of the spec in the bundle -> the spec file.
+    """
+    contents = {}
+    for name, spec_file in spec_files.items():
+        with open(spec_file, 'rb') as f:
+            content = f.read()
+        content_type = _CONTENT_TYPES.get(path.splitext(spec_file)[1].lower())
+        if content_type is None:
+            raise ValueError(f"Unsupported spec file extension: {spec_file}")
+        contents[name] = (content, content_type)
+
+    # offsets are relative to the file start, so they depend on the length of the index itself
+    index: Dict[str, Dict[str, int | str]] = {}
+    index_data = b''
+    while True:
+        offset = len(_BUNDLE_MAGIC) + _INDEX_LENGTH.size + len(index_data)
+        for name, (content, content_type) in contents.items():
+            index[name] = {'offset': offset, 'length': len(content),
+                           'sha256': sha256(content).hexdigest(), 'content_type': content_type}
+            offset += len(content)
+        index_length = len(index_data)
+        index_data = json.dumps(index, sort_keys=True).encode()
+        if len(index_data) == index_length:
+            break
+
+    directory = path.dirname(path.abspath(filename))
+    with NamedTemporaryFile('wb', dir=directory, suffix='.tmp', delete=False) as tmp:
+        tmp.write(_BUNDLE_MAGIC)
+        tmp.write(_INDEX_LENGTH.pack(len(index_data)))
+        tmp.write(index_data)
+        for content, _ in contents.values():
+            tmp.write(content)
+    replace(tmp.name, filename)
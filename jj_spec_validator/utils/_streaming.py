@@ -0,0 +1,188 @@
+import re
+from codecs import getincrementaldecoder
+from json import JSONDecodeError, JSONDecoder, loads
+from typing import Any, Iterator
+
+from d42.declaration import GenericSchema
+from d42.declaration.types import ListSchema
+from d42.validation import Formatter, ValidationException, ValidationResult, format_result
+from niltype import Nil
+from th import PathHolder
+
+from ._compiler import CompiledValidator, _compile, _len_checker, _non_strict_visitor, _strict_visitor
+
+__all__ = ('iter_json_array', 'is_json_array', 'is_streamable', 'validate_stream', )
+
+# bytes of the body decoded at once, an element longer than it is read in growing chunks
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_WHITESPACE_BYTES = re.compile(rb'[ \t\n\r]*')
+_NUMBER_TAIL = re.compile(r'[0-9.eE+\-]*')
+
+_decoder = JSONDecoder()
+_formatter = Formatter()
+
+
+class _TextStream:
+    """
+    Text of a UTF-8 body decoded chunk by chunk. Only the unparsed tail is kept in `text`.
+    """
+
+    def __init__(self, body: bytes, chunk_size: int) -> None:
+        self._body = memoryview(body)
+        self._offset = 0
+        self._chunk_size = chunk_size
+        self._decoder = getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+
+    def read_more(self, size: int | None = None) -> bool:
+        """
+        Append the next chunk of the body to the unparsed text.
+
+        :return: False if the whole body has already been read.
+        """
+        if self._offset >= len(self._body):
+            return False
+        chunk = self._body[self._offset:self._offset + (size or self._chunk_size)]
+        self._offset += len(chunk)
+        self.text = self.text[self.pos:] + self._decoder.decode(chunk, final=self._offset >= len(self._body))
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self) -> bool:
+        """
+        :return: False if nothing but whitespace is left.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()  # type: ignore[union-attr]
+            if self.pos < len(self.text):
+                return True
+            if not self.read_more():
+                return False
+
+    def read_value(self) -> Any:
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except JSONDecodeError:
+                # the value may be cut by the chunk, invalid JSON fails once the body is read
+                if not self.read_more(size):
+                    raise
+                size *= 2
+                continue
+            # a number at the end of the chunk may continue in the next one, e.g. `1` of `1.5`
+            if _NUMBER_TAIL.match(self.text, end).end() == len(self.text) and self.read_more(size):  # type: ignore[union-attr]
+                size *= 2
+                continue
+            self.pos = end
+            return value
+
+    def error(self, message: str) -> JSONDecodeError:
+        return JSONDecodeError(message, self.text, self.pos)
+
+
+def iter_json_array(body: bytes, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Parse the elements of a JSON array body one by one, without decoding the whole body.
+
+    :raise JSONDecodeError: The body isn't a JSON array, raised once the parsing gets to the error.
+    """
+    stream = _TextStream(body, chunk_size)
+    if not stream.skip_whitespace() or stream.text[stream.pos] != '[':
+        raise stream.error("Expecting '['")
+    stream.pos += 1
+    if not stream.skip_whitespace():
+        raise stream.error("Expecting value")
+
+    if stream.text[stream.pos] == ']':
+        stream.pos += 1
+    else:
+        while True:
+            yield stream.read_value()
+            if not stream.skip_whitespace():
+                raise stream.error("Expecting ',' delimiter")
+            delimiter = stream.text[stream.pos]
+            stream.pos += 1
+            if delimiter == ']':
+                break
+            if delimiter != ',':
+                raise stream.error("Expecting ',' delimiter")
+            if not stream.skip_whitespace():
+                raise stream.error("Expecting value")
+
+    if stream.skip_whitespace():
+        raise stream.error("Extra data")
+
+
+def is_json_array(body: bytes) -> bool:
+    start = _WHITESPACE_BYTES.match(body).end()  # type: ignore[union-attr]
+    return body[start:start + 1] == b'['
+
+
+def is_streamable(schema: GenericSchema) -> bool:
+    """
+    Lists of elements of one type are validated element by element.
+    """
+    # exact type, as in the compiler
+    return (type(schema) is ListSchema
+            and schema.props.type is not Nil
+            and {'type', 'len', 'min_len', 'max_len'}.issuperset(schema.props))
+
+
+def _format_errors(result: ValidationResult, is_strict: bool, note: str | None) -> str:
+    # the same messages as validate_or_fail and validate_non_strict
+    if is_strict:
+        lines = [e.format(_formatter) for e in result.get_errors()]
+        if note:
+            lines.append(note)
+        return "\n - " + "\n - ".join(lines)
+    lines = format_result(result)
+    if note:
+        lines.append("- " + note)
+    return "\n".join(lines)
+
+
+def validate_stream(validator: CompiledValidator, body: bytes, max_errors: int | None = None) -> bool:
+    """
+    Validate a JSON array body against a list schema while it's parsed, see `is_streamable`.
+
+    Only the element being validated is materialized. Lengths out of the schema bounds
+    are validated again on the whole body, so the error is exactly the d42 one.
+    Otherwise the errors are the d42 ones, cut after `max_errors` mismatched elements.
+
+    Args:
+        validator: Compiled validator of the list schema.
+        body: The raw response body.
+        max_errors: Mismatched elements to stop the validation after, None validates every element.
+            The rest of the body is still parsed and checked, for the length and for the JSON errors.
+    :raise JSONDecodeError: The body isn't a JSON array.
+    """
+    element_schema = validator.schema.props.type
+    check_element = _compile(element_schema, validator.is_strict)
+    visitor = _strict_visitor if validator.is_strict else _non_strict_visitor
+
+    result = ValidationResult()
+    size = 0
+    mismatched = 0
+    is_cut = False
+    for index, item in enumerate(iter_json_array(body)):
+        size += 1
+        if check_element(item):
+            continue
+        if max_errors is not None and mismatched >= max_errors:
+            # describing the mismatch is the costly part, the rest is only checked
+            is_cut = True
+            continue
+        result.add_errors(element_schema.__accept__(visitor, value=item, path=PathHolder()[index]).get_errors())
+        mismatched += 1
+
+    check_len = _len_checker(validator.schema.props)
+    if check_len is not None and not check_len(range(size)):
+        return validator.validate(loads(body))
+    if result.has_errors():
+        note = f"... stopped after the first {mismatched} mismatched elements" if is_cut else None
+        raise ValidationException(_format_errors(result, validator.is_strict, note))
+    return True
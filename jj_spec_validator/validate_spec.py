@@ -1,14 +1,28 @@
 import asyncio
 from functools import wraps
-from typing import Callable, TypeVar
-
-from jj import RelayResponse
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, Dict, List, TypeVar
 
 from ._config import Config
-from .validator import Validator
+from .deferred import deferred_queue
+from .policy import ValidationPolicy
+from .utils._metrics import count
+
+if TYPE_CHECKING:
+    from .validator import Validator
 
 _T = TypeVar('_T')
 
+# spec links of all decorated functions, in declaration order
+_declared_spec_links: Dict[str, None] = {}
+
+
+def get_declared_spec_links() -> List[str]:
+    """
+    Return the spec links of all functions decorated with `validate_spec` so far.
+    """
+    return list(_declared_spec_links)
+
 
 def validate_spec(*,
                   spec_link: str | None,
@@ -17,50 +31,91 @@ def validate_spec(*,
                   is_strict: bool | None = None,
                   prefix: str | None = None,
                   force_strict: bool = False,
+                  is_deferred: bool | None = None,
+                  policy: ValidationPolicy | None = None,
                   ) -> Callable[[Callable[..., _T]], Callable[..., _T]]:
     """
     Validates the jj mock function with given specification lint.
 
     Args:
        skip_if_failed_to_get_spec: If True - skip validation if failed to get spec. False is default.
-       spec_link: The link to the specification. `None` for disable validation.
+       spec_link: The link to the specification: an http(s) URL, a file path or file:// URL, or bundle:PATH#NAME.
+           `None` for disable validation.
        is_raise_error: If True - raises error when validation is failes. False is default.
        is_strict: If True - validate exact structure in given mocked.
        prefix: Prefix is used to cut paths prefix in mock function.
        force_strict: If True - forced remove all Ellipsis from the spec.
+       is_deferred: If True - validate in background, errors are raised by `flush()` / `await flush_async()`.
+       policy: Which mocks are validated, e.g. ValidateFirst(10). `Config.VALIDATION_POLICY` if None.
     """
     def decorator(func: Callable[..., _T]) -> Callable[..., _T]:
         func_name = func.__name__
+        if spec_link is not None:
+            _declared_spec_links[spec_link] = None
 
-        validator = Validator(
+        validation_policy = policy if policy is not None else Config.VALIDATION_POLICY
+        settings = dict(
             spec_link=spec_link,
             prefix=prefix,
             func_name=func_name,
             force_strict=force_strict,
             skip_if_failed_to_get_spec=skip_if_failed_to_get_spec if skip_if_failed_to_get_spec is not None else Config.SKIP_IF_FAILED_TO_GET_SPEC,
             is_raise_error=is_raise_error if is_raise_error is not None else Config.IS_RAISES,
-            is_strict=is_strict if is_strict is not None else Config.IS_STRICT
+            is_strict=is_strict if is_strict is not None else Config.IS_STRICT,
+            policy=validation_policy,
             )
+        deferred = is_deferred if is_deferred is not None else Config.IS_DEFERRED
+
+        def is_skipped() -> bool:
+            if validation_policy is None or validation_policy.should_validate(func_name):
+                return False
+            count('validation_skipped', spec_link, func_name)
+            return True
+
+        # the validator, with the spec loading and validation dependencies, is imported by the first mock
+        created_validator: 'Validator | None' = None
+        validator_lock = Lock()
+
+        def get_validator() -> 'Validator':
+            nonlocal created_validator
+            if created_validator is None:
+                # mocks may be registered from several threads, they all share one validator
+                with validator_lock:
+                    if created_validator is None:
+                        from .validator import Validator
+                        created_validator = Validator(**settings)  # type: ignore[arg-type]
+            return created_validator
 
         @wraps(func)
         async def async_wrapper(*args: object, **kwargs: object) -> _T:
             mocked = await func(*args, **kwargs)
-            if validator.spec_link:
+            if spec_link and not is_skipped():
+                from jj import RelayResponse
+                validator = get_validator()
                 if isinstance(mocked.handler.response, RelayResponse):
                     print("RelayResponse type is not supported")
                     return mocked
-                validator.validate(mocked)
+                if deferred:
+                    deferred_queue.submit(validator, mocked.handler.matcher, mocked.handler.response.get_body())
+                else:
+                    await validator.validate_async(mocked)
             else:...
             return mocked
 
         @wraps(func)
         def sync_wrapper(*args: object, **kwargs: object) -> _T:
             mocked = func(*args, **kwargs)
-            if validator.spec_link:
-                if isinstance(mocked.handler.response, RelayResponse):
+            if spec_link and not is_skipped():
+                from jj import RelayResponse
+                validator = get_validator()
+                handler = mocked.handler
+                if isinstance(handler.response, RelayResponse):
                     print("RelayResponse type is not supported")
                     return mocked
-                validator.validate(mocked)
+                if deferred:
+                    deferred_queue.submit(validator, handler.matcher, handler.response.get_body())
+                else:
+                    validator.validate(mocked)
             else:...
             return mocked
 
@@ -1,17 +1,28 @@
+import asyncio
 from json import JSONDecodeError, loads
-from typing import Any, TypeVar
+from time import perf_counter
+from typing import Any, Callable, Tuple
 
-from schemax_openapi import SchemaData
-from d42.validation import ValidationException, validate_or_fail
+from d42.validation import ValidationException
+from jj.matchers import ResolvableMatcher
 
 from ._config import Config
-from .utils import (create_openapi_matcher, get_forced_strict_spec, load_cache,
-                    validate_non_strict)
+from .errors import AmbiguousRouteError, RouteNotFoundError, SpecMatchError
+from .policy import ValidationPolicy
+from .utils import (MISSING, CompiledValidator, PreparedSpec, body_digest, create_openapi_matcher, is_json_array,
+                    is_streamable, load_spec, load_spec_async, result_cache, validate_stream)
+from .utils._metrics import count, timer
+from .utils._spec_matcher import BaseMatcher
 from .validator_base import BaseValidator
 
-_T = TypeVar('_T')
 
 class Validator(BaseValidator):
+    """
+    Validates mocks against the spec of `spec_link`.
+
+    A validation doesn't change the validator, the spec or the matchers, so one instance
+    validates mocks from any number of threads.
+    """
 
     def __init__(self,
                  skip_if_failed_to_get_spec: bool,
@@ -21,6 +32,7 @@ class Validator(BaseValidator):
                  spec_link: str | None = None,
                  force_strict: bool = False,
                  prefix: str | None = None,
+                 policy: 'ValidationPolicy | None' = None,
                  ):
         self.skip_if_failed_to_get_spec = skip_if_failed_to_get_spec
         self.is_raise_error = is_raise_error
@@ -29,6 +41,7 @@ class Validator(BaseValidator):
         self.spec_link = spec_link
         self.force_strict = force_strict
         self.prefix = prefix
+        self.policy = policy
 
     @property
     def func_name(self) -> str:
@@ -73,73 +86,220 @@ class Validator(BaseValidator):
         if self.is_raise_error:
             raise ValidationException(f"There are some mismatches in {self.func_name}:\n{str(exception)}")
 
-    def prepare_data(self) -> dict[tuple[str, str], SchemaData] | None:
+    def prepare_data(self) -> PreparedSpec | None:
+        if self.spec_link is None:
+            raise ValueError("Spec link cannot be None")
+        return load_spec(self)
+
+    async def prepare_data_async(self) -> PreparedSpec | None:
         if self.spec_link is None:
             raise ValueError("Spec link cannot be None")
-        return load_cache(self)
+        return await load_spec_async(self)
 
-    def _prepare_validation(self,
-                           mocked,
-                           ) -> tuple[SchemaData | None, Any] | tuple[None, None]:
-        mock_matcher = mocked.handler.matcher
+    def _decode_body(self,
+                     mocked_body: bytes,
+                     ) -> Any:
         try:
             # check for JSON in response of mock
-            decoded_mocked_body = loads(mocked.handler.response.get_body().decode())
+            return loads(mocked_body.decode())
         except JSONDecodeError:
             raise AssertionError(f"JSON expected in Response body of the {self.func_name}")
 
+    def create_spec_matcher(self,
+                            mock_matcher: ResolvableMatcher,
+                            ) -> BaseMatcher:
+        """
+        Translate the matcher of a mock to the matcher of spec routes, its repr identifies it.
+        """
         spec_matcher = create_openapi_matcher(matcher=mock_matcher, prefix=self.prefix)
 
         if not spec_matcher:
             raise AssertionError(f"There is no valid matcher in {self.func_name}")
 
-        prepared_spec = self.prepare_data()
-        if prepared_spec is None:
-            return None, None
+        return spec_matcher
 
-        all_spec_units = prepared_spec.keys()
-        formatted_units = "\n".join([str(key) for key in all_spec_units])
+    def match_spec_unit(self,
+                        spec_matcher: BaseMatcher,
+                        prepared_spec: PreparedSpec,
+                        ) -> Tuple[str, str]:
+        """
+        Find the only API method of the spec matched by the spec matcher.
 
-        matched_spec_units = [(http_method, path) for http_method, path in all_spec_units if
-                              spec_matcher.match((http_method, path))]
+        :return: (method, path) of the API method.
+        :raises RouteNotFoundError, AmbiguousRouteError: No or several API methods are matched.
+        """
+        matched_spec_units = spec_matcher.resolve(prepared_spec.route_index)
+        if len(matched_spec_units) == 1:
+            return next(iter(matched_spec_units))
 
+        # diagnostics are only built for the failures
         if len(matched_spec_units) > 1:
-            raise AssertionError(f"There is more than 1 matches for mocked API method '{spec_matcher}\n"
-                                 f"in the {self.spec_link}.")
+            raise AmbiguousRouteError(repr(spec_matcher), self.spec_link, self.func_name,
+                                      sorted(matched_spec_units))
+        http_method, path = spec_matcher.route_hint()
+        raise RouteNotFoundError(repr(spec_matcher), self.spec_link, self.func_name,
+                                 prepared_spec.route_index.nearest(http_method, path,
+                                                                   limit=Config.ROUTE_SUGGESTIONS))
+
+    def validate(self,
+                 mocked: Any,
+                 ) -> None:
+        self.validate_response(mocked.handler.matcher, mocked.handler.response.get_body())
 
-        elif len(matched_spec_units) == 0:
-            raise AssertionError(f"Mocked API method: '{spec_matcher}'\nwas not found in the {self.spec_link} "
-                                 f"for the validation of {self.func_name}.\n"
-                                 f"Presented units:\n{formatted_units}.")
+    async def validate_async(self,
+                             mocked: Any,
+                             ) -> None:
+        # the spec is fetched without blocking the loop,
+        # matching and schema validation are CPU-bound and go to the default executor
+        prepared_spec = await self.prepare_data_async()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.validate_response,
+                                   mocked.handler.matcher, mocked.handler.response.get_body(), lambda: prepared_spec)
 
-        spec_unit = prepared_spec.get(matched_spec_units[0])
+    def validate_response(self,
+                          mock_matcher: ResolvableMatcher,
+                          mocked_body: bytes,
+                          prepare_data: Callable[[], PreparedSpec | None] | None = None,
+                          ) -> None:
+        """
+        Validate the matcher and the response body of a mock, without the mock itself.
 
-        return spec_unit, decoded_mocked_body
+        Args:
+            mock_matcher: The matcher of the mock.
+            mocked_body: The raw response body of the mock.
+            prepare_data: Returns the spec to validate against, `prepare_data` if None.
+        """
+        spec_matcher = self.create_spec_matcher(mock_matcher)
 
-    def validate(self,
-                 mocked: _T,
-                 ) -> None:
+        prepared_spec = (prepare_data or self.prepare_data)()
+        if prepared_spec is None:
+            self._decode_body(mocked_body)
+            return None
+
+        if self.policy is None:
+            return self._check_response(spec_matcher, prepared_spec, mocked_body)
+        # only the validation is charged to the policy, not the spec load
+        started = perf_counter()
+        try:
+            self._check_response(spec_matcher, prepared_spec, mocked_body)
+        finally:
+            self.policy.record(self.func_name, perf_counter() - started)
 
-        spec_unit, decoded_mocked_body = self._prepare_validation(mocked=mocked)
+    def _check_response(self,
+                        spec_matcher: BaseMatcher,
+                        prepared_spec: PreparedSpec,
+                        mocked_body: bytes,
+                        ) -> None:
+        # identical mocks are validated once per spec version and mode
+        result_key = (prepared_spec.version, repr(spec_matcher), self.is_strict, self.force_strict,
+                      body_digest(mocked_body))
+        result = result_cache.get(result_key)
+        if result is MISSING:
+            count('result_cache_miss', self.spec_link, self.func_name)
+            try:
+                result = self._validate_body(spec_matcher, prepared_spec, mocked_body)
+            except SpecMatchError as e:
+                # raised as before, a custom output function gets the structured error as well
+                if Config.OUTPUT_FUNCTION is not None:
+                    self.output(e)
+                raise
+            result_cache.put(result_key, result)
+        else:
+            count('result_cache_hit', self.spec_link, self.func_name)
+
+        if result is not None:
+            self._validation_failure(result)
+
+    def _is_streamed(self,
+                     mocked_body: bytes,
+                     ) -> bool:
+        return (Config.STREAMING_THRESHOLD is not None
+                and len(mocked_body) >= Config.STREAMING_THRESHOLD
+                and is_json_array(mocked_body))
+
+    def _validate_body(self,
+                       spec_matcher: BaseMatcher,
+                       prepared_spec: PreparedSpec,
+                       mocked_body: bytes,
+                       ) -> ValidationException | None:
+        if self._is_streamed(mocked_body):
+            # large bodies are parsed while validated, so only once the spec unit is known
+            with timer('match', self.spec_link, self.func_name):
+                spec_unit_key = self.match_spec_unit(spec_matcher, prepared_spec)
+            return self.validate_raw_body(spec_unit_key, prepared_spec, mocked_body)
+
+        with timer('decode', self.spec_link, self.func_name):
+            decoded_mocked_body = self._decode_body(mocked_body)
+        with timer('match', self.spec_link, self.func_name):
+            spec_unit_key = self.match_spec_unit(spec_matcher, prepared_spec)
+        return self._validate_spec_unit(spec_unit_key, prepared_spec, decoded_mocked_body)
+
+    def validate_raw_body(self,
+                          spec_unit_key: Tuple[str, str],
+                          prepared_spec: PreparedSpec,
+                          mocked_body: bytes,
+                          ) -> ValidationException | None:
+        """
+        Decode and validate the body, JSON arrays over `Config.STREAMING_THRESHOLD` element by element.
+
+        Nothing is output or raised for mismatches, unlike `validate_response`.
+
+        Args:
+            spec_unit_key: (method, path) of the API method, see `match_spec_unit`.
+            prepared_spec: The spec of the API method.
+            mocked_body: The raw response body of the mock.
+        :return: The mismatches, None if the body is valid.
+        """
+        if self._is_streamed(mocked_body):
+            with timer('convert', self.spec_link, self.func_name):
+                spec_unit = prepared_spec.get(spec_unit_key)
+            if spec_unit is not None and spec_unit.response_schema_d42:
+                compiled_validator = self._get_compiled_validator(spec_unit_key, prepared_spec)
+                if is_streamable(compiled_validator.schema):
+                    try:
+                        with timer('validate', self.spec_link, self.func_name):
+                            validate_stream(compiled_validator, mocked_body, Config.STREAMING_MAX_ERRORS)
+                    except JSONDecodeError:
+                        raise AssertionError(f"JSON expected in Response body of the {self.func_name}")
+                    except ValidationException as exception:
+                        return exception
+                    return None
+
+        with timer('decode', self.spec_link, self.func_name):
+            decoded_mocked_body = self._decode_body(mocked_body)
+        return self._validate_spec_unit(spec_unit_key, prepared_spec, decoded_mocked_body)
+
+    def _get_compiled_validator(self,
+                                spec_unit_key: Tuple[str, str],
+                                prepared_spec: PreparedSpec,
+                                ) -> CompiledValidator:
+        if self.force_strict:
+            with timer('force_strict', self.spec_link, self.func_name):
+                prepared_spec.get_response_schema(spec_unit_key, force_strict=True)
+        # compiled once per spec unit and mode, reused by every mock of the unit
+        with timer('compile', self.spec_link, self.func_name):
+            return prepared_spec.get_validator(spec_unit_key, self.is_strict, self.force_strict)
+
+    def _validate_spec_unit(self,
+                            spec_unit_key: Tuple[str, str],
+                            prepared_spec: PreparedSpec,
+                            decoded_mocked_body: Any,
+                            ) -> ValidationException | None:
+        # the conversion is lazy, so these are only long for the first mock of the unit
+        with timer('convert', self.spec_link, self.func_name):
+            spec_unit = prepared_spec.get(spec_unit_key)
         if decoded_mocked_body is None:
             return None
         if spec_unit is not None:
-            spec_response_schema = spec_unit.response_schema_d42
-            if spec_response_schema:
-                if self.force_strict:
-                    spec_response_schema = get_forced_strict_spec(spec_response_schema)
-                else:
-                    spec_response_schema = spec_response_schema
-
+            if spec_unit.response_schema_d42:
+                compiled_validator = self._get_compiled_validator(spec_unit_key, prepared_spec)
                 try:
-                    if self.is_strict:
-                        validate_or_fail(spec_response_schema, decoded_mocked_body)
-                    else:
-                        validate_non_strict(spec_response_schema, decoded_mocked_body)
-
+                    with timer('validate', self.spec_link, self.func_name):
+                        compiled_validator.validate(decoded_mocked_body)
                 except ValidationException as exception:
-                    self._validation_failure(exception)
+                    return exception
 
         else:
             raise AssertionError(f"API method '{spec_unit}' in the spec_link"
                                  f" lacks a response structure for the validation of {self.func_name}")
+        return None
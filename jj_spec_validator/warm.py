@@ -0,0 +1,85 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable
+
+from ._config import Config
+from .utils import PreparedSpec, close_async_client, load_cache_async, spec_registry
+from .validate_spec import get_declared_spec_links
+from .validator import Validator
+
+__all__ = ('warm_specs', 'warm_specs_async', )
+
+
+def _convert_operations(validator: Validator, prepared_spec: PreparedSpec) -> None:
+    # every conversion is saved next to the cached spec, so the next processes only read them
+    for key in prepared_spec:
+        try:
+            prepared_spec[key]
+        except Exception as e:
+            # reported again by the validation of a mock of the operation, the rest of the spec is fine
+            http_method, path = key
+            validator.output(e, f"An error occurred while converting {http_method} {path} of the {validator.spec_link}")
+
+
+async def _warm_spec(spec_link: str, executor: ThreadPoolExecutor, is_converted: bool) -> bool:
+    validator = Validator(
+        spec_link=spec_link,
+        func_name='warm_specs',
+        skip_if_failed_to_get_spec=True,
+        is_raise_error=False,
+        is_strict=Config.IS_STRICT,
+    )
+    try:
+        prepared_spec = await load_cache_async(validator, executor)
+    except Exception as e:
+        validator.output(e, f"An error occurred while warming up the spec {spec_link}")
+        return False
+    if prepared_spec is None:
+        return False
+    spec_registry.put(spec_link, prepared_spec)
+    if is_converted:
+        await asyncio.get_running_loop().run_in_executor(executor, _convert_operations, validator, prepared_spec)
+    return True
+
+
+async def warm_specs_async(spec_links: Iterable[str] | None = None,
+                           max_workers: int | None = None,
+                           is_converted: bool = True,
+                           ) -> Dict[str, bool]:
+    """
+    Download and parse specs concurrently and store them in the disk cache
+    (and in the registry of the current process).
+
+    Specs are parsed and their operations converted to d42 in threads, a spec per thread.
+    The converted operations are saved to the disk cache as well, so the processes started
+    afterwards neither parse the spec nor convert its operations.
+
+    Args:
+        spec_links: Links of the specs to warm up. Links of all functions decorated
+            with `validate_spec` so far are used if None.
+        max_workers: Number of threads parsing specs, the ThreadPoolExecutor default if None.
+        is_converted: If False - only parse and index the specs, operations are converted
+            by the first mock of each one.
+
+    Returns:
+        Whether the spec is ready, for every link.
+    """
+    links = list(dict.fromkeys(spec_links if spec_links is not None else get_declared_spec_links()))
+    if not links:
+        return {}
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='warm_specs') as executor:
+            results = await asyncio.gather(*(_warm_spec(link, executor, is_converted) for link in links))
+    finally:
+        await close_async_client()
+    return dict(zip(links, results))
+
+
+def warm_specs(spec_links: Iterable[str] | None = None,
+               max_workers: int | None = None,
+               is_converted: bool = True,
+               ) -> Dict[str, bool]:
+    """
+    Synchronous version of `warm_specs_async`, e.g. for a pytest session hook.
+    """
+    return asyncio.run(warm_specs_async(spec_links, max_workers, is_converted))
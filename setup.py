@@ -19,6 +19,9 @@ setup(
     license="Apache-2.0",
     packages=find_packages(),
     install_requires=find_required(),
+    extras_require={
+        "fast": ["orjson>=3.0.0"],
+    },
     classifiers=[
         "License :: OSI Approved :: Apache Software License",
         "Programming Language :: Python :: 3.10",
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from typing import Any, Dict, Iterator
+
+import pytest
+
+from jj_spec_validator import Config, clear_validation_cache, invalidate_spec
+from jj_spec_validator.validator import Validator
+
+SPEC: Dict[str, Any] = {
+    'openapi': '3.0.0',
+    'info': {'title': 'users', 'version': '1.0.0'},
+    'paths': {
+        '/users/{id}': {'get': {'responses': {'200': {'description': 'OK', 'content': {'application/json': {
+            'schema': {'$ref': '#/components/schemas/User'}}}}}}},
+        '/users': {'get': {'responses': {'200': {'description': 'OK', 'content': {'application/json': {
+            'schema': {'type': 'array', 'items': {'$ref': '#/components/schemas/User'}}}}}}}},
+    },
+    'components': {'schemas': {'User': {
+        'type': 'object',
+        'required': ['id'],
+        'properties': {'id': {'type': 'integer'}, 'name': {'type': 'string'}},
+    }}},
+}
+
+
+class SpecServer:
+    def __init__(self) -> None:
+        self.delay = 0.0
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                server.requests += 1
+                sleep(server.delay)
+                body = json.dumps(SPEC).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self.spec_link = f'http://127.0.0.1:{self._httpd.server_port}/spec.json'
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    # the disk cache lives in Config.MAIN_DIRECTORY, relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, 'OUTPUT_FUNCTION', lambda func_name, e, text: None)
+    invalidate_spec()
+    clear_validation_cache()
+    yield
+    invalidate_spec()
+    clear_validation_cache()
+
+
+@pytest.fixture
+def spec_server() -> Iterator[SpecServer]:
+    server = SpecServer()
+    yield server
+    server.close()
+
+
+def make_validator(spec_link: str, is_strict: bool = False) -> Validator:
+    return Validator(skip_if_failed_to_get_spec=False, is_raise_error=True, is_strict=is_strict,
+                     func_name='test', spec_link=spec_link)
+
+
+def write_spec(spec: Dict[str, Any], filename: str = 'spec.json') -> str:
+    """
+    Write the spec to the working directory, the temporary one of the test.
+
+    :return: The local spec link.
+    """
+    spec_link = os.path.abspath(filename)
+    with open(spec_link, 'w') as f:
+        json.dump(spec, f)
+    return spec_link
@@ -0,0 +1,100 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Tuple
+
+import jj
+import pytest
+from d42.validation import ValidationException
+from jj.mock import Mocked, mocked
+
+from jj_spec_validator import MockValidationResult, clear_validation_cache, invalidate_spec, validate_many
+from jj_spec_validator.errors import RouteNotFoundError
+
+from .conftest import SPEC, write_spec
+
+# (position, API method, error type) of a result
+_Outcome = Tuple[int, Tuple[str, str] | None, str | None]
+
+
+def _make_mocks() -> List[Mocked]:
+    users = [mocked(jj.match('GET', '/users'), jj.Response(json=[{'id': i} for i in range(n)])) for n in range(5)]
+    user = [mocked(jj.match('GET', f'/users/{i}'), jj.Response(json={'id': i, 'name': 'Bob'})) for i in range(5)]
+    return users + user + [
+        mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 'not an integer'})),
+        mocked(jj.match('GET', '/users'), jj.Response(json=[{'id': None}])),
+        # the same as the one before, validated once
+        mocked(jj.match('GET', '/users'), jj.Response(json=[{'id': None}])),
+        mocked(jj.match('GET', '/missing'), jj.Response(json={})),
+        mocked(jj.match('GET', '/users/1'), jj.Response(body=b'not json')),
+        mocked(jj.match('GET', '/users/1'), jj.RelayResponse(target='http://localhost')),
+    ]
+
+
+class _RecordingPool(ProcessPoolExecutor):
+    instances: List['_RecordingPool'] = []
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.instances.append(self)
+
+
+@pytest.fixture
+def pools(monkeypatch: pytest.MonkeyPatch) -> List[_RecordingPool]:
+    monkeypatch.setattr(_RecordingPool, 'instances', [])
+    monkeypatch.setattr('jj_spec_validator.bulk.ProcessPoolExecutor', _RecordingPool)
+    return _RecordingPool.instances
+
+
+def _outcomes(results: List[MockValidationResult]) -> List[_Outcome]:
+    return sorted((result.position, result.api_method, None if result.error is None else type(result.error).__name__)
+                  for result in results)
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_validate_many(workers: int, pools: List[_RecordingPool], monkeypatch: pytest.MonkeyPatch) -> None:
+    # a chunk per mock, so the pool gets several chunks
+    monkeypatch.setattr('jj_spec_validator.bulk.CHUNK_SIZE', 1)
+    spec_link = write_spec(SPEC)
+    mocks = _make_mocks()
+
+    outcomes = _outcomes(list(validate_many(mocks, spec_link=spec_link, workers=workers)))
+
+    users, user = ('GET', '/users'), ('GET', '/users/{id}')
+    assert outcomes == [(i, users, None) for i in range(5)] + [(i + 5, user, None) for i in range(5)] + [
+        (10, user, ValidationException.__name__),
+        (11, users, ValidationException.__name__),
+        (12, users, ValidationException.__name__),
+        (13, None, RouteNotFoundError.__name__),
+        (14, user, AssertionError.__name__),
+        (15, None, TypeError.__name__),
+    ]
+    assert len(pools) == (1 if workers else 0)
+
+
+def test_pool_results_are_in_process_results(pools: List[_RecordingPool], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr('jj_spec_validator.bulk.CHUNK_SIZE', 2)
+    spec_link = write_spec(SPEC)
+    other_spec_link = write_spec(SPEC, 'other.json')
+    mocks = [(link, mock) for link in (spec_link, other_spec_link) for mock in _make_mocks()]
+
+    expected = list(validate_many(mocks, workers=0))
+    clear_validation_cache()
+    invalidate_spec()
+    results = list(validate_many(mocks, workers=2))
+
+    assert len(pools) == 1
+    assert _outcomes(results) == _outcomes(expected)
+    assert ({(result.position, result.spec_link, str(result.error)) for result in results}
+            == {(result.position, result.spec_link, str(result.error)) for result in expected})
+
+
+def test_failed_spec_is_reported_for_its_mocks() -> None:
+    spec_link = write_spec(SPEC)
+    mock = _make_mocks()[0]
+
+    results = list(validate_many([('missing.json', mock), (spec_link, mock)], workers=0))
+
+    assert [(result.position, result.spec_link, result.is_valid) for result in sorted(results)] == [
+        (0, 'missing.json', False),
+        (1, spec_link, True),
+    ]
+    assert isinstance(sorted(results)[0].error, ValueError)
@@ -0,0 +1,209 @@
+import json
+import os
+from itertools import count
+from threading import Barrier, Event, Thread
+from typing import Any, Iterator, List
+
+import jj
+import pytest
+from d42.validation import ValidationException
+from jj.mock import mocked
+
+import jj_spec_validator.utils._cache_index as cache_index
+from jj_spec_validator import Config, invalidate_spec
+from jj_spec_validator.utils import disk_cache_stats, gc_disk_cache
+from jj_spec_validator.utils._cache_index import ARTIFACT_SUFFIX, TMP_SUFFIX, UNIT_SUFFIX, CacheIndex
+from jj_spec_validator.utils._cacheir import CACHE_DIR, LINK_SUFFIX
+
+from .conftest import SPEC, make_validator, write_spec
+
+THREADS = 8
+ENTRIES = 20
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    # every call is a second later, so the eviction order doesn't depend on the timer resolution
+    ticks = count(1_000_000)
+    monkeypatch.setattr(cache_index, 'time', lambda: float(next(ticks)))
+    monkeypatch.setattr(cache_index, '_TOUCH_INTERVAL', 0.0)
+    yield
+
+
+@pytest.fixture
+def directory() -> str:
+    directory = os.path.abspath('cache')
+    os.makedirs(directory)
+    return directory
+
+
+def _write(directory: str, name: str, size: int = 100, mtime: float | None = None) -> str:
+    filename = os.path.join(directory, name)
+    with open(filename, 'wb') as f:
+        f.write(b'x' * size)
+    if mtime is not None:
+        os.utime(filename, (mtime, mtime))
+    return name
+
+
+def _add(index: CacheIndex, directory: str, name: str, size: int = 100) -> None:
+    index.add(_write(directory, name, size), f'spec:{name}', 'version')
+
+
+def _names(index: CacheIndex) -> List[str]:
+    # the most recently used first
+    return [entry.name for entry in index.stats().entries]
+
+
+def test_least_recently_used_are_evicted_first(clock: None, directory: str,
+                                               monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'CACHE_MAX_ENTRIES', 3)
+    index = CacheIndex(directory)
+    for name in ('a', 'b', 'c'):
+        _add(index, directory, name + ARTIFACT_SUFFIX)
+    index.touch('a' + ARTIFACT_SUFFIX)
+
+    _add(index, directory, 'd' + ARTIFACT_SUFFIX)
+    _add(index, directory, 'e' + ARTIFACT_SUFFIX)
+
+    assert _names(index) == ['e' + ARTIFACT_SUFFIX, 'd' + ARTIFACT_SUFFIX, 'a' + ARTIFACT_SUFFIX]
+    assert sorted(os.listdir(directory)) == sorted(_names(index) + ['index.json', 'index.json.lock'])
+
+
+def test_size_limit_keeps_the_artifact_just_written(clock: None, directory: str,
+                                                    monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'CACHE_MAX_SIZE', 250)
+    index = CacheIndex(directory)
+    _add(index, directory, 'a' + ARTIFACT_SUFFIX)
+    _add(index, directory, 'b' + ARTIFACT_SUFFIX)
+    _add(index, directory, 'c' + ARTIFACT_SUFFIX)
+
+    assert _names(index) == ['c' + ARTIFACT_SUFFIX, 'b' + ARTIFACT_SUFFIX]
+    assert index.stats().size == 200
+
+    # over the limit alone, but the spec is being loaded right now
+    _add(index, directory, 'd' + ARTIFACT_SUFFIX, size=1000)
+    assert _names(index) == ['d' + ARTIFACT_SUFFIX]
+
+
+def test_operations_count_in_the_size_only(clock: None, directory: str) -> None:
+    index = CacheIndex(directory)
+    # the gc indexes them by mtime, before and after the specs on the clock
+    _write(directory, 'a' + UNIT_SUFFIX, mtime=0)
+    _add(index, directory, 'a' + ARTIFACT_SUFFIX)
+    _add(index, directory, 'b' + ARTIFACT_SUFFIX)
+    _write(directory, 'b' + UNIT_SUFFIX, mtime=2_000_000)
+
+    # the operations are indexed by the gc, they aren't specs to evict for the entries limit
+    assert index.gc(max_entries=1) == ['a' + ARTIFACT_SUFFIX]
+    assert sorted(_names(index)) == ['a' + UNIT_SUFFIX, 'b' + ARTIFACT_SUFFIX, 'b' + UNIT_SUFFIX]
+
+    # the oldest goes first, whatever it is
+    assert index.gc(max_size=150) == ['a' + UNIT_SUFFIX, 'b' + ARTIFACT_SUFFIX]
+    assert _names(index) == ['b' + UNIT_SUFFIX]
+
+
+def test_gc_rebuilds_a_corrupt_index(clock: None, directory: str) -> None:
+    index = CacheIndex(directory)
+    _add(index, directory, 'a' + ARTIFACT_SUFFIX)
+    _add(index, directory, 'b' + ARTIFACT_SUFFIX)
+    for content in (b'{"format": 1, "entr', b'not json', b'[]', b'{"format": 0, "entries": {}}'):
+        with open(os.path.join(directory, 'index.json'), 'wb') as f:
+            f.write(content)
+        assert index.stats().entries == []
+
+        assert index.gc() == []
+        assert sorted(_names(index)) == ['a' + ARTIFACT_SUFFIX, 'b' + ARTIFACT_SUFFIX]
+
+
+def test_gc_reconciles_the_index_with_the_directory(clock: None, directory: str) -> None:
+    index = CacheIndex(directory)
+    _add(index, directory, 'a' + ARTIFACT_SUFFIX)
+    _add(index, directory, 'b' + ARTIFACT_SUFFIX)
+    os.unlink(os.path.join(directory, 'a' + ARTIFACT_SUFFIX))
+    _write(directory, 'interrupted' + TMP_SUFFIX)
+    _write(directory, 'old' + TMP_SUFFIX)
+    os.utime(os.path.join(directory, 'old' + TMP_SUFFIX), (0, 0))
+
+    assert index.gc() == []
+
+    assert _names(index) == ['b' + ARTIFACT_SUFFIX]
+    # a write may still be in progress
+    assert os.path.isfile(os.path.join(directory, 'interrupted' + TMP_SUFFIX))
+    assert not os.path.exists(os.path.join(directory, 'old' + TMP_SUFFIX))
+
+
+def test_gc_removes_entries_over_max_age(clock: None, directory: str) -> None:
+    index = CacheIndex(directory)
+    _add(index, directory, 'a' + ARTIFACT_SUFFIX)
+    _add(index, directory, 'b' + ARTIFACT_SUFFIX)
+
+    # the gc reads the clock after both additions
+    assert index.gc(max_age=1.5) == ['a' + ARTIFACT_SUFFIX]
+    assert _names(index) == ['b' + ARTIFACT_SUFFIX]
+
+
+def test_concurrent_writers_dont_lose_entries(directory: str) -> None:
+    barrier = Barrier(THREADS + 1)
+    stopped = Event()
+    sizes: List[int] = []
+
+    def add(thread: int) -> None:
+        # an index per thread, as in separate processes
+        index = CacheIndex(directory)
+        barrier.wait()
+        for i in range(ENTRIES):
+            _add(index, directory, f'{thread}-{i}{ARTIFACT_SUFFIX}')
+            index.touch(f'{thread}-0{ARTIFACT_SUFFIX}')
+
+    def read() -> None:
+        index = CacheIndex(directory)
+        barrier.wait()
+        while not stopped.is_set():
+            # the index is replaced atomically, a reader never sees a partial one
+            sizes.append(len(index.stats().entries))
+
+    writers = [Thread(target=add, args=(thread,)) for thread in range(THREADS)]
+    reader = Thread(target=read)
+    for thread in writers + [reader]:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stopped.set()
+    reader.join()
+
+    assert len(_names(CacheIndex(directory))) == THREADS * ENTRIES
+    assert sizes == sorted(sizes)
+
+
+def test_gc_disk_cache_removes_dangling_links() -> None:
+    spec_link = write_spec(SPEC)
+    mock = mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1}))
+    make_validator(spec_link).validate(mock)
+    stats = disk_cache_stats()
+    assert [entry.spec_link for entry in stats.entries] == [spec_link]
+    assert any(name.endswith(LINK_SUFFIX) for name in os.listdir(CACHE_DIR))
+
+    assert gc_disk_cache(max_entries=0) == [stats.entries[0].name]
+
+    # the converted operations are left for the size limit
+    assert [entry for entry in disk_cache_stats().entries if entry.name.endswith(ARTIFACT_SUFFIX)] == []
+    assert not any(name.endswith(LINK_SUFFIX) for name in os.listdir(CACHE_DIR))
+    # the spec is converted and cached again
+    invalidate_spec()
+    make_validator(spec_link).validate(mock)
+    assert [entry.spec_link for entry in disk_cache_stats().entries if entry.spec_link] == [spec_link]
+
+
+def test_changed_local_spec_is_reloaded_before_the_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'SPEC_REGISTRY_TTL', None)
+    spec_link = write_spec(SPEC)
+    mock = mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1, 'name': 1}))
+    with pytest.raises(ValidationException):
+        make_validator(spec_link).validate(mock)
+
+    spec: Any = json.loads(json.dumps(SPEC))
+    spec['components']['schemas']['User']['properties']['name'] = {'type': 'integer'}
+    write_spec(spec)
+
+    make_validator(spec_link).validate(mock)
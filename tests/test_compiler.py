@@ -0,0 +1,105 @@
+from typing import Any, List, Tuple
+
+import pytest
+from d42 import optional, schema
+from d42.declaration import GenericSchema
+from d42.validation import ValidationException, validate_or_fail
+
+from jj_spec_validator.utils import get_forced_strict_spec
+from jj_spec_validator.utils._common import validate_non_strict
+from jj_spec_validator.utils._compiler import compile_schema
+
+USER = schema.dict({
+    'id': schema.int.min(1),
+    'name': schema.str.len(1, 5),
+    optional('email'): schema.str,
+})
+
+SCHEMAS = {
+    'dict': USER,
+    'relaxed_dict': schema.dict({'id': schema.int, ...: ...}),
+    'nested_dict': schema.dict({'user': USER, 'tags': schema.list(schema.str)}),
+    'list': schema.list(USER),
+    'bounded_list': schema.list(schema.int).len(1, 2),
+    'elements_list': schema.list([schema.int, schema.str]),
+    # head matching isn't compiled, d42 checks it
+    'head_list': schema.list([schema.int, ...]),
+    'nullable': schema.dict({'id': schema.int, 'manager': schema.none | USER}),
+    'any_of': schema.int | schema.str | schema.list(schema.bool),
+    'float': schema.float.min(0.0).max(1.0),
+    'str_pattern': schema.str.regex(r'^[a-z]+$'),
+}
+
+VALUES: List[Any] = [
+    None,
+    1,
+    0,
+    0.5,
+    2.5,
+    True,
+    'abc',
+    'ABC',
+    [],
+    [1],
+    [1, 2, 3],
+    [1, 'a'],
+    ['a', 1],
+    [True, False],
+    [{'id': 1, 'name': 'Bob'}],
+    [{'id': 1, 'name': 'Bob'}, {'id': 0, 'name': 'Bob'}],
+    {},
+    {'id': 1},
+    {'id': 1, 'name': 'Bob'},
+    {'id': 1, 'name': 'Bob', 'email': 'b@b'},
+    {'id': 1, 'name': 'Bob', 'email': 1},
+    {'id': 1, 'name': 'Bob', 'extra': True},
+    {'id': 0, 'name': 'Bob'},
+    {'id': '1', 'name': 'Bob'},
+    {'id': 1, 'name': 'Robert'},
+    {'id': 1, 'manager': None},
+    {'id': 1, 'manager': {'id': 2, 'name': 'Ann'}},
+    {'id': 1, 'manager': {'id': 2}},
+    {'id': 1, 'manager': 'Ann'},
+    {'user': {'id': 1, 'name': 'Bob'}, 'tags': ['a']},
+    {'user': {'id': 1, 'name': 'Bob'}, 'tags': [1]},
+    {'user': {'id': 1}, 'tags': []},
+]
+
+CASES: List[Tuple[str, bool, bool]] = [
+    (name, is_strict, force_strict)
+    for name in SCHEMAS
+    for is_strict, force_strict in ((False, False), (True, False), (True, True), (False, True))
+]
+
+
+def _interpreted(declaration: GenericSchema, value: Any, is_strict: bool, force_strict: bool) -> str | None:
+    """
+    :return: The d42 error message, None if the value is valid.
+    """
+    if force_strict:
+        declaration = get_forced_strict_spec(declaration)
+    try:
+        if is_strict:
+            validate_or_fail(declaration, value)
+        else:
+            validate_non_strict(declaration, value)
+    except ValidationException as e:
+        return str(e)
+    return None
+
+
+@pytest.mark.parametrize(('name', 'is_strict', 'force_strict'), CASES)
+def test_compiled_validator_is_d42(name: str, is_strict: bool, force_strict: bool) -> None:
+    declaration = SCHEMAS[name]
+    validator = compile_schema(declaration, is_strict, force_strict)
+
+    for value in VALUES:
+        expected = _interpreted(declaration, value, is_strict, force_strict)
+        # the compiled checker alone, without the d42 fallback
+        assert validator._check(value) is (expected is None), value
+        if expected is None:
+            assert validator.validate(value) is True
+        else:
+            with pytest.raises(ValidationException) as exc_info:
+                validator.validate(value)
+            assert str(exc_info.value) == expected
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import subprocess
+import sys
+from threading import Event
+from time import perf_counter
+from typing import Any, Callable, List
+
+import jj
+import pytest
+from d42.validation import ValidationException
+from jj.mock import Mocked, mocked
+
+from jj_spec_validator import DeferredValidationError, flush, flush_async, validate_spec
+from jj_spec_validator.deferred import DeferredQueue
+from jj_spec_validator.errors import RouteNotFoundError
+
+from .conftest import SPEC, SpecServer, make_validator, write_spec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _decorate(spec_link: str, path: str, json: Any) -> Callable[[], Mocked]:
+    @validate_spec(spec_link=spec_link, is_raise_error=True, is_deferred=True)
+    def mock() -> Mocked:
+        return mocked(jj.match('GET', path), jj.Response(json=json))
+    return mock
+
+
+def test_flush_raises_all_errors_since_the_previous_one() -> None:
+    spec_link = write_spec(SPEC)
+    _decorate(spec_link, '/users/1', {'id': 1})()
+    _decorate(spec_link, '/users/1', {'id': 'not an integer'})()
+    _decorate(spec_link, '/missing', {})()
+
+    with pytest.raises(DeferredValidationError) as exc_info:
+        flush()
+
+    errors = exc_info.value.errors
+    assert sorted(type(e).__name__ for e in errors) == [RouteNotFoundError.__name__, ValidationException.__name__]
+    assert str(exc_info.value).startswith("2 deferred validation(s) failed:\n")
+    # reported once
+    flush()
+
+
+def test_registration_doesnt_wait_for_the_spec(spec_server: SpecServer) -> None:
+    spec_server.delay = 0.5
+    mock_user = _decorate(spec_server.spec_link, '/users/1', {'id': 'not an integer'})
+
+    started = perf_counter()
+    mock_user()
+    mock_user()
+    assert perf_counter() - started < spec_server.delay
+
+    with pytest.raises(DeferredValidationError) as exc_info:
+        flush()
+    assert len(exc_info.value.errors) == 2
+    assert spec_server.requests == 1
+
+
+def test_flush_async() -> None:
+    spec_link = write_spec(SPEC)
+
+    @validate_spec(spec_link=spec_link, is_raise_error=True, is_deferred=True)
+    async def mock_user() -> Mocked:
+        return mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 'not an integer'}))
+
+    async def run() -> None:
+        await mock_user()
+        await flush_async()
+
+    with pytest.raises(DeferredValidationError) as exc_info:
+        asyncio.run(run())
+    assert [type(e) for e in exc_info.value.errors] == [ValidationException]
+    asyncio.run(flush_async())
+
+
+def test_flush_waits_for_validations_submitted_meanwhile() -> None:
+    queue = DeferredQueue()
+    validator = make_validator(write_spec(SPEC))
+    started, released = Event(), Event()
+    outcomes: List[str] = []
+
+    def validate_response(mock_matcher: Any, mocked_body: bytes) -> None:
+        if mocked_body == b'first':
+            started.set()
+            released.wait()
+            # a validation submitting another one, e.g. a mock registering mocks
+            queue.submit(validator, mock_matcher, b'second')
+        outcomes.append(mocked_body.decode())
+        raise AssertionError(mocked_body.decode())
+
+    validator.validate_response = validate_response  # type: ignore[method-assign]
+    queue.submit(validator, jj.match('GET', '/users/1'), b'first')
+    started.wait()
+    released.set()
+
+    with pytest.raises(DeferredValidationError) as exc_info:
+        queue.flush()
+    assert sorted(str(e) for e in exc_info.value.errors) == ['first', 'second']
+    assert sorted(outcomes) == ['first', 'second']
+
+
+@pytest.mark.parametrize('is_flushed', [False, True])
+def test_errors_not_flushed_are_output_at_exit(is_flushed: bool) -> None:
+    spec_link = write_spec(SPEC)
+    script = (
+        "import jj\n"
+        "from jj.mock import mocked\n"
+        "from jj_spec_validator import DeferredValidationError, flush, validate_spec\n\n"
+        f"@validate_spec(spec_link={spec_link!r}, is_raise_error=True, is_deferred=True)\n"
+        "def mock_user():\n"
+        "    return mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 'not an integer'}))\n\n"
+        "mock_user()\n"
+        "print('registered')\n"
+    )
+    if is_flushed:
+        script += "try:\n    flush()\nexcept DeferredValidationError:\n    print('flushed')\n"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+
+    result = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    # the mismatch is output by the validation itself too
+    assert "⚠️ ⚠️ ⚠️ There are some mismatches in mock_user :\n" in result.stdout
+    note = ("⚠️ ⚠️ ⚠️ Deferred validations failed and were not flushed before exit :\n"
+            "1 deferred validation(s) failed:\nValidationException: ")
+    if is_flushed:
+        assert result.stdout.endswith("\nflushed\n") and note not in result.stdout
+    else:
+        assert note in result.stdout
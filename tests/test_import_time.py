@@ -0,0 +1,43 @@
+import importlib.util
+import os
+from types import ModuleType
+from typing import Any, Dict, List
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# attempts of the probe, the fastest one is compared with the budget as in check_import_time
+REPEAT = 3
+BUDGET = 0.150  # in seconds
+
+
+def _load_check_import_time() -> ModuleType:
+    # the benchmarks are scripts, not a package
+    spec = importlib.util.spec_from_file_location(
+        'check_import_time', os.path.join(ROOT, 'benchmarks', 'check_import_time.py'))
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+check_import_time = _load_check_import_time()
+
+
+@pytest.fixture
+def probes(monkeypatch: pytest.MonkeyPatch) -> List[Dict[str, Any]]:
+    # the probe runs in a fresh interpreter from the temporary working directory
+    monkeypatch.setenv('PYTHONPATH', os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    return [check_import_time._probe() for _ in range(REPEAT)]
+
+
+def test_import_does_not_load_heavy_modules(probes: List[Dict[str, Any]]) -> None:
+    for result in probes:
+        loaded = {module.split('.')[0] for module in result['modules']} & set(check_import_time.HEAVY_MODULES)
+        assert not loaded
+
+
+def test_import_is_within_budget(probes: List[Dict[str, Any]]) -> None:
+    duration = min(result['duration'] for result in probes)
+    assert duration < BUDGET, f"import and decorate took {duration * 1000:.1f} ms"
@@ -0,0 +1,106 @@
+import os
+from importlib import import_module
+from typing import Dict, Iterator
+
+import jj
+import pytest
+from jj.mock import mocked
+
+from jj_spec_validator import Config
+from jj_spec_validator.__main__ import main
+
+from .conftest import SPEC, make_validator, write_spec
+
+# the module, not the validate_spec decorator it's shadowed by in the package
+validate_spec_module = import_module('jj_spec_validator.validate_spec')
+
+
+@pytest.fixture(autouse=True)
+def declared_spec_links(monkeypatch: pytest.MonkeyPatch) -> Iterator[Dict[str, None]]:
+    # the links declared by the decorators of the other tests
+    declared: Dict[str, None] = {}
+    monkeypatch.setattr(validate_spec_module, '_declared_spec_links', declared)
+    yield declared
+
+
+def test_warm(capsys: pytest.CaptureFixture[str]) -> None:
+    spec_link = write_spec(SPEC)
+    missing_spec_link = os.path.abspath('missing.json')
+
+    assert main(['warm', spec_link]) == 0
+    assert capsys.readouterr().out == f"ok\t{spec_link}\n"
+
+    assert main(['warm', spec_link, missing_spec_link, '--workers', '2']) == 1
+    assert capsys.readouterr().out == f"ok\t{spec_link}\nfailed\t{missing_spec_link}\n"
+
+
+def test_warm_declared_spec_links(tmp_path: str, capsys: pytest.CaptureFixture[str],
+                                  monkeypatch: pytest.MonkeyPatch) -> None:
+    assert main(['warm']) == 1
+    assert capsys.readouterr().err == "No spec links given or declared in the imported modules\n"
+
+    spec_link = write_spec(SPEC)
+    with open('mocks_of_users.py', 'w') as f:
+        f.write("import jj\n"
+                "from jj.mock import mocked\n"
+                "from jj_spec_validator import validate_spec\n\n\n"
+                f"@validate_spec(spec_link={spec_link!r})\n"
+                "def mock_user():\n"
+                "    return mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1}))\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert main(['warm', '--module', 'mocks_of_users']) == 0
+    assert capsys.readouterr().out == f"ok\t{spec_link}\n"
+
+
+def test_bundle(capsys: pytest.CaptureFixture[str]) -> None:
+    spec_file = write_spec(SPEC, 'users.json')
+
+    assert main(['bundle', 'specs.bundle', spec_file, f'other={spec_file}']) == 0
+    assert capsys.readouterr().out == "bundle:specs.bundle#users\nbundle:specs.bundle#other\n"
+
+    mock = mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1}))
+    for name in ('users', 'other'):
+        make_validator(f'bundle:specs.bundle#{name}').validate(mock)
+
+
+def test_bundle_with_duplicate_names(capsys: pytest.CaptureFixture[str]) -> None:
+    spec_file = write_spec(SPEC, 'users.json')
+
+    assert main(['bundle', 'specs.bundle', spec_file, f'users={spec_file}']) == 1
+    assert capsys.readouterr().err == "Duplicate spec name 'users', use NAME=PATH to rename it\n"
+    assert not os.path.exists('specs.bundle')
+
+
+def test_stats_and_gc(capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'CACHE_MAX_SIZE', None)
+    spec_link = write_spec(SPEC)
+    assert main(['stats']) == 0
+    assert capsys.readouterr().out == "entries\t0 of 256\noperations\t0\nsize\t0.0 MiB of unlimited\n"
+
+    assert main(['warm', spec_link]) == 0
+    capsys.readouterr()
+    assert main(['stats', '--verbose']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    # the converted operations are indexed by the first gc
+    assert lines[:2] == ["entries\t1 of 256", "operations\t0"]
+    assert len(lines) == 4 and lines[3].endswith(f"\t{spec_link}")
+
+    assert main(['gc']) == 0
+    assert capsys.readouterr().out == "removed 0, left 3 (0.0 MiB)\n"
+    assert main(['stats']) == 0
+    assert capsys.readouterr().out.splitlines()[:2] == ["entries\t1 of 256", "operations\t2"]
+
+    assert main(['gc', '--max-entries', '0']) == 0
+    assert capsys.readouterr().out == "removed 1, left 2 (0.0 MiB)\n"
+    assert main(['gc', '--max-size', '0']) == 0
+    assert capsys.readouterr().out == "removed 2, left 0 (0.0 MiB)\n"
+
+
+def test_warm_parse_only(capsys: pytest.CaptureFixture[str]) -> None:
+    spec_link = write_spec(SPEC)
+
+    assert main(['warm', '--parse-only', spec_link]) == 0
+    capsys.readouterr()
+    assert main(['gc']) == 0
+    assert capsys.readouterr().out == "removed 0, left 1 (0.0 MiB)\n"
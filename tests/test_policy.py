@@ -0,0 +1,155 @@
+import asyncio
+from typing import Any, Callable, List
+
+import jj
+import pytest
+from d42.validation import ValidationException
+from jj.mock import Mocked, mocked
+
+from jj_spec_validator import Config, Metric, validate_spec
+from jj_spec_validator.policy import (PolicyStats, ValidateFirst, ValidateFraction, ValidationBudget,
+                                      ValidationPolicy)
+
+from .conftest import SPEC, SpecServer, write_spec
+
+INVALID_USER = {'id': 'not an integer'}
+
+
+def _decorate(spec_link: str, policy: ValidationPolicy | None) -> Callable[[], Mocked]:
+    @validate_spec(spec_link=spec_link, is_raise_error=True, policy=policy)
+    def mock_user() -> Mocked:
+        return mocked(jj.match('GET', '/users/1'), jj.Response(json=INVALID_USER))
+    return mock_user
+
+
+def _validated(mock: Callable[[], Any], times: int) -> List[bool]:
+    outcomes = []
+    for _ in range(times):
+        try:
+            mock()
+        except ValidationException:
+            outcomes.append(True)
+        else:
+            outcomes.append(False)
+    return outcomes
+
+
+def test_validate_first() -> None:
+    policy = ValidateFirst(2)
+    mock_user = _decorate(write_spec(SPEC), policy)
+
+    assert _validated(mock_user, 5) == [True, True, False, False, False]
+    assert policy.stats() == {'mock_user': PolicyStats(validated=2, skipped=3)}
+
+    policy.reset()
+    assert _validated(mock_user, 3) == [True, True, False]
+
+
+def test_decisions_are_counted_per_function() -> None:
+    policy = ValidateFirst(1)
+    spec_link = write_spec(SPEC)
+
+    @validate_spec(spec_link=spec_link, is_raise_error=True, policy=policy)
+    def mock_users() -> Mocked:
+        return mocked(jj.match('GET', '/users'), jj.Response(json=[INVALID_USER]))
+
+    assert _validated(_decorate(spec_link, policy), 2) == [True, False]
+    assert _validated(mock_users, 3) == [True, False, False]
+    assert policy.stats() == {'mock_user': PolicyStats(1, 1), 'mock_users': PolicyStats(1, 2)}
+    assert policy.report().splitlines() == [
+        f"{'function':<40}{'validated':>12}{'skipped':>12}",
+        f"{'mock_user':<40}{1:>12}{1:>12}",
+        f"{'mock_users':<40}{1:>12}{2:>12}",
+    ]
+
+
+@pytest.mark.parametrize(('fraction', 'expected'), [(0.0, 0), (1.0, 20)])
+def test_validate_fraction_bounds(fraction: float, expected: int) -> None:
+    mock_user = _decorate(write_spec(SPEC), ValidateFraction(fraction))
+
+    assert sum(_validated(mock_user, 20)) == expected
+
+
+def test_validate_fraction_is_reproducible() -> None:
+    spec_link = write_spec(SPEC)
+
+    first = _validated(_decorate(spec_link, ValidateFraction(0.5, seed=1)), 40)
+    second = _validated(_decorate(spec_link, ValidateFraction(0.5, seed=1)), 40)
+
+    assert first == second
+    assert 0 < sum(first) < 40
+
+
+@pytest.mark.parametrize('fraction', [-0.1, 1.1])
+def test_validate_fraction_out_of_range(fraction: float) -> None:
+    with pytest.raises(ValueError):
+        ValidateFraction(fraction)
+
+
+def test_validation_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr('jj_spec_validator.policy.monotonic', lambda: now[0])
+    policy = ValidationBudget(0.1)
+
+    # the first mock of a function is validated even with the budget overdrawn
+    policy.record('other', 1.0)
+    assert policy.should_validate('mock_user') is True
+    assert policy.should_validate('mock_user') is False
+
+    # 0.9 overdrawn and refilled by 0.1 per second
+    now[0] += 5.0
+    assert policy.should_validate('mock_user') is False
+    now[0] += 5.0
+    assert policy.should_validate('mock_user') is True
+
+    # at most a second worth of budget is saved up
+    now[0] += 1000.0
+    policy.record('mock_user', 0.1)
+    assert policy.should_validate('mock_user') is False
+    assert policy.stats() == {'mock_user': PolicyStats(validated=2, skipped=3)}
+
+
+def test_validation_budget_charges_the_validations(monkeypatch: pytest.MonkeyPatch) -> None:
+    charged: List[float] = []
+    policy = ValidationBudget(1000.0)
+    monkeypatch.setattr(policy, 'record', lambda func_name, duration: charged.append(duration))
+
+    assert _validated(_decorate(write_spec(SPEC), policy), 3) == [True, True, True]
+    assert len(charged) == 3 and all(duration > 0 for duration in charged)
+
+
+def test_skipped_mocks_dont_load_the_spec(spec_server: SpecServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    metrics: List[Metric] = []
+    monkeypatch.setattr(Config, 'METRICS_FUNCTION', metrics.append)
+    mock_user = _decorate(spec_server.spec_link, ValidateFirst(0))
+
+    assert _validated(mock_user, 3) == [False, False, False]
+
+    assert spec_server.requests == 0
+    assert metrics == [Metric('validation_skipped', spec_server.spec_link, 'mock_user', None)] * 3
+
+
+def test_skipped_async_mocks(spec_server: SpecServer) -> None:
+    policy = ValidateFirst(1)
+
+    @validate_spec(spec_link=spec_server.spec_link, is_raise_error=True, policy=policy)
+    async def mock_user() -> Mocked:
+        return mocked(jj.match('GET', '/users/1'), jj.Response(json=INVALID_USER))
+
+    with pytest.raises(ValidationException):
+        asyncio.run(mock_user())
+    asyncio.run(mock_user())
+
+    assert spec_server.requests == 1
+    assert policy.stats() == {'mock_user': PolicyStats(1, 1)}
+
+
+def test_config_validation_policy(monkeypatch: pytest.MonkeyPatch) -> None:
+    policy = ValidateFirst(1)
+    monkeypatch.setattr(Config, 'VALIDATION_POLICY', policy)
+    spec_link = write_spec(SPEC)
+
+    assert _validated(_decorate(spec_link, None), 2) == [True, False]
+    # a policy of the decorator wins
+    assert _validated(_decorate(spec_link, ValidateFirst(2)), 2) == [True, True]
+    assert policy.stats() == {'mock_user': PolicyStats(1, 1)}
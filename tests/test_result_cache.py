@@ -0,0 +1,128 @@
+import json
+from typing import Any, List
+
+import jj
+import pytest
+from d42.validation import ValidationException
+from jj.mock import Mocked, mocked
+
+from jj_spec_validator import Config, validation_cache_info
+from jj_spec_validator.utils import ResultCacheInfo
+from jj_spec_validator.validator import Validator
+
+from .conftest import SPEC, write_spec
+
+
+def _mock(json: Any) -> Mocked:
+    return mocked(jj.match('GET', '/users/1'), jj.Response(json=json))
+
+
+def _make_validator(spec_link: str, *, is_strict: bool = False, force_strict: bool = False,
+                    is_raise_error: bool = True) -> Validator:
+    return Validator(skip_if_failed_to_get_spec=False, is_raise_error=is_raise_error, is_strict=is_strict,
+                     func_name='test', spec_link=spec_link, force_strict=force_strict)
+
+
+def _is_valid(validator: Validator, mock: Mocked) -> bool:
+    try:
+        validator.validate(mock)
+    except ValidationException:
+        return False
+    return True
+
+
+def _hits_and_misses() -> List[int]:
+    info = validation_cache_info()
+    return [info.hits, info.misses]
+
+
+def test_identical_mocks_are_validated_once() -> None:
+    validator = _make_validator(write_spec(SPEC))
+
+    for _ in range(3):
+        assert _is_valid(validator, _mock({'id': 1})) is True
+    assert _is_valid(validator, _mock({'id': 2})) is True
+
+    assert validation_cache_info() == ResultCacheInfo(hits=2, misses=2, maxsize=Config.RESULT_CACHE_SIZE, currsize=2)
+
+
+def test_changed_spec_version_misses() -> None:
+    spec_link = write_spec(SPEC)
+    mock = _mock({'id': 1, 'name': 1})
+    assert _is_valid(_make_validator(spec_link), mock) is False
+
+    spec = json.loads(json.dumps(SPEC))
+    spec['components']['schemas']['User']['properties']['name'] = {'type': 'integer'}
+    write_spec(spec)
+
+    assert _is_valid(_make_validator(spec_link), mock) is True
+    assert _hits_and_misses() == [0, 2]
+
+
+@pytest.mark.parametrize(('first', 'second', 'body'), [
+    # valid unless strict: the required id is missing
+    ({'is_strict': False}, {'is_strict': True}, {'name': 'Bob'}),
+    # valid unless forced strict: an extra key
+    ({'force_strict': False}, {'force_strict': True}, {'id': 1, 'extra': True}),
+])
+def test_changed_mode_misses(first: Any, second: Any, body: Any) -> None:
+    spec_link = write_spec(SPEC)
+
+    assert _is_valid(_make_validator(spec_link, **first), _mock(body)) is True
+    assert _is_valid(_make_validator(spec_link, **second), _mock(body)) is False
+    assert _is_valid(_make_validator(spec_link, **first), _mock(body)) is True
+
+    assert _hits_and_misses() == [1, 2]
+
+
+def test_cached_failure_is_raised_and_output_again(monkeypatch: pytest.MonkeyPatch) -> None:
+    outputs: List[Exception] = []
+    monkeypatch.setattr(Config, 'OUTPUT_FUNCTION', lambda func_name, e, text: outputs.append(e))
+    validator = _make_validator(write_spec(SPEC))
+    mock = _mock({'id': 'not an integer'})
+
+    messages = []
+    for _ in range(2):
+        with pytest.raises(ValidationException) as exc_info:
+            validator.validate(mock)
+        messages.append(str(exc_info.value))
+
+    assert _hits_and_misses() == [1, 1]
+    assert messages[0] == messages[1]
+    assert "There are some mismatches in test:" in messages[0]
+    assert len(outputs) == 2 and outputs[0] is outputs[1]
+
+
+def test_cached_failure_is_output_without_raising(monkeypatch: pytest.MonkeyPatch) -> None:
+    outputs: List[Exception] = []
+    monkeypatch.setattr(Config, 'OUTPUT_FUNCTION', lambda func_name, e, text: outputs.append(e))
+    validator = _make_validator(write_spec(SPEC), is_raise_error=False)
+
+    for _ in range(2):
+        validator.validate(_mock({'id': 'not an integer'}))
+
+    assert _hits_and_misses() == [1, 1]
+    assert len(outputs) == 2 and isinstance(outputs[1], ValidationException)
+
+
+def test_least_recently_used_results_are_evicted(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'RESULT_CACHE_SIZE', 2)
+    validator = _make_validator(write_spec(SPEC))
+
+    for user_id in (1, 2, 1, 3, 1, 2):
+        assert _is_valid(validator, _mock({'id': user_id})) is True
+
+    # 2 is evicted by 3, 1 is used in between
+    assert _hits_and_misses() == [2, 4]
+    assert validation_cache_info().currsize == 2
+
+
+def test_zero_size_disables_the_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'RESULT_CACHE_SIZE', 0)
+    validator = _make_validator(write_spec(SPEC))
+
+    for _ in range(3):
+        assert _is_valid(validator, _mock({'id': 'not an integer'})) is False
+
+    assert _hits_and_misses() == [0, 3]
+    assert validation_cache_info().currsize == 0
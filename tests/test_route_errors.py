@@ -0,0 +1,76 @@
+import json
+from typing import Any, List, Tuple
+
+import jj
+import pytest
+from jj.mock import mocked
+
+from jj_spec_validator import Config
+from jj_spec_validator.errors import AmbiguousRouteError, RouteNotFoundError, SpecMatchError
+
+from .conftest import SPEC, make_validator, write_spec
+
+
+def _make_spec() -> Any:
+    spec = json.loads(json.dumps(SPEC))
+    operation = spec['paths']['/users/{id}']['get']
+    # the same route as /users/{id}, only the variable differs
+    spec['paths']['/users/{name}'] = {'get': operation}
+    spec['paths']['/users/{id}/posts'] = {'get': operation, 'post': operation}
+    spec['paths']['/groups'] = {'get': operation}
+    return spec
+
+
+def test_closest_api_methods_are_suggested(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'ROUTE_SUGGESTIONS', 2)
+    spec_link = write_spec(_make_spec())
+
+    with pytest.raises(RouteNotFoundError) as exc_info:
+        make_validator(spec_link).validate(mocked(jj.match('DELETE', '/users/1/posts'), jj.Response(json={})))
+
+    assert exc_info.value.candidates == [('GET', '/users/{id}/posts'), ('POST', '/users/{id}/posts')]
+    assert str(exc_info.value) == (
+        f"Mocked API method: '{exc_info.value.mocked_api_method}'\nwas not found in the {spec_link} "
+        f"for the validation of test.\n"
+        "Closest API methods:\n"
+        "  GET /users/{id}/posts\n"
+        "  POST /users/{id}/posts"
+    )
+
+
+def test_no_suggestions(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'ROUTE_SUGGESTIONS', 0)
+    spec_link = write_spec(_make_spec())
+
+    with pytest.raises(RouteNotFoundError) as exc_info:
+        make_validator(spec_link).validate(mocked(jj.match('GET', '/posts'), jj.Response(json={})))
+
+    assert exc_info.value.candidates == []
+    assert "Closest API methods" not in str(exc_info.value)
+
+
+def test_all_matched_api_methods_are_listed() -> None:
+    spec_link = write_spec(_make_spec())
+
+    with pytest.raises(AmbiguousRouteError) as exc_info:
+        make_validator(spec_link).validate(mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1})))
+
+    assert exc_info.value.candidates == [('GET', '/users/{id}'), ('GET', '/users/{name}')]
+    assert str(exc_info.value) == (
+        f"There is more than 1 matches for mocked API method '{exc_info.value.mocked_api_method}\n"
+        f"in the {spec_link}.\n"
+        "Matched API methods:\n"
+        "  GET /users/{id}\n"
+        "  GET /users/{name}"
+    )
+
+
+def test_custom_output_gets_the_error_before_it_is_raised(monkeypatch: pytest.MonkeyPatch) -> None:
+    outputs: List[Tuple[str, Exception, str | None]] = []
+    monkeypatch.setattr(Config, 'OUTPUT_FUNCTION', lambda func_name, e, text: outputs.append((func_name, e, text)))
+    spec_link = write_spec(_make_spec())
+
+    with pytest.raises(SpecMatchError) as exc_info:
+        make_validator(spec_link).validate(mocked(jj.match('GET', '/posts'), jj.Response(json={})))
+
+    assert outputs == [('test', exc_info.value, None)]
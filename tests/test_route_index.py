@@ -0,0 +1,34 @@
+import json
+import os
+
+import jj
+import pytest
+from jj.mock import mocked
+
+from jj_spec_validator import AmbiguousRouteError
+from jj_spec_validator.utils._route_index import RouteIndex
+
+from .conftest import SPEC, make_validator
+
+
+def test_paths_differing_in_variable_names_are_all_found() -> None:
+    route_index = RouteIndex([('GET', '/users/{id}'), ('GET', '/users/{user_id}'), ('POST', '/users/{id}')])
+
+    assert route_index.find_by_path('/users/1') == {('GET', '/users/{id}'), ('GET', '/users/{user_id}'),
+                                                    ('POST', '/users/{id}')}
+    assert route_index.find_by_path('/users/{uid}') == {('GET', '/users/{id}'), ('GET', '/users/{user_id}'),
+                                                        ('POST', '/users/{id}')}
+
+
+def test_mock_matching_paths_differing_in_variable_names_is_ambiguous() -> None:
+    spec = json.loads(json.dumps(SPEC))
+    spec['paths']['/users/{user_id}'] = spec['paths']['/users/{id}']
+    spec_link = os.path.abspath('spec.json')
+    with open(spec_link, 'w') as f:
+        json.dump(spec, f)
+    validator = make_validator(spec_link)
+
+    with pytest.raises(AmbiguousRouteError) as exc_info:
+        validator.validate(mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1})))
+
+    assert sorted(exc_info.value.candidates) == [('GET', '/users/{id}'), ('GET', '/users/{user_id}')]
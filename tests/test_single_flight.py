@@ -0,0 +1,83 @@
+import asyncio
+from time import monotonic
+
+import pytest
+
+from jj_spec_validator import Config
+from jj_spec_validator.utils import load_spec, load_spec_async
+from jj_spec_validator.utils._cache_index import LOCK_SUFFIX
+from jj_spec_validator.utils._cacheir import _get_cache_lock, _get_link_filename, load_cache_async
+from jj_spec_validator.utils._file_lock import FileLock
+
+from .conftest import SpecServer, make_validator
+
+
+def test_sync_load_on_loop_of_leading_coroutine_does_not_wait_for_its_lock(
+        spec_server: SpecServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'CACHE_LOCK_TIMEOUT', 10.0)
+    spec_server.delay = 0.5
+    validator = make_validator(spec_server.spec_link)
+
+    async def main() -> float:
+        leader = asyncio.create_task(load_spec_async(validator))
+        # the leader is downloading now, holding the cache lock across the await
+        await asyncio.sleep(0.2)
+        started = monotonic()
+        assert load_spec(validator) is not None
+        duration = monotonic() - started
+        assert await leader is not None
+        return duration
+
+    assert asyncio.run(main()) < Config.CACHE_LOCK_TIMEOUT / 2
+
+
+def test_cancelled_leader_does_not_cancel_waiters(spec_server: SpecServer) -> None:
+    spec_server.delay = 0.5
+    validator = make_validator(spec_server.spec_link)
+
+    async def main() -> None:
+        leader = asyncio.create_task(load_spec_async(validator))
+        await asyncio.sleep(0.1)
+        follower = asyncio.create_task(load_spec_async(validator))
+        await asyncio.sleep(0.1)
+        leader.cancel()
+
+        assert await follower is not None
+        assert not follower.cancelled()
+        assert leader.cancelled()
+
+    asyncio.run(main())
+
+
+def test_leader_error_is_shared_with_waiters() -> None:
+    validator = make_validator('http://127.0.0.1:1/spec.json')
+
+    async def main() -> None:
+        results = await asyncio.gather(load_spec_async(validator), load_spec_async(validator),
+                                       return_exceptions=True)
+        assert all(isinstance(result, Exception) for result in results)
+
+    asyncio.run(main())
+
+
+def test_cancelled_lock_acquire_releases_the_lock(spec_server: SpecServer) -> None:
+    validator = make_validator(spec_server.spec_link)
+    holder = _get_cache_lock(spec_server.spec_link)
+    assert holder.acquire()
+
+    async def main() -> None:
+        task = asyncio.create_task(load_cache_async(validator))
+        # waiting for the lock in the executor
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        holder.release()
+        # the executor thread takes the lock now, and releases it right away
+        await asyncio.sleep(0.5)
+
+    asyncio.run(main())
+
+    lock = FileLock(_get_link_filename(spec_server.spec_link) + LOCK_SUFFIX, timeout=0)
+    assert lock.acquire()
+    lock.release()
@@ -0,0 +1,56 @@
+import json
+import math
+from importlib import import_module
+from typing import Any
+
+import pytest
+
+from jj_spec_validator.utils._spec_parser import parse_spec
+
+spec_parser = import_module('jj_spec_validator.utils._spec_parser')
+
+BIG_INT = 2 ** 70
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def parser(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == 'json':
+        monkeypatch.setattr(spec_parser, 'orjson', None)
+    return str(request.param)
+
+
+@pytest.mark.parametrize('content', [
+    b'{"maximum": 1e400, "minimum": -Infinity, "default": NaN}',
+    b'{"maximum": %d, "minimum": -%d}' % (BIG_INT, BIG_INT),
+    b'{"a": [1, 2.5, "x", null, true]}',
+])
+def test_json_is_parsed_as_by_the_json_module(parser: str, content: bytes) -> None:
+    expected = json.loads(content)
+
+    for spec in (parse_spec(content, 'application/json', 'spec'), parse_spec(memoryview(content), '', 'spec.json')):
+        # NaN isn't equal to itself
+        assert json.dumps(spec) == json.dumps(expected)
+
+
+def test_invalid_json_raises(parser: str) -> None:
+    with pytest.raises(ValueError):
+        parse_spec(b'{"a": 1', 'application/json', 'spec')
+
+
+@pytest.mark.parametrize(('content', 'expected'), [
+    (b'{"a": [1, 2.5, "x", null, true]}', {'a': [1, 2.5, 'x', None, True]}),
+    (b'{"a": %d}' % BIG_INT, {'a': BIG_INT}),
+    # YAML, not the extensions of the json module
+    (b'{"a": NaN, "b": .inf}', {'a': 'NaN', 'b': math.inf}),
+    (b'{a: 1, b: [x, y]}', {'a': 1, 'b': ['x', 'y']}),
+    (b'  [1, 2]', [1, 2]),
+    (b'a: 1\n', {'a': 1}),
+])
+def test_yaml_that_looks_like_json_is_yaml(parser: str, content: bytes, expected: Any) -> None:
+    assert parse_spec(content, 'text/yaml', 'spec') == expected
+    assert parse_spec(memoryview(content), '', 'spec.yml') == expected
+
+
+def test_unsupported_content_type() -> None:
+    with pytest.raises(ValueError, match="Unsupported content type: text/html"):
+        parse_spec(b'{}', 'text/html', 'spec')
@@ -0,0 +1,153 @@
+import json
+import os
+from json import JSONDecodeError
+from typing import Any, List
+
+import jj
+import pytest
+from d42 import schema
+from d42.validation import ValidationException, validate_or_fail
+from jj.mock import mocked
+
+from jj_spec_validator import Config
+from jj_spec_validator.utils import validate_stream
+from jj_spec_validator.utils._common import validate_non_strict
+from jj_spec_validator.utils._compiler import CompiledValidator
+from jj_spec_validator.utils._streaming import iter_json_array
+
+from .conftest import SPEC, make_validator
+
+ARRAYS: List[Any] = [
+    [],
+    [1],
+    [1.5, -2, 3e10, 12345678901234567890, 0.000001],
+    ['', 'a', 'ü', '日本語', ' ', 'quote " and \\ backslash', '🙂'],
+    [None, True, False, {}, [], [[]], {'a': [1, {'b': None}]}],
+    [{'id': i, 'name': 'x' * i} for i in range(20)],
+]
+
+
+@pytest.mark.parametrize('value', ARRAYS)
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64])
+def test_iter_json_array_is_json_loads(value: List[Any], chunk_size: int) -> None:
+    # whitespace around the values, so the chunks end in every possible place
+    for body in (json.dumps(value).encode(), json.dumps(value, indent=2, ensure_ascii=False).encode()):
+        assert list(iter_json_array(body, chunk_size)) == json.loads(body)
+
+
+@pytest.mark.parametrize('body', [b'', b' ', b'{"a": 1}', b'[1, 2', b'[1,]', b'[1 2]', b'[1] x', b'[tru]',
+                                  b'["unterminated]', b'[1.5e]'])
+@pytest.mark.parametrize('chunk_size', [1, 3, 64])
+def test_iter_json_array_raises_on_invalid_json(body: bytes, chunk_size: int) -> None:
+    with pytest.raises(JSONDecodeError):
+        list(iter_json_array(body, chunk_size))
+
+
+def _d42_message(declaration: Any, value: Any, is_strict: bool) -> str:
+    with pytest.raises(ValidationException) as exc_info:
+        if is_strict:
+            validate_or_fail(declaration, value)
+        else:
+            validate_non_strict(declaration, value)
+    return str(exc_info.value)
+
+
+def _stream_message(declaration: Any, value: Any, is_strict: bool, max_errors: int | None) -> str:
+    validator = CompiledValidator(declaration, is_strict)
+    with pytest.raises(ValidationException) as exc_info:
+        validate_stream(validator, json.dumps(value).encode(), max_errors)
+    return str(exc_info.value)
+
+
+@pytest.mark.parametrize('is_strict', [False, True])
+def test_stream_errors_are_d42_errors(is_strict: bool) -> None:
+    declaration = schema.list(schema.dict({'id': schema.int}))
+    value = [{'id': 1}, {'id': 'a'}, {'id': 2}, {'id': None}]
+
+    assert _stream_message(declaration, value, is_strict, None) == _d42_message(declaration, value, is_strict)
+    assert _stream_message(declaration, value, is_strict, 2) == _d42_message(declaration, value, is_strict)
+
+
+@pytest.mark.parametrize('is_strict', [False, True])
+def test_stream_stops_after_max_errors(is_strict: bool) -> None:
+    declaration = schema.list(schema.int)
+    value = ['a', 'b', 'c', 'd']
+
+    message = _stream_message(declaration, value, is_strict, 2)
+
+    assert "_[0]" in message and "_[1]" in message and "_[2]" not in message
+    assert message.endswith("... stopped after the first 2 mismatched elements")
+
+
+@pytest.mark.parametrize('is_strict', [False, True])
+@pytest.mark.parametrize('value', [[], [1, 2, 3, 4], ['a', 'b', 'c', 'd', 'e']])
+def test_stream_length_errors_are_d42_errors(is_strict: bool, value: List[Any]) -> None:
+    declaration = schema.list(schema.int).len(1, 3)
+
+    # the length is checked even after the element validation has stopped
+    assert _stream_message(declaration, value, is_strict, 1) == _d42_message(declaration, value, is_strict)
+
+
+@pytest.fixture
+def spec_link() -> str:
+    spec_link = os.path.abspath('spec.json')
+    with open(spec_link, 'w') as f:
+        json.dump(SPEC, f)
+    return spec_link
+
+
+def _validate_users(spec_link: str, body: bytes, is_strict: bool = False) -> str | None:
+    validator = make_validator(spec_link, is_strict)
+    try:
+        validator.validate(mocked(jj.match('GET', '/users'), jj.Response(body=body)))
+    except (AssertionError, ValidationException) as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+@pytest.mark.parametrize('is_strict', [False, True])
+@pytest.mark.parametrize('body', [
+    json.dumps([{'id': i} for i in range(50)]).encode(),
+    json.dumps([{'id': i} if i % 7 else {'id': str(i)} for i in range(50)]).encode(),
+    json.dumps([{'id': i} for i in range(50)]).encode()[:-10],
+    b'[{"id": 1}, {"id": 2}] trailing',
+])
+def test_streamed_validation_is_whole_body_validation(spec_link: str, body: bytes, is_strict: bool,
+                                                      monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'STREAMING_MAX_ERRORS', None)
+    monkeypatch.setattr(Config, 'STREAMING_THRESHOLD', None)
+    expected = _validate_users(spec_link, body, is_strict)
+
+    monkeypatch.setattr(Config, 'STREAMING_THRESHOLD', 16)
+    assert _validate_users(spec_link, body, is_strict) == expected
+
+
+def test_invalid_streamed_body_is_json_expected_error(spec_link: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'STREAMING_THRESHOLD', 16)
+    body = json.dumps([{'id': 'a'} for _ in range(50)]).encode()[:-1]
+
+    # a truncated body is reported as such, not with the element errors before the cut
+    assert _validate_users(spec_link, body) == "AssertionError: JSON expected in Response body of the test"
+
+
+def test_streamed_body_is_reported_with_max_errors(spec_link: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'STREAMING_THRESHOLD', 16)
+    monkeypatch.setattr(Config, 'STREAMING_MAX_ERRORS', 3)
+    body = json.dumps([{'id': str(i)} for i in range(50)]).encode()
+
+    message = _validate_users(spec_link, body)
+
+    assert message is not None
+    assert message.count("must be <class 'int'>") == 3
+    assert "stopped after the first 3 mismatched elements" in message
+
+
+def test_bodies_under_threshold_are_not_streamed(spec_link: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, 'STREAMING_MAX_ERRORS', 1)
+    body = json.dumps([{'id': str(i)} for i in range(5)]).encode()
+
+    monkeypatch.setattr(Config, 'STREAMING_THRESHOLD', len(body) + 1)
+    message = _validate_users(spec_link, body)
+
+    assert message is not None
+    assert message.count("must be <class 'int'>") == 5
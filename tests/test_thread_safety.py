@@ -0,0 +1,119 @@
+import json
+import os
+import random
+import sys
+from threading import Barrier, Event, Thread
+from typing import Any, Callable, Iterator, List, Tuple
+
+import jj
+import pytest
+from jj.mock import Mocked, mocked
+
+from jj_spec_validator import clear_validation_cache, invalidate_spec
+from jj_spec_validator.utils import gc_disk_cache
+from jj_spec_validator.validator import Validator
+
+from .conftest import SPEC
+
+THREADS = 8
+ITERATIONS = 50
+SPEC_LINKS = 3
+
+# (validator, mock), validated by every thread
+_Case = Tuple[Validator, Mocked]
+
+
+@pytest.fixture
+def switch_often() -> Iterator[None]:
+    # frequent thread switches, so the races show up on GIL builds too
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _make_mocks() -> List[Mocked]:
+    return [
+        mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1, 'name': 'Bob'})),
+        mocked(jj.match('GET', '/users/2'), jj.Response(json={'id': 'not an integer'})),
+        # valid for non-strict validators only
+        mocked(jj.match('GET', '/users/3'), jj.Response(json={'id': 3, 'extra': True})),
+        mocked(jj.match('GET', '/users'), jj.Response(json=[{'id': i} for i in range(10)])),
+        mocked(jj.match('GET', '/users'), jj.Response(json=[{'id': 1}, {'id': None}])),
+        mocked(jj.match('GET', '/missing'), jj.Response(json={'id': 1})),
+        mocked(jj.match('GET', '/users/4'), jj.Response(body=b'not json')),
+    ]
+
+
+def _make_cases(spec_links: List[str]) -> List[_Case]:
+    cases = []
+    for spec_link in spec_links:
+        for is_strict, force_strict in ((False, False), (True, False), (True, True)):
+            validator = Validator(skip_if_failed_to_get_spec=False, is_raise_error=True, is_strict=is_strict,
+                                  func_name='test', spec_link=spec_link, force_strict=force_strict)
+            cases += [(validator, mock) for mock in _make_mocks()]
+    return cases
+
+
+def _outcome(case: _Case) -> str:
+    validator, mock = case
+    try:
+        validator.validate(mock)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return 'ok'
+
+
+def _run_worker(cases: List[_Case], expected: List[str], seed: int,
+                barrier: Barrier, mismatches: List[str]) -> None:
+    order = list(range(len(cases)))
+    random.Random(seed).shuffle(order)
+    barrier.wait()
+    for _ in range(ITERATIONS):
+        for index in order:
+            outcome = _outcome(cases[index])
+            if outcome != expected[index]:
+                mismatches.append(f"case {index}: expected {expected[index]!r}, got {outcome!r}")
+
+
+def _run_chaos(stopped: Event, actions: List[Callable[[], Any]]) -> None:
+    rnd = random.Random(0)
+    while not stopped.wait(0.01):
+        rnd.choice(actions)()
+
+
+def test_concurrent_validations_have_single_threaded_outcomes(switch_often: None) -> None:
+    # the same content under several links, so they share the cached artifact
+    spec_links = [os.path.abspath(f'spec_{i}.json') for i in range(SPEC_LINKS)]
+    for spec_link in spec_links:
+        with open(spec_link, 'w') as f:
+            json.dump(SPEC, f)
+    cases = _make_cases(spec_links)
+    expected = [_outcome(case) for case in cases]
+    assert len(set(expected)) > 2
+
+    gc_disk_cache(max_entries=0)
+    invalidate_spec()
+    clear_validation_cache()
+
+    mismatches: List[str] = []
+    barrier = Barrier(THREADS)
+    stopped = Event()
+    # another thread drops the parsed specs, the memoized results and the disk cache meanwhile
+    chaos = Thread(target=_run_chaos, args=(stopped, [
+        invalidate_spec,
+        lambda: invalidate_spec(random.choice(spec_links)),
+        clear_validation_cache,
+        lambda: gc_disk_cache(max_entries=0),
+    ]))
+    workers = [Thread(target=_run_worker, args=(cases, expected, seed, barrier, mismatches))
+               for seed in range(THREADS)]
+    chaos.start()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stopped.set()
+    chaos.join()
+
+    assert mismatches == []
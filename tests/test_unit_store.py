@@ -0,0 +1,52 @@
+import copy
+from typing import Any, NoReturn
+
+import jj
+import pytest
+from d42.validation import ValidationException
+from jj.mock import mocked
+
+from jj_spec_validator import invalidate_spec
+from jj_spec_validator.utils import PreparedSpec
+
+from .conftest import SPEC, make_validator, write_spec
+
+
+def _fail_conversion(self: PreparedSpec, key: Any) -> NoReturn:
+    raise AssertionError(f"{key} converted")
+
+
+def test_converted_operations_are_shared_with_a_cold_process(monkeypatch: pytest.MonkeyPatch) -> None:
+    validator = make_validator(write_spec(SPEC))
+    validator.validate(mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1})))
+
+    # as in a new process: the spec is read from the disk cache with no operation converted
+    invalidate_spec()
+    monkeypatch.setattr(PreparedSpec, '_convert', _fail_conversion)
+
+    validator.validate(mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1})))
+    with pytest.raises(ValidationException):
+        validator.validate(mocked(jj.match('GET', '/users/2'), jj.Response(json={'id': 'a'})))
+    with pytest.raises(AssertionError, match="converted"):
+        validator.validate(mocked(jj.match('GET', '/users'), jj.Response(json=[])))
+
+
+def test_unchanged_operations_of_a_changed_spec_are_not_converted_again(monkeypatch: pytest.MonkeyPatch) -> None:
+    spec_link = write_spec(SPEC)
+    validator = make_validator(spec_link)
+    validator.validate(mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1})))
+    validator.validate(mocked(jj.match('GET', '/users'), jj.Response(json=[{'id': 1}])))
+
+    changed_spec = copy.deepcopy(SPEC)
+    changed_spec['paths']['/users']['get']['summary'] = 'List users'
+    write_spec(changed_spec)
+    # as in a new process, with no previous version of the spec to inherit from
+    invalidate_spec()
+    converted = []
+    convert = PreparedSpec._convert
+    monkeypatch.setattr(PreparedSpec, '_convert', lambda self, key: converted.append(key) or convert(self, key))
+
+    validator.validate(mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1})))
+    validator.validate(mocked(jj.match('GET', '/users'), jj.Response(json=[{'id': 1}])))
+
+    assert converted == [('GET', '/users')]
@@ -0,0 +1,60 @@
+import copy
+from typing import Any, List, NoReturn
+
+import jj
+import pytest
+from jj.mock import mocked
+
+from jj_spec_validator import Config, invalidate_spec, warm_specs
+from jj_spec_validator.utils import PreparedSpec
+
+from .conftest import SPEC, SpecServer, make_validator, write_spec
+
+
+def _fail_conversion(self: PreparedSpec, key: Any) -> NoReturn:
+    raise AssertionError(f"{key} converted")
+
+
+def _validate_users(spec_link: str) -> None:
+    validator = make_validator(spec_link)
+    validator.validate(mocked(jj.match('GET', '/users/1'), jj.Response(json={'id': 1})))
+    validator.validate(mocked(jj.match('GET', '/users'), jj.Response(json=[{'id': 1}])))
+
+
+def test_warmed_operations_are_not_converted_again(spec_server: SpecServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    spec_link = write_spec(SPEC)
+    assert warm_specs([spec_link, spec_server.spec_link]) == {spec_link: True, spec_server.spec_link: True}
+
+    # as in a process started after the warm-up
+    invalidate_spec()
+    monkeypatch.setattr(PreparedSpec, '_convert', _fail_conversion)
+
+    _validate_users(spec_link)
+    _validate_users(spec_server.spec_link)
+
+
+def test_parse_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    spec_link = write_spec(SPEC)
+    assert warm_specs([spec_link], is_converted=False) == {spec_link: True}
+
+    invalidate_spec()
+    monkeypatch.setattr(PreparedSpec, '_convert', _fail_conversion)
+
+    with pytest.raises(AssertionError, match="converted"):
+        _validate_users(spec_link)
+
+
+def test_broken_operation_doesnt_fail_the_warm_up(monkeypatch: pytest.MonkeyPatch) -> None:
+    outputs: List[str | None] = []
+    monkeypatch.setattr(Config, 'OUTPUT_FUNCTION', lambda func_name, e, text: outputs.append(text))
+    spec = copy.deepcopy(SPEC)
+    spec['paths']['/broken'] = {'get': {'responses': {'200': {'description': 'OK', 'content': {
+        'application/json': {'schema': {'$ref': '#/components/schemas/Missing'}}}}}}}
+    spec_link = write_spec(spec)
+
+    assert warm_specs([spec_link]) == {spec_link: True}
+
+    assert outputs == [f"An error occurred while converting GET /broken of the {spec_link}"]
+    invalidate_spec()
+    monkeypatch.setattr(PreparedSpec, '_convert', _fail_conversion)
+    _validate_users(spec_link)